@@ -0,0 +1,432 @@
+# benchmark.py
+# headless benchmark of the ingest, dispatch and rendering hot paths
+# uses a withdrawn tk root if a display exists, otherwise fake tk widgets and the agg canvas
+import argparse
+import json
+import math
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+import tkinter as tk
+from utils.decode import JSON_BACKEND
+
+# fake widget used when there is no display, every method does nothing
+class FakeWidget:
+    def __init__(self, *args, **kwargs): pass
+    def __getattr__(self, name): return lambda *args, **kwargs: None
+    def winfo_children(self): return []
+
+# fake tk variable used when there is no display
+class FakeVar(FakeWidget):
+    def __init__(self, *args, value="", **kwargs): self.value = value
+    def get(self): return self.value
+    def set(self, value): self.value = value
+
+# fake tk canvas used when there is no display, counts the item calls a frame makes
+class FakeCanvas(FakeWidget):
+    calls = 0
+    def __init__(self, *args, **kwargs): self.items = 0
+    def winfo_width(self): return 900
+    def winfo_height(self): return 500
+    def _create(self, *args, **kwargs):
+        self.items += 1
+        return self.items
+    create_line = create_rectangle = create_text = _create
+    def coords(self, *args): FakeCanvas.calls += 1
+    def itemconfig(self, *args, **kwargs): FakeCanvas.calls += 1
+
+# create a hidden tk root, or replace tk widgets with fakes when there is no display
+def make_root():
+    try:
+        root = tk.Tk()
+        root.withdraw()
+        return root, "tk"
+    except tk.TclError:
+        for name in ("Frame", "Label", "Button", "Entry", "OptionMenu", "Scrollbar"):
+            setattr(tk, name, FakeWidget)
+        tk.StringVar = FakeVar
+        tk.Canvas = FakeCanvas
+        return None, "mock"
+
+# agg canvas with the methods chart panel needs from the tk canvas
+def agg_canvas():
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    class AggCanvas(FigureCanvasAgg):
+        def __init__(self, figure, master=None): super().__init__(figure)
+        def get_tk_widget(self): return FakeWidget()
+        def blit(self, bbox=None): pass
+    return AggCanvas
+
+# nearest-rank percentile of a sorted list: the smallest value with at least p percent of the samples at or below it
+def percentile(ordered, p):
+    return ordered[max(0, min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1))]
+
+# p50 / p95 / max in milliseconds of a list of seconds
+def summary(samples):
+    ms = sorted(s * 1000 for s in samples)
+    return {"count": len(ms), "p50_ms": statistics.median(ms), "p95_ms": percentile(ms, 95), "max_ms": ms[-1]}
+
+# synthetic combined stream frames for one symbol
+class MarketSimulator:
+    def __init__(self, code="btcusdt", seed=1):
+        self.code = code
+        self.random = random.Random(seed)
+        self.price = 50000.0
+        self.time = 1_700_000_000_000
+        self.update_id = 1000
+        self.candle = self.time // 1_800_000 * 1_800_000
+
+    def snapshot(self, levels=1000):
+        bids = [[f"{self.price - i * 0.5:.2f}", f"{self.random.uniform(0.1, 5):.4f}"] for i in range(1, levels)]
+        asks = [[f"{self.price + i * 0.5:.2f}", f"{self.random.uniform(0.1, 5):.4f}"] for i in range(1, levels)]
+        return {"lastUpdateId": self.update_id, "bids": bids, "asks": asks}
+
+    def frame(self, kind):
+        self.time += self.random.randint(1, 20)
+        self.price += self.random.uniform(-5, 5)
+        p = f"{self.price:.2f}"
+        if kind == "tickers":
+            # all market mini ticker, about 300 symbols change every second
+            data = [{"e": "24hrMiniTicker", "E": self.time, "s": f"COIN{i}USDT", "c": f"{self.price / (i + 1):.8f}",
+                     "o": f"{self.price / (i + 1) * 0.99:.8f}", "h": p, "l": p, "v": "1000.5", "q": f"{self.random.uniform(1e3, 1e9):.2f}"} for i in range(300)]
+        elif kind == "kline":
+            data = {"e": "kline", "E": self.time, "k": {"t": self.candle, "o": p, "h": f"{self.price + 10:.2f}", "l": f"{self.price - 10:.2f}", "c": p, "v": "100.5"}}
+        elif kind == "depth":
+            first = self.update_id + 1
+            self.update_id += self.random.randint(1, 5)
+            levels = lambda sign: [[f"{self.price + sign * self.random.randint(1, 200) * 0.5:.2f}", f"{self.random.choice([0, self.random.uniform(0.1, 5)]):.4f}"] for _ in range(10)]
+            data = {"e": "depthUpdate", "E": self.time, "U": first, "u": self.update_id, "b": levels(-1), "a": levels(1)}
+        else:
+            data = {"e": "trade", "E": self.time, "T": self.time, "p": p, "q": f"{self.random.uniform(0.001, 1):.4f}", "m": self.random.random() < 0.5}
+        stream = {"tickers": "!miniTicker@arr", "kline": self.code + "@kline_30m", "depth": self.code + "@depth@100ms", "trade": self.code + "@trade"}[kind]
+        return json.dumps({"stream": stream, "data": data})
+
+# the dashboard with real panels but without opening any connection
+def make_app(root):
+    import main
+    from utils.candles import CandleStore
+    from utils.resample import TimeframeStore
+    from utils.engine import MarketEngine
+    from utils.market import MarketTable
+    from utils.indicators import IndicatorStore
+    from utils.warm import WarmSymbols
+    from utils.alerts import AlertIndex
+    from utils.paper import PaperTrader
+    from components.chart import ChartPanel
+
+    app = main.CryptoApp.__new__(main.CryptoApp)
+    app.is_running = True
+    app.coins = {"BTC/USDT": "btcusdt"}
+    app.coins.update((f"COIN{i}/USDT", f"coin{i}usdt") for i in range(1000))
+    app.active_coins = ["BTC/USDT"]
+    app.current_coin = "BTC/USDT"
+    app.market = MarketTable(list(app.coins.items()))
+    app.chart_data = CandleStore(main.CANDLE_CAPACITY)
+    app.timeframes = TimeframeStore(app.chart_data, main.KLINE_INTERVAL)
+    app.timeframe = main.KLINE_INTERVAL
+    app.indicators = IndicatorStore(app.timeframes, main.INDICATORS)
+    app.books = {}
+    app.tapes = {}
+    app.live_bytes = {}
+    app.warm = WarmSymbols(main.WARM_SYMBOLS, main.WARM_MEMORY_MB * 1024 * 1024, app.symbol_bytes)
+    app.warm.touch(app.current_coin)
+    app.paper = PaperTrader(main.PAPER_FEE_RATE)
+    app.paper_symbols = set()
+    app.account_posted = 0
+    app.all_streams = True
+    app.price_decimals = {}
+
+    # 3000 price alerts around the simulated ticker prices
+    app.alerts = AlertIndex(main.ALERT_COOLDOWN)
+    for i in range(300):
+        for k in range(10): app.alerts.add(f"COIN{i}/USDT", "price", k % 2 == 0, 50000 / (i + 1) * (0.95 + k * 0.01))
+    app.engine = MarketEngine()
+    app.engine.run_blocking = lambda *args: None # never touch the network
+    app.watchlist_panel = main.WatchlistPanel(root)
+    app.watchlist_panel.set_market(app.market)
+    app.orderbook_panel = main.OrderBookPanel(root)
+    app.trade_panel = main.TradeHistoryPanel(root)
+    app.chart_panel = ChartPanel(root)
+    app.chart_panel.set_indicators(main.CHART_OVERLAYS, main.CHART_SUB_PANE)
+    app.book_view = (app.current_coin, [], [])
+    app.trades_view = (app.current_coin, [])
+    app.tape_view = None
+    app.setup_scheduler()
+    app.alert_banner = main.AlertBanner(root)
+    return app
+
+# time to import main.py in a new interpreter (everything before the window can show)
+# and the heavy modules that are still imported by it
+def bench_startup(repeats):
+    import subprocess
+    code = ("import json, sys, time; t = time.perf_counter(); import main; "
+            "print(json.dumps([time.perf_counter() - t, [m for m in ('matplotlib', 'requests') if m in sys.modules]]))")
+    samples = []
+    for _ in range(repeats):
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        elapsed, heavy = json.loads(out.splitlines()[-1])
+        samples.append(elapsed)
+    return {"import_main": summary(samples), "heavy_modules": heavy}
+
+# messages/sec through json parse, routing and each on_*_message handler
+def bench_ingest(app, count):
+    from utils.streams import StreamManager
+    from utils.depth import OrderBook
+    from utils.decode import decode_snapshot
+
+    results = {}
+    for kind in ("tickers", "kline", "depth", "trade"):
+        sim = MarketSimulator()
+        manager = StreamManager()
+        manager.handlers = app.stream_handlers()
+        if kind == "depth":
+            book = app.books["BTC/USDT"] = OrderBook("BTC/USDT")
+            book.load_snapshot(decode_snapshot(sim.snapshot()))
+
+        frames = [sim.frame(kind) for _ in range(count)]
+        start = time.perf_counter()
+        for raw in frames: manager.on_message(raw)
+        elapsed = time.perf_counter() - start
+        results[kind] = {"messages": count, "messages_per_sec": count / elapsed, "us_per_message": elapsed / count * 1e6}
+        app.engine.bus.drain()
+    return results
+
+# cost of one ui frame: draining the bus after a burst of messages and drawing dirty panels
+def bench_dispatch(app, frames, per_frame):
+    from utils.streams import StreamManager
+    sim = MarketSimulator(seed=2)
+    manager = StreamManager()
+    manager.handlers = app.stream_handlers()
+    kinds = ["tickers"] + ["trade", "trade", "kline"] * 10
+
+    samples = []
+    for _ in range(frames):
+        for i in range(per_frame): manager.on_message(sim.frame(kinds[i % len(kinds)]))
+        start = time.perf_counter()
+        app.engine.bus.drain()
+        app.scheduler.run()
+        samples.append(time.perf_counter() - start)
+    return {"frame": summary(samples), "bus": app.engine.bus.stats(), "scheduler": app.scheduler.stats()}
+
+# chart frame time for full redraws and live ticks at different candle counts
+# a live tick includes the incremental update of every indicator
+def bench_chart(app, candle_counts, repeats):
+    from utils.candles import CandleSeries
+    from utils.indicators import IndicatorSet
+    results = {}
+    bars = app.chart_panel.bars
+    for count in candle_counts:
+        series = CandleSeries(max(count, 2))
+        rng = random.Random(count)
+        price = 50000.0
+        for i in range(count):
+            o = price
+            price += rng.uniform(-50, 50)
+            series.append(i * 1_800_000, o, max(o, price) + 20, min(o, price) - 20, price, rng.uniform(1, 100))
+
+        start = time.perf_counter()
+        indicators = IndicatorSet(series, app.indicators.names)
+        backfill = time.perf_counter() - start
+
+        panel = app.chart_panel
+        panel.bars = count
+        full, tick = [], []
+        for r in range(repeats):
+            panel.chart_key = None
+            start = time.perf_counter()
+            panel.draw_chart(series, f"BENCH{count}/USDT", indicators)
+            full.append(time.perf_counter() - start)
+
+            t, o, h, l, c, v = series.last(1)[:, 0]
+            series.update_last(t, o, h, l, (h + l) / 2, v + 1)
+            start = time.perf_counter()
+            indicators.sync()
+            panel.draw_chart(series, f"BENCH{count}/USDT", indicators)
+            tick.append(time.perf_counter() - start)
+        results[str(count)] = {"full_redraw": summary(full), "live_tick": summary(tick), "indicator_backfill_ms": backfill * 1000}
+    app.chart_panel.bars = bars
+    return results
+
+# canvas chart frame time over deep history: whole history zoomed out, pan steps and live ticks
+# with a real display the tk time is included, without one only python time and the item calls are counted
+def bench_canvas_chart(root, candle_counts, repeats):
+    from utils.candles import CandleSeries
+    from utils.indicators import IndicatorSet
+    from components.canvas_chart import CanvasChartPanel
+    import main
+    results = {}
+    for count in candle_counts:
+        series = CandleSeries(max(count, 2))
+        rng = random.Random(count)
+        price = 50000.0
+        for i in range(count):
+            o = price
+            price += rng.uniform(-50, 50)
+            series.append(i * 1_800_000, o, max(o, price) + 20, min(o, price) - 20, price, rng.uniform(1, 100))
+        indicators = IndicatorSet(series, main.INDICATORS)
+
+        panel = CanvasChartPanel(root)
+        panel.canvas.winfo_width = lambda: 900
+        panel.canvas.winfo_height = lambda: 500
+        panel.set_indicators(main.CHART_OVERLAYS, main.CHART_SUB_PANE)
+
+        zoomed_out, pan, tick = [], [], []
+        calls = FakeCanvas.calls
+        for r in range(repeats):
+            panel.bars, panel.offset = count, 0
+            panel.frame_key = None
+            start = time.perf_counter()
+            panel.draw_chart(series, "BENCH/USDT", indicators)
+            zoomed_out.append(time.perf_counter() - start)
+
+            # one month of 30m candles, dragged back in steps
+            panel.bars = min(1440, count)
+            for step in range(5):
+                panel.offset = step * panel.bars // 10
+                start = time.perf_counter()
+                panel.draw_chart(series, "BENCH/USDT", indicators)
+                pan.append(time.perf_counter() - start)
+
+            panel.offset = 0
+            panel.draw_chart(series, "BENCH/USDT", indicators)
+            t, o, h, l, c, v = series.last(1)[:, 0]
+            series.update_last(t, o, h, l, (h + l) / 2, v + 1)
+            start = time.perf_counter()
+            indicators.sync()
+            panel.draw_chart(series, "BENCH/USDT", indicators)
+            tick.append(time.perf_counter() - start)
+        results[str(count)] = {"zoomed_out": summary(zoomed_out), "pan": summary(pan), "live_tick": summary(tick),
+                               "levels": len(panel.pyramid.levels), "candles_drawn": panel.frame["m"]}
+        if root is None: results[str(count)]["item_calls_per_frame"] = (FakeCanvas.calls - calls) / (repeats * 7)
+    return results
+
+# update cost of order book and trade panels
+def bench_panels(app, repeats):
+    sim = MarketSimulator(seed=3)
+    rng = random.Random(3)
+
+    book = []
+    for _ in range(repeats):
+        bids = [(sim.price - i - rng.random(), rng.uniform(0.1, 5)) for i in range(7)]
+        asks = [(sim.price + i + rng.random(), rng.uniform(0.1, 5)) for i in range(7)]
+        start = time.perf_counter()
+        app.orderbook_panel.update_data("BTC/USDT", bids, asks)
+        book.append(time.perf_counter() - start)
+
+    trades = []
+    for k in range(repeats):
+        rows = [("12:00:%02d" % ((k + i) % 60), "BTC", "BUY" if (k + i) % 2 else "SELL", 50000.0 + k + i, 0.5, 25000.0, "#0ECB81") for i in range(5)]
+        start = time.perf_counter()
+        app.trade_panel.update_trades(rows)
+        trades.append(time.perf_counter() - start)
+
+    # watchlist: sort all symbols again and fill the pooled rows, then scroll one row
+    from utils.decode import decode_mini_tickers
+    watchlist, scroll = [], []
+    for k in range(repeats):
+        app.market.update(decode_mini_tickers(json.loads(sim.frame("tickers"))["data"]))
+        start = time.perf_counter()
+        app.watchlist_panel.refresh()
+        watchlist.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        app.watchlist_panel.scroll_to(k % 50)
+        scroll.append(time.perf_counter() - start)
+    return {"orderbook_update": summary(book), "trades_update": summary(trades),
+            "watchlist_refresh": summary(watchlist), "watchlist_scroll": summary(scroll), "symbols": len(app.market)}
+
+# paper trading: cost of a trade tick with many resting orders, without fills and when it fills
+def bench_paper(app, orders, ticks):
+    import main
+    from utils.paper import PaperTrader
+    from utils.decode import Trade
+    rng = random.Random(5)
+    app.paper = PaperTrader(main.PAPER_FEE_RATE)
+    for i in range(orders):
+        side = "BUY" if i % 2 else "SELL"
+        offset = rng.uniform(10, 5000)
+        app.paper.submit("BTC/USDT", side, 0.01, round(50000 - offset if side == "BUY" else 50000 + offset, 2))
+
+    # the whole engine path: matching, fill notices and the account summary (posted once a second here)
+    start = time.perf_counter()
+    for k in range(ticks):
+        app.on_paper_trade("BTC/USDT", Trade(k, k * 1000, 50000 + rng.uniform(-5, 5), 0.5, rng.random() < 0.5))
+    quiet = time.perf_counter() - start
+    app.engine.bus.drain()
+
+    # every tick is an aggressive sell 10 dollars lower and fills the buys it passes, the summary is posted every tick
+    start, resting = time.perf_counter(), len(app.paper.orders)
+    for k in range(ticks):
+        app.on_paper_trade("BTC/USDT", Trade(k, k * 1000, 49990 - k * 10 % 4900, 100, False))
+        if k % 100 == 0: app.engine.bus.drain()
+    busy = time.perf_counter() - start
+    app.engine.bus.drain()
+
+    # the account summary alone
+    start = time.perf_counter()
+    for k in range(1000): app.paper.summary()
+    summary = time.perf_counter() - start
+    result = {"resting_orders": orders, "us_per_tick_no_fill": quiet / ticks * 1e6,
+              "us_per_tick_with_fills": busy / ticks * 1e6, "us_per_summary": summary / 1000 * 1e6,
+              "filled_orders": resting - len(app.paper.orders)}
+    app.paper = PaperTrader(main.PAPER_FEE_RATE)
+    return result
+
+# peak python memory over a long session of mixed messages and ui frames
+def bench_memory(app, messages, per_frame):
+    from utils.streams import StreamManager
+    sim = MarketSimulator(seed=4)
+    manager = StreamManager()
+    manager.handlers = app.stream_handlers()
+    kinds = ["tickers"] + ["trade", "trade", "trade", "kline"] * 20
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    for i in range(messages):
+        manager.on_message(sim.frame(kinds[i % len(kinds)]))
+        if i % per_frame == 0: app.engine.bus.drain()
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"messages": messages, "seconds": elapsed, "current_mb": current / 1e6, "peak_mb": peak / 1e6}
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless benchmark of the dashboard hot paths")
+    parser.add_argument("--messages", type=int, default=20000, help="messages per ingest test")
+    parser.add_argument("--repeats", type=int, default=20, help="repeats of each render test")
+    parser.add_argument("--candles", type=int, nargs="+", default=[40, 200, 1000])
+    parser.add_argument("--deep-candles", type=int, nargs="+", default=[1000, 20000, 50000], help="candles of the canvas chart test")
+    parser.add_argument("--session", type=int, default=200000, help="messages in the memory test")
+    parser.add_argument("--out", help="write json results to this file")
+    args = parser.parse_args()
+
+    root, mode = make_root()
+    if mode == "mock":
+        import components.chart
+        components.chart.FigureCanvasTkAgg = agg_canvas()
+    app = make_app(root)
+
+    results = {
+        "python": sys.version.split()[0],
+        "json": JSON_BACKEND,
+        "ui": mode,
+        "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "startup": bench_startup(args.repeats),
+        "ingest": bench_ingest(app, args.messages),
+        "dispatch": bench_dispatch(app, args.repeats * 10, 50),
+        "chart": bench_chart(app, args.candles, args.repeats),
+        "canvas_chart": bench_canvas_chart(root, args.deep_candles, args.repeats),
+        "panels": bench_panels(app, args.repeats * 10),
+        "paper": bench_paper(app, 10000, args.messages),
+        "memory": bench_memory(app, args.session, 50),
+    }
+
+    text = json.dumps(results, indent=2)
+    if args.out:
+        with open(args.out, "w") as f: f.write(text)
+    print(text)
+    if root: root.destroy()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+# components/alerts.py
+import tkinter as tk
+from datetime import datetime
+from utils.config import *
+
+# class for the alert notice at the bottom of the window
+# it never blocks like a message box: the newest alerts are shown for a few seconds, click to hide
+class AlertBanner(tk.Frame):
+    def __init__(self, parent, seconds=ALERT_SHOW_SECONDS, lines=ALERT_LINES):
+        super().__init__(parent, bg=CARD_COLOR, padx=12, pady=8, highlightbackground="#F0B90B", highlightthickness=1)
+        self.seconds = seconds
+        self.lines = [] # newest first
+        self.max_lines = lines
+        self.hide_job = None
+        self.text_label = tk.Label(self, text="", fg=TEXT_COLOR, bg=CARD_COLOR, font=FONT_MAIN, justify=tk.LEFT, anchor="w")
+        self.text_label.pack(fill=tk.BOTH)
+        for widget in (self, self.text_label): widget.bind("<Button-1>", self.hide)
+
+    # show messages on top of the older ones and start the hide timer again
+    def show(self, messages):
+        stamp = datetime.now().strftime("%H:%M:%S")
+        self.lines = [f"{stamp}  {m}" for m in reversed(messages)] + self.lines
+        del self.lines[self.max_lines:]
+        self.text_label.config(text="\n".join(self.lines))
+
+        self.place(relx=1.0, rely=1.0, anchor="se", x=-20, y=-20)
+        self.lift()
+        if self.hide_job: self.after_cancel(self.hide_job)
+        self.hide_job = self.after(self.seconds * 1000, self.hide)
+
+    def hide(self, event=None):
+        if self.hide_job: self.after_cancel(self.hide_job)
+        self.hide_job = None
+        self.lines = []
+        self.place_forget()
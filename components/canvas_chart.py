@@ -0,0 +1,249 @@
+# components/canvas_chart.py
+import tkinter as tk
+from datetime import datetime
+import numpy as np
+from utils.config import *
+from utils.candles import T, V
+from utils.indicators import make_indicator
+from utils.lod import CandlePyramid
+from components.chart_common import price_range, sub_limits, in_view
+
+AXIS_WIDTH = 70  # pixels for the price labels on the right
+TIME_HEIGHT = 18 # pixels for the time labels at the bottom
+Y_LABELS = 5
+X_LABELS = 6
+
+# class for the chart drawn directly on a tk canvas (--chart canvas)
+# it can show the whole history: the mouse wheel zooms, dragging pans, double click goes back to the newest candles.
+# candles come from a min/max pyramid (utils/lod.py) so a frame never draws more than one candle
+# per CHART_CANDLE_PX pixels whatever the zoom. canvas items are made once and only moved,
+# a live tick only moves the items of the newest candle and the indicator lines
+class CanvasChartPanel(tk.Frame):
+    def __init__(self, parent, bars=40, on_change=None):
+        super().__init__(parent, bg=CARD_COLOR, padx=10, pady=10)
+        self.bars = bars         # base candles in view (zoom)
+        self.default_bars = bars
+        self.offset = 0          # base candles right of the view (pan), 0 follows the newest candle
+        self.on_change = on_change # called when the view changed and the chart must be drawn again
+        self.pack(fill=tk.BOTH, expand=True, pady=(0, 20))
+
+        self.canvas = tk.Canvas(self, bg=CARD_COLOR, highlightthickness=0)
+        self.canvas.pack(fill=tk.BOTH, expand=True)
+
+        self.pyramid = CandlePyramid()
+        self.source = None # (series, length, newest time) the pyramid was built from
+        self.count = 0     # base candles of the last drawn series
+        self.frame_key = None  # what the last full draw showed
+        self.frame = None  # layout of the last full draw: slot width and the value range of every pane
+
+        # canvas items, made once
+        self.candles = [] # [wick, body, volume, color] for each shown candle
+        self.lines = []   # (name, output row, pane, item)
+        self.overlays = []
+        self.sub = None
+        self.y_labels = [(self.canvas.create_line(0, 0, 0, 0, fill=MUTED_COLOR, dash=(1, 3)),
+                          self.canvas.create_text(0, 0, fill=MUTED_COLOR, anchor="w", font=("Segoe UI", 8))) for _ in range(Y_LABELS)]
+        self.x_labels = [self.canvas.create_text(0, 0, fill=MUTED_COLOR, anchor="n", font=("Segoe UI", 8)) for _ in range(X_LABELS)]
+        self.title = self.canvas.create_text(4, 2, fill=MUTED_COLOR, anchor="nw", font=("Segoe UI", 8))
+        self.volume_title = self.canvas.create_text(4, 0, fill=TEXT_COLOR, anchor="nw", font=FONT_BOLD)
+        self.sub_title = self.canvas.create_text(4, 0, fill=TEXT_COLOR, anchor="nw", font=FONT_BOLD)
+
+        # zoom, pan and resize
+        self.canvas.bind("<MouseWheel>", lambda e: self.zoom(e.x, 0.8 if e.delta > 0 else 1.25))
+        self.canvas.bind("<Button-4>", lambda e: self.zoom(e.x, 0.8))
+        self.canvas.bind("<Button-5>", lambda e: self.zoom(e.x, 1.25))
+        self.canvas.bind("<ButtonPress-1>", self.start_pan)
+        self.canvas.bind("<B1-Motion>", self.pan)
+        self.canvas.bind("<Double-Button-1>", self.reset_view)
+        self.canvas.bind("<Configure>", lambda e: self.changed())
+
+    # choose the indicators drawn on the candles and the one in the pane below
+    def set_indicators(self, overlays, sub):
+        for name, row, pane, item in self.lines: self.canvas.delete(item)
+        self.lines = []
+        self.overlays = list(overlays)
+        self.sub = sub
+        for name in self.overlays + ([sub] if sub else []):
+            pane = "sub" if name == sub else "price"
+            for row in range(len(make_indicator(name).outputs)):
+                color = INDICATOR_COLORS[len(self.lines) % len(INDICATOR_COLORS)]
+                self.lines.append((name, row, pane, self.canvas.create_line(0, 0, 0, 0, fill=color, width=1, state="hidden")))
+        self.frame_key = None
+
+    # function to draw the visible part of a candle series and its IndicatorSet
+    def draw_chart(self, series, symbol, indicators=None):
+        if len(series) < 2: return
+        n = self.sync_pyramid(series)
+        width, height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        if width < 50 or height < 50: return
+
+        # visible base candles [start, stop) and the level with at most one candle per CHART_CANDLE_PX
+        self.bars = min(max(self.bars, 10), n)
+        self.offset = min(max(self.offset, 0), n - self.bars)
+        stop = n - self.offset
+        start = stop - self.bars
+        columns = max(1, (width - AXIS_WIDTH) // CHART_CANDLE_PX)
+        level = self.pyramid.level_for(self.bars, columns)
+        bars, first = self.pyramid.window(level, start, stop)
+        values = self.line_values(indicators, n, level, first, bars.shape[1])
+
+        key = (symbol, id(series), level, first, bars.shape[1], width, height, tuple(self.overlays), self.sub)
+        if key == self.frame_key and in_view(bars[:, -1], values, self.sub, self.frame["price"][:2], self.frame["volume"][0], self.frame["sub"][:2]):
+            if stop == n: self.draw_last(bars, values)
+            return
+        self.full_draw(bars, values, symbol, level, first, width, height, key)
+
+    # build the pyramid again when a candle was added or the series changed, else update its newest candles
+    def sync_pyramid(self, series):
+        n = len(series)
+        source = (series, n, series.last_time())
+
+        # a new candle while looking at older ones: keep the view where it is
+        if self.offset and self.source and self.source[0] is series and self.source[2] != source[2]: self.offset += 1
+        if self.source is None or self.source[0] is not series or self.source[1:] != source[1:]:
+            self.pyramid.build(series.last())
+            self.source = source
+            self.frame_key = None
+        else:
+            self.pyramid.update_last()
+        self.count = n
+        return n
+
+    # indicator values at the last base candle of every bucket, {name: (outputs, m)}
+    def line_values(self, indicators, n, level, first, m):
+        if indicators is None: return {}
+        index = np.minimum((np.arange(first, first + m) + 1) * 2 ** level - 1, n - 1)
+        return {name: indicators.last(name, n)[:, index] for name in self.overlays + [self.sub] if name}
+
+    # place every canvas item again
+    def full_draw(self, bars, values, symbol, level, first, width, height, key):
+        m = bars.shape[1]
+        plot_w = width - AXIS_WIDTH
+        price_bottom = height * 0.62
+        volume_top, volume_bottom = height * 0.66, height * 0.80
+        sub_top, sub_bottom = height * 0.84, height - TIME_HEIGHT
+
+        # price range with some space, overlays included
+        low, high = price_range(bars, values, self.overlays)
+        vmax = bars[V].max() * 1.2 or 1
+        sub_low, sub_high = sub_limits(self.sub, values.get(self.sub))
+
+        slot = plot_w / m
+        self.frame = {"first": first, "level": level, "slot": slot, "m": m,
+                      "price": (low, high, 20, price_bottom), "volume": (vmax, volume_top, volume_bottom),
+                      "sub": (sub_low, sub_high, sub_top, sub_bottom)}
+
+        # candles, spare items of the pool are hidden
+        while len(self.candles) < m:
+            self.candles.append([self.canvas.create_line(0, 0, 0, 0), self.canvas.create_rectangle(0, 0, 0, 0, width=0),
+                                 self.canvas.create_rectangle(0, 0, 0, 0, width=0), None])
+        for i in range(m): self.place_candle(i, bars[:, i])
+        for i in range(m, len(self.candles)):
+            for item in self.candles[i][:3]: self.canvas.itemconfig(item, state="hidden")
+            self.candles[i][3] = None
+        self.place_lines(values)
+        for name, row, pane, item in self.lines: self.canvas.tag_raise(item)
+
+        # price labels and grid lines
+        for k, (grid, label) in enumerate(self.y_labels):
+            price = low + (high - low) * (k + 0.5) / Y_LABELS
+            y = self.price_y(price)
+            self.canvas.coords(grid, 0, y, plot_w, y)
+            self.canvas.coords(label, plot_w + 4, y)
+            self.canvas.itemconfig(label, text=f"{price:,.8g}")
+
+        # time labels
+        time_format = '%m-%d' if (bars[T, -1] - bars[T, 0]) / max(m - 1, 1) * X_LABELS >= 86_400_000 else '%m-%d %H:%M'
+        for k, label in enumerate(self.x_labels):
+            i = int((k + 0.5) * m / X_LABELS)
+            self.canvas.coords(label, (i + 0.5) * slot, height - TIME_HEIGHT + 2)
+            self.canvas.itemconfig(label, text=datetime.fromtimestamp(bars[T, i] / 1000).strftime(time_format))
+
+        per_candle = f"  (1 candle = {2 ** level} bars)" if level else ""
+        self.canvas.itemconfig(self.title, text=f"{symbol}  {self.bars} bars{per_candle}" + ("  |  " + "  ".join(self.overlays) if self.overlays else ""))
+        self.canvas.coords(self.volume_title, 4, volume_top - 18)
+        self.canvas.itemconfig(self.volume_title, text=f"Volume ({symbol.split('/')[0]})")
+        self.canvas.coords(self.sub_title, 4, sub_top - 18)
+        self.canvas.itemconfig(self.sub_title, text=self.sub or "")
+        for item in (self.title, self.volume_title, self.sub_title): self.canvas.tag_raise(item)
+        self.frame_key = key
+
+    # live tick: move only the newest candle and the indicator lines
+    def draw_last(self, bars, values):
+        self.place_candle(bars.shape[1] - 1, bars[:, -1])
+        self.place_lines(values)
+
+    # move the items of candle i
+    def place_candle(self, i, bar):
+        t, o, h, l, c, v = bar.tolist()
+        wick, body, volume, color = self.candles[i]
+        x = (i + 0.5) * self.frame["slot"]
+        half = max(self.frame["slot"] * 0.35, 0.5)
+        vmax, volume_top, volume_bottom = self.frame["volume"]
+        self.canvas.coords(wick, x, self.price_y(h), x, self.price_y(l))
+        self.canvas.coords(body, x - half, self.price_y(max(o, c)), x + half, self.price_y(min(o, c)) + 1)
+        self.canvas.coords(volume, x - half, volume_bottom - v / vmax * (volume_bottom - volume_top), x + half, volume_bottom)
+
+        new_color = GREEN_COLOR if c >= o else RED_COLOR
+        if new_color != color:
+            self.canvas.itemconfig(wick, fill=new_color, state="normal")
+            self.canvas.itemconfig(body, fill=new_color, state="normal")
+            self.canvas.itemconfig(volume, fill=new_color, state="normal")
+            self.candles[i][3] = new_color
+
+    # one polyline for each indicator output, nan values are left out
+    def place_lines(self, values):
+        slot = self.frame["slot"]
+        for name, row, pane, item in self.lines:
+            vals = values.get(name)
+            if vals is None:
+                self.canvas.itemconfig(item, state="hidden")
+                continue
+            ys = vals[row]
+            ok = ~np.isnan(ys)
+            if ok.sum() < 2:
+                self.canvas.itemconfig(item, state="hidden")
+                continue
+            xs = (np.flatnonzero(ok) + 0.5) * slot
+            ys = self.price_y(ys[ok]) if pane == "price" else self.sub_y(ys[ok])
+            self.canvas.coords(item, *np.column_stack([xs, ys]).ravel().tolist())
+            self.canvas.itemconfig(item, state="normal")
+
+    def price_y(self, price):
+        low, high, top, bottom = self.frame["price"]
+        return bottom - (price - low) / (high - low) * (bottom - top)
+
+    def sub_y(self, value):
+        low, high, top, bottom = self.frame["sub"]
+        return bottom - (value - low) / (high - low) * (bottom - top)
+
+    # zoom around the mouse: the candle under it stays where it is
+    def zoom(self, x, factor):
+        if not self.count: return
+        plot_w = max(self.canvas.winfo_width() - AXIS_WIDTH, 1)
+        frac = min(max(x / plot_w, 0), 1)
+        stop = self.count - self.offset
+        under = stop - self.bars * (1 - frac)
+        self.bars = int(min(max(self.bars * factor, 10), self.count))
+        self.offset = int(round(self.count - (under + self.bars * (1 - frac))))
+        self.changed()
+
+    def start_pan(self, event):
+        self.pan_start = (event.x, self.offset)
+
+    # dragging right shows older candles
+    def pan(self, event):
+        if not self.count: return
+        x, offset = self.pan_start
+        plot_w = max(self.canvas.winfo_width() - AXIS_WIDTH, 1)
+        self.offset = int(offset + (event.x - x) / plot_w * self.bars)
+        self.changed()
+
+    # back to the newest candles at the first zoom
+    def reset_view(self, event=None):
+        self.bars, self.offset = self.default_bars, 0
+        self.changed()
+
+    def changed(self):
+        self.frame_key = None
+        if self.on_change: self.on_change()
@@ -1,114 +1,240 @@
 # components/chart.py
 import tkinter as tk
 from datetime import datetime
+import numpy as np
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.lines import Line2D
 import matplotlib.gridspec as gridspec
 from utils.config import *
+from utils.candles import T, O, H, L, C, V
+from utils.indicators import make_indicator
+from components.chart_common import price_range, sub_limits, in_view
 
 # class for showing graph on top right
+# candle, wick and volume artists are made once, later we only change their data.
+# a live tick of the newest candle is drawn with blitting, the full chart is
+# drawn again only when a new candle opens, the price leaves the axis or the window resizes
+# indicator lines work the same way: the newest segment of every line is an animated artist
 class ChartPanel(tk.Frame):
-    def __init__(self, parent):
+    def __init__(self, parent, bars=40, on_change=None):
         super().__init__(parent, bg=CARD_COLOR, padx=10, pady=10)
+        self.bars = bars # candles shown on the chart
+        self.on_change = on_change # called when the chart must be drawn again (resize)
         self.pack(fill=tk.BOTH, expand=True, pady=(0, 20))
-        
+
         # setup matplotlib figure
-        self.fig = Figure(figsize=(5, 3.2), dpi=100) 
+        self.fig = Figure(figsize=(5, 3.2), dpi=100)
         self.fig.patch.set_facecolor(CARD_COLOR)
-        
-        # split into 2 graphs (price and volume)
-        gs = gridspec.GridSpec(2, 1, height_ratios=[3, 1.2]) 
+
+        # split into 3 graphs (price, volume and one indicator pane)
+        gs = gridspec.GridSpec(3, 1, height_ratios=[3, 1, 1])
         self.ax1 = self.fig.add_subplot(gs[0])
         self.ax2 = self.fig.add_subplot(gs[1], sharex=self.ax1)
-        
+        self.ax3 = self.fig.add_subplot(gs[2], sharex=self.ax1)
+        self.style_axes()
+
+        # artists for all candles except the newest one
+        self.wicks = LineCollection([], linewidths=1)
+        self.bodies = PolyCollection([], linewidths=0)
+        self.volumes = PolyCollection([], linewidths=0, alpha=0.5)
+
+        # artists for the newest candle, only drawn by blitting
+        self.last_wick = LineCollection([], linewidths=1, animated=True)
+        self.last_body = PolyCollection([], linewidths=0, animated=True)
+        self.last_volume = PolyCollection([], linewidths=0, alpha=0.5, animated=True)
+
+        for artist in (self.wicks, self.bodies, self.last_wick, self.last_body):
+            self.ax1.add_collection(artist, autolim=False)
+        for artist in (self.volumes, self.last_volume):
+            self.ax2.add_collection(artist, autolim=False)
+
+        self.volume_text = self.fig.text(0, 0, "", color=TEXT_COLOR, fontsize=11, fontweight='bold', ha='left', va='bottom')
+        self.sub_text = self.fig.text(0, 0, "", color=TEXT_COLOR, fontsize=11, fontweight='bold', ha='left', va='bottom')
+        self.overlay_text = self.ax1.text(0.01, 0.97, "", color=MUTED_COLOR, fontsize=8, ha='left', va='top', transform=self.ax1.transAxes)
+
+        # indicator lines: (name, output row, axis, line without the newest bar, newest segment)
+        self.lines = []
+        self.overlays = []
+        self.sub = None
+
         # create canvas for tkinter
         self.canvas = FigureCanvasTkAgg(self.fig, self)
+        self.background = None # picture of the chart without the newest candle
+        self.chart_key = None  # what the last full redraw showed
+        self.canvas.mpl_connect("draw_event", self.on_draw)
+        self.canvas.mpl_connect("resize_event", self.on_resize)
         self.canvas.draw()
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
 
-    # function to draw graph
-    def draw_chart(self, chart_data, symbol): 
-        if len(chart_data) < 2: return 
-        
-        self.ax1.clear()
-        self.ax2.clear()
-        self.fig.texts.clear()
-        
-        # use only last 40 data points
-        data = chart_data[-40:] 
-        indexes = range(len(data))
-        
-        times = []
-        opens = []
-        closes = []
-        highs = []
-        lows = []
-        volumes = []
-
-        #Loop through each data point
-        for d in data:
-            # Convert timestamp
-            time_obj = datetime.fromtimestamp(d['t']/1000)
-            times.append(time_obj.strftime('%H:%M'))
-            
-            # Store price and volume data
-            opens.append(d['o'])
-            closes.append(d['c'])
-            highs.append(d['h'])
-            lows.append(d['l'])
-            volumes.append(d['v'])
-        
-        #Loop to determine colors (Green if Close >= Open, else Red)
-        colors = []
-        for i in range(len(data)):
-            if closes[i] >= opens[i]:
-                colors.append(GREEN_COLOR)
-            else:
-                colors.append(RED_COLOR)
-        
-        # draw price lines (Wicks)
-        self.ax1.vlines(x=indexes, ymin=lows, ymax=highs, color=colors, linewidth=1)
-        
-        # Loop to draw candlestick bodies
-        for i in range(len(data)):
-            o = opens[i]
-            c = closes[i]
-            
-            height = abs(c - o)
-            lower = min(o, c)
-            
-            # If Open and Close prices are equal, set a minimum height for visibility
-            if height == 0: 
-                height = lower * 0.00001 
-            
-            self.ax1.bar(i, height, bottom=lower, color=colors[i], width=0.6) 
-            
-        # style the chart 1
-        self.ax1.grid(color=MUTED_COLOR, linestyle=':', linewidth=0.5, alpha=0.2)
-        self.ax1.set_facecolor(CARD_COLOR)
-        self.ax1.tick_params(colors='white', bottom=False, labelbottom=False) 
-        for spine in self.ax1.spines.values(): spine.set_color(MUTED_COLOR)
-
-        # draw volume graph
-        self.ax2.bar(indexes, volumes, color=colors, width=0.6, alpha=0.5)
-        self.ax2.grid(color=MUTED_COLOR, linestyle=':', linewidth=0.5, alpha=0.2)
-        self.ax2.set_facecolor(CARD_COLOR)
-        
-        # x-axis time label
-        step = 5 
-        self.ax2.set_xticks(list(indexes)[::step])
-        self.ax2.set_xticklabels(times[::step])
-        self.ax2.tick_params(colors='white', bottom=False, labelbottom=True)
-        for spine in self.ax2.spines.values():
-            spine.set_visible(True)
-            spine.set_color(MUTED_COLOR)
+    # style the chart once, the axes are never cleared
+    def style_axes(self):
+        for ax in (self.ax1, self.ax2, self.ax3):
+            ax.grid(color=MUTED_COLOR, linestyle=':', linewidth=0.5, alpha=0.2)
+            ax.set_facecolor(CARD_COLOR)
+            for spine in ax.spines.values():
+                spine.set_visible(True)
+                spine.set_color(MUTED_COLOR)
+        self.ax1.tick_params(colors='white', bottom=False, labelbottom=False)
+        self.ax2.tick_params(colors='white', bottom=False, labelbottom=False)
+        self.ax3.tick_params(colors='white', bottom=False, labelbottom=True)
+
+    # choose the indicators drawn on the candles and the one in the pane below
+    def set_indicators(self, overlays, sub):
+        for name, row, ax, line, last_line in self.lines:
+            line.remove()
+            last_line.remove()
+        self.lines = []
+        self.overlays = list(overlays)
+        self.sub = sub
+
+        for name in self.overlays + ([sub] if sub else []):
+            ax = self.ax3 if name == sub else self.ax1
+            for row in range(len(make_indicator(name).outputs)):
+                color = INDICATOR_COLORS[len(self.lines) % len(INDICATOR_COLORS)]
+                line = Line2D([], [], color=color, linewidth=1)
+                last_line = Line2D([], [], color=color, linewidth=1, animated=True)
+                ax.add_line(line)
+                ax.add_line(last_line)
+                self.lines.append((name, row, ax, line, last_line))
+
+        self.overlay_text.set_text("  ".join(self.overlays))
+        self.chart_key = None
+
+    # function to draw graph from a candle series and its IndicatorSet
+    def draw_chart(self, series, symbol, indicators=None):
+        if len(series) < 2: return
+
+        # use only last data points (a view, no copy)
+        data = series.last(self.bars)
+        last = data[:, -1]
+        n = data.shape[1]
+        values = {name: indicators.last(name, n) for name in self.overlays + [self.sub] if name} if indicators else {}
+        key = (symbol, data[T, 0], data[T, 1], last[T], n, bool(values))
+
+        if key != self.chart_key or self.background is None or not in_view(last, values, self.sub, self.ax1.get_ylim(), self.ax2.get_ylim()[1], self.ax3.get_ylim()):
+            self.full_redraw(data, symbol, key, values)
+        else:
+            self.set_last_candle(n - 1, last)
+            self.set_last_lines(values, n)
+            self.blit()
+
+    # draw every candle again and save the background for blitting
+    def full_redraw(self, data, symbol, key, values):
+        n = data.shape[1]
+        t, o, h, l, c, v = data
+        x = np.arange(n, dtype=float)
+
+        # change geometry of old candles (all except the newest one)
+        colors = self.candle_colors(o[:-1], c[:-1])
+        self.wicks.set_segments(self.wick_segments(x[:-1], l[:-1], h[:-1]))
+        self.wicks.set_color(colors)
+        self.bodies.set_verts(self.body_verts(x[:-1], o[:-1], c[:-1]))
+        self.bodies.set_facecolor(colors)
+        self.volumes.set_verts(self.body_verts(x[:-1], np.zeros(n - 1), v[:-1]))
+        self.volumes.set_facecolor(colors)
+        self.set_last_candle(n - 1, data[:, -1])
+
+        # indicator lines without the newest bar
+        for name, row, ax, line, last_line in self.lines:
+            if name in values: line.set_data(x[:-1], values[name][row, :-1])
+            else: line.set_data([], [])
+        self.set_last_lines(values, n)
+
+        # axis ranges
+        self.ax1.set_xlim(-1, n)
+        self.ax1.set_ylim(*price_range(data, values, self.overlays))
+        self.ax2.set_ylim(0, v.max() * 1.2 or 1)
+        self.ax3.set_ylim(*sub_limits(self.sub, values.get(self.sub)))
+
+        # x-axis time label (date for daily candles)
+        step = max(5, n // 8)
+        time_format = '%m-%d' if t[1] - t[0] >= 86_400_000 else '%H:%M'
+        self.ax3.set_xticks(x[::step])
+        self.ax3.set_xticklabels([datetime.fromtimestamp(i / 1000).strftime(time_format) for i in t[::step]])
 
         self.fig.tight_layout()
-        self.fig.subplots_adjust(hspace=0.6) 
-        
+        self.fig.subplots_adjust(hspace=0.5)
+
         # put text volume
         unit_name = symbol.split("/")[0]
         bbox = self.ax2.get_position()
-        self.fig.text(0, bbox.y1 + 0.08, f"Volume ({unit_name})", color=TEXT_COLOR, fontsize=11, fontweight='bold', ha='left', va='bottom')
-        
-        self.canvas.draw()
\ No newline at end of file
+        self.volume_text.set_position((0, bbox.y1 + 0.02))
+        self.volume_text.set_text(f"Volume ({unit_name})")
+        bbox = self.ax3.get_position()
+        self.sub_text.set_position((0, bbox.y1 + 0.02))
+        self.sub_text.set_text(self.sub or "")
+
+        self.chart_key = key
+        self.canvas.draw()
+
+    # change the artists of the newest candle
+    def set_last_candle(self, i, d):
+        x = np.array([i], dtype=float)
+        o, h, l, c, v = (d[k:k + 1] for k in (O, H, L, C, V))
+        colors = self.candle_colors(o, c)
+        self.last_wick.set_segments(self.wick_segments(x, l, h))
+        self.last_wick.set_color(colors)
+        self.last_body.set_verts(self.body_verts(x, o, c))
+        self.last_body.set_facecolor(colors)
+        self.last_volume.set_verts(self.body_verts(x, np.zeros(1), v))
+        self.last_volume.set_facecolor(colors)
+
+    # change the newest segment (last two bars) of every indicator line
+    def set_last_lines(self, values, n):
+        x = np.array([n - 2, n - 1], dtype=float)
+        for name, row, ax, line, last_line in self.lines:
+            if name in values: last_line.set_data(x, values[name][row, -2:])
+            else: last_line.set_data([], [])
+
+    # redraw only the newest candle on top of the saved background
+    def blit(self):
+        self.canvas.restore_region(self.background)
+        self.draw_animated()
+        self.canvas.blit(self.fig.bbox)
+
+    def draw_animated(self):
+        self.ax1.draw_artist(self.last_wick)
+        self.ax1.draw_artist(self.last_body)
+        self.ax2.draw_artist(self.last_volume)
+        for name, row, ax, line, last_line in self.lines:
+            ax.draw_artist(last_line)
+
+    # after every full draw save the picture and put the newest candle on it
+    def on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self.draw_animated()
+
+    # size changed, layout must be made again on the next update
+    def on_resize(self, event):
+        self.chart_key = None
+        if self.on_change: self.on_change()
+
+    # green if close >= open, else red
+    def candle_colors(self, opens, closes):
+        return np.where(closes >= opens, GREEN_COLOR, RED_COLOR)
+
+    # one vertical line from low to high for each candle
+    def wick_segments(self, x, lows, highs):
+        segments = np.empty((len(x), 2, 2))
+        segments[:, 0, 0] = x
+        segments[:, 0, 1] = lows
+        segments[:, 1, 0] = x
+        segments[:, 1, 1] = highs
+        return segments
+
+    # one rectangle from start to end value for each candle
+    def body_verts(self, x, starts, ends):
+        lower = np.minimum(starts, ends)
+        height = np.abs(ends - starts)
+
+        # If Open and Close prices are equal, set a minimum height for visibility
+        height = np.where(height == 0, lower * 0.00001, height)
+
+        verts = np.empty((len(x), 4, 2))
+        verts[:, 0] = np.column_stack([x - 0.3, lower])
+        verts[:, 1] = np.column_stack([x - 0.3, lower + height])
+        verts[:, 2] = np.column_stack([x + 0.3, lower + height])
+        verts[:, 3] = np.column_stack([x + 0.3, lower])
+        return verts
@@ -0,0 +1,34 @@
+# components/chart_common.py
+import numpy as np
+from utils.candles import L, H, V
+from utils.indicators import make_indicator
+
+# y range of the price pane with some space so small moves of the newest candle fit, overlays included
+def price_range(bars, values, overlays):
+    low, high = bars[L].min(), bars[H].max()
+    for name in overlays:
+        if name in values and not np.isnan(values[name]).all():
+            low, high = min(low, np.nanmin(values[name])), max(high, np.nanmax(values[name]))
+    pad = (high - low) * 0.1 or high * 0.001
+    return low - pad, high + pad
+
+# y range of the indicator pane, fixed when the indicator has limits (rsi)
+def sub_limits(sub, values):
+    limits = make_indicator(sub).limits if sub else None
+    if limits: return limits
+    if values is None or np.isnan(values).all(): return 0, 1
+    low, high = np.nanmin(values), np.nanmax(values)
+    pad = (high - low) * 0.1 or abs(high) * 0.1 or 1
+    return low - pad, high + pad
+
+# check the newest candle and the newest indicator values still fit in the panes,
+# price and sub are (low, high) of their pane, volume is the top of the volume pane
+def in_view(bar, values, sub, price, volume, sub_range):
+    low, high = price
+    if not (bar[L] >= low and bar[H] <= high and bar[V] <= volume): return False
+    for name, vals in values.items():
+        low, high = sub_range if name == sub else price
+        newest = vals[:, -1]
+        newest = newest[~np.isnan(newest)]
+        if ((newest < low) | (newest > high)).any(): return False
+    return True
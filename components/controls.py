@@ -1,21 +1,24 @@
 # components/controls.py
 import tkinter as tk
-from tkinter import messagebox
 from utils.config import *
 
 # class for button buy and sell
+# buy / sell choose the side, confirm sends (side, price, qty) to on_order (price None = market order)
 class ControlPanel(tk.Frame):
-    def __init__(self, parent, on_buy, on_sell, on_watchlist):
+    def __init__(self, parent, on_buy, on_sell, on_watchlist, on_alert=None, on_order=None, on_cancel=None):
         super().__init__(parent, bg=BG_COLOR)
+        self.on_order = on_order
+        self.side = "BUY"
         self.pack(fill=tk.X, pady=(0, 10))
         self.grid_columnconfigure(1, weight=1) 
 
         bt_area = tk.Frame(self, bg=BG_COLOR)
         bt_area.grid(row=0, column=0, sticky="w")
         
-        tk.Button(bt_area, text="BUY LONG", bg=GREEN_COLOR, fg="white", font=FONT_BOLD, width=12, command=on_buy).pack(side=tk.LEFT, padx=5)
-        tk.Button(bt_area, text="SELL SHORT", bg=RED_COLOR, fg="white", font=FONT_BOLD, width=12, command=on_sell).pack(side=tk.LEFT, padx=5)
+        tk.Button(bt_area, text="BUY LONG", bg=GREEN_COLOR, fg="white", font=FONT_BOLD, width=12, command=lambda: self.choose_side("BUY", on_buy)).pack(side=tk.LEFT, padx=5)
+        tk.Button(bt_area, text="SELL SHORT", bg=RED_COLOR, fg="white", font=FONT_BOLD, width=12, command=lambda: self.choose_side("SELL", on_sell)).pack(side=tk.LEFT, padx=5)
         tk.Button(bt_area, text="+ Watchlist", bg="#4F46E5", fg="white", font=FONT_BOLD, width=12, command=on_watchlist).pack(side=tk.LEFT, padx=5)
+        if on_alert: tk.Button(bt_area, text="+ Alert", bg="#374151", fg="white", font=FONT_BOLD, width=8, command=on_alert).pack(side=tk.LEFT, padx=5)
 
         # input box on right side
         form = tk.Frame(self, bg=CARD_COLOR, padx=15, pady=5)
@@ -32,25 +35,65 @@ class ControlPanel(tk.Frame):
         self.total_label = tk.Label(form, text="Total: $0.00", fg=GREEN_COLOR, bg=CARD_COLOR, font=FONT_MAIN, width=15)
         self.total_label.pack(side=tk.LEFT, padx=10)
         
-        tk.Button(form, text="Confirm", bg="#6B7280", fg="white", command=self.confirm_order).pack(side=tk.LEFT, padx=5)
+        self.var_market = tk.BooleanVar(value=False)
+        tk.Checkbutton(form, text="Market", variable=self.var_market, fg=MUTED_COLOR, bg=CARD_COLOR, selectcolor=BG_COLOR,
+                       activebackground=CARD_COLOR, command=self.calculate_total).pack(side=tk.LEFT, padx=5)
+        self.confirm_button = tk.Button(form, text="Confirm BUY", bg=GREEN_COLOR, fg="white", width=11, command=self.confirm_order)
+        self.confirm_button.pack(side=tk.LEFT, padx=5)
+
+        # paper trading position of the current coin and account pnl
+        status = tk.Frame(self, bg=BG_COLOR)
+        status.grid(row=1, column=0, columnspan=3, sticky="ew", pady=(8, 0))
+        self.position_label = tk.Label(status, text="No position", fg=MUTED_COLOR, bg=BG_COLOR, font=FONT_MAIN, anchor="w")
+        self.position_label.pack(side=tk.LEFT, padx=5)
+        if on_cancel: tk.Button(status, text="Cancel orders", bg="#374151", fg="white", command=on_cancel).pack(side=tk.RIGHT, padx=5)
         
         # check when typing to calculate
         self.price_entry.bind("<KeyRelease>", self.calculate_total)
         self.qty_entry.bind("<KeyRelease>", self.calculate_total)
 
+    # side of the next order
+    def choose_side(self, side, callback):
+        self.side = side
+        self.confirm_button.config(text=f"Confirm {side}", bg=GREEN_COLOR if side == "BUY" else RED_COLOR)
+        callback()
+
+    # send the order in the boxes, a market order has no price
     def confirm_order(self):
-        messagebox.showinfo("Order", "Order Submitted")
+        qty = self.entered_qty()
+        price = None if self.var_market.get() else self.entered_price()
+        if not qty or qty <= 0 or (price is not None and price <= 0) or (price is None and not self.var_market.get()):
+            self.total_label.config(text="Invalid", fg=RED_COLOR)
+            return
+        if self.on_order: self.on_order(self.side, price, qty)
 
     # calculate total money = price * quantity
     def calculate_total(self, event=None):
+        if self.var_market.get():
+            self.total_label.config(text="Market", fg=GREEN_COLOR)
+            return
         try:
             p = float(self.price_entry.get())
             q = float(self.qty_entry.get())
             self.total_label.config(text=f"Total: ${p*q:,.2f}", fg=GREEN_COLOR)
         except: self.total_label.config(text="Invalid", fg=RED_COLOR)
 
-    # put price automatically
-    def fill_price(self, price):
+    # quantity typed in the box, None if it is not a number
+    def entered_qty(self):
+        try: return float(self.qty_entry.get())
+        except ValueError: return None
+
+    # show the paper trading position
+    def update_position(self, text, color=MUTED_COLOR):
+        self.position_label.config(text=text, fg=color)
+
+    # price typed in the box, None if it is not a number
+    def entered_price(self):
+        try: return float(self.price_entry.get())
+        except ValueError: return None
+
+    # put price automatically, decimals of the tick size of the symbol (no thousands separator, it must parse)
+    def fill_price(self, price, decimals=2):
         self.price_entry.delete(0, tk.END)
-        self.price_entry.insert(0, f"{price:.2f}")
+        self.price_entry.insert(0, f"{price:.{decimals}f}")
         self.calculate_total()
\ No newline at end of file
@@ -1,15 +1,23 @@
 # components/history.py
 import tkinter as tk
 from utils.config import *
+from components.ticker import format_price
 
 # class for history trade on the right
+# row widgets are made once, an update only changes cells whose text or color changed
 class TradeHistoryPanel(tk.Frame):
-    def __init__(self, parent):
+    def __init__(self, parent, rows=5):
         super().__init__(parent, bg=CARD_COLOR, height=220)
         self.pack(fill=tk.X, pady=(0, 20))
         self.pack_propagate(False) 
         
-        tk.Label(self, text="Recent Transactions", fg=TEXT_COLOR, bg=CARD_COLOR, font=("Segoe UI", 16, "bold")).pack(anchor="w", padx=15, pady=10)
+        title_bar = tk.Frame(self, bg=CARD_COLOR)
+        title_bar.pack(fill=tk.X, padx=15, pady=10)
+        tk.Label(title_bar, text="Recent Transactions", fg=TEXT_COLOR, bg=CARD_COLOR, font=("Segoe UI", 16, "bold")).pack(side=tk.LEFT)
+
+        # rolling stats from the trade tape
+        self.stats_label = tk.Label(title_bar, text="", fg=MUTED_COLOR, bg=CARD_COLOR, font=FONT_MAIN)
+        self.stats_label.pack(side=tk.RIGHT)
         
         self.table_frame = tk.Frame(self, bg=CARD_COLOR, padx=15)
         self.table_frame.pack(fill=tk.BOTH, expand=True)
@@ -25,22 +33,46 @@ class TradeHistoryPanel(tk.Frame):
             tk.Label(self.table_frame, text=header, fg=MUTED_COLOR, bg=CARD_COLOR, 
                      font=("Segoe UI", 11, "bold"), anchor="w").grid(row=0, column=i, sticky="ew", pady=(0, 5))
 
+        # create label for every cell once
+        self.cells = []  # labels of each row
+        self.cache = []  # (text, color) shown in each label
+        for row_index in range(1, rows + 1):
+            labels = []
+            for col_index in range(len(self.headers)):
+                label = tk.Label(self.table_frame, text="", fg=TEXT_COLOR, bg=CARD_COLOR, 
+                                 font=("Segoe UI", 11), anchor="w")
+                label.grid(row=row_index, column=col_index, sticky="ew")
+                labels.append(label)
+            self.cells.append(labels)
+            self.cache.append([None] * len(labels))
+
     # add new data to table
     def update_trades(self, trade_list):
-        # delete old rows
-        for widget in self.table_frame.winfo_children():
-            info = widget.grid_info()
-            if 'row' in info and int(info['row']) > 0:
-                widget.destroy()
-        
-        # loop to make label
-        for i, (time, sym, side, price, amount, total, color) in enumerate(trade_list):
-            row_index = i + 1
-            values = [time, sym, side, f"{price:,.2f}", f"{amount:.4f}", f"{total:,.2f}"]
-            
+        for i, labels in enumerate(self.cells):
+            cache = self.cache[i]
+
+            # empty row if there are less trades than rows
+            if i >= len(trade_list):
+                for col_index, label in enumerate(labels):
+                    if cache[col_index] is not None:
+                        cache[col_index] = None
+                        label.config(text="")
+                continue
+
+            time, sym, side, price, amount, total, color = trade_list[i]
+            values = [time, sym, side, format_price(price), f"{amount:.4f}", f"{total:,.2f}"]
+
             for col_index, val in enumerate(values):
                 # check color for buy or sell
                 text_color = color if col_index == 2 else (MUTED_COLOR if col_index==0 or col_index==5 else TEXT_COLOR)
-                
-                tk.Label(self.table_frame, text=val, fg=text_color, bg=CARD_COLOR, 
-                         font=("Segoe UI", 11), anchor="w").grid(row=row_index, column=col_index, sticky="ew")
\ No newline at end of file
+
+                # only change the label if text or color changed
+                if cache[col_index] != (val, text_color):
+                    cache[col_index] = (val, text_color)
+                    labels[col_index].config(text=val, fg=text_color)
+
+    # show rolling stats of the trade tape
+    def update_stats(self, window, stats):
+        buy_percent = (stats['imbalance'] + 1) * 50
+        vwap = format_price(stats['vwap']) if stats['vwap'] else "-"
+        self.stats_label.config(text=f"{window}s: {stats['trades_per_sec']:.1f} trades/s   Buy {buy_percent:.0f}%   VWAP {vwap}")
@@ -1,10 +1,12 @@
 # components/orderbook.py
 import tkinter as tk
 from utils.config import *
+from components.ticker import format_price
 
 # class for buy and sell list (bottom left)
+# row widgets are made once, an update only changes cells whose text or color changed
 class OrderBookPanel(tk.Frame):
-    def __init__(self, parent):
+    def __init__(self, parent, levels=7):
         super().__init__(parent, bg=CARD_COLOR, padx=15, pady=15)
         self.pack(fill=tk.BOTH, expand=True)
         
@@ -22,38 +24,54 @@ class OrderBookPanel(tk.Frame):
         # frame container for data rows
         self.data_container = tk.Frame(self, bg=CARD_COLOR)
         self.data_container.pack(fill=tk.BOTH, expand=True)
-        tk.Label(self.data_container, text="Waiting...", fg=MUTED_COLOR, bg=CARD_COLOR).pack(pady=20)
+        self.waiting_label = tk.Label(self.data_container, text="Waiting...", fg=MUTED_COLOR, bg=CARD_COLOR)
+        self.waiting_label.pack(pady=20)
+
+        # create all rows once (asks on top, bids below)
+        self.levels = levels
+        self.rows = []   # frame of each row
+        self.cells = []  # 4 labels of each row
+        self.cache = []  # (text, color) shown in each label
+        for i in range(levels * 2):
+            row = tk.Frame(self.data_container, bg=CARD_COLOR)
+            labels = []
+            for width in self.column_widths:
+                label = tk.Label(row, text="", fg=TEXT_COLOR, bg=CARD_COLOR, width=width, anchor="w")
+                label.pack(side=tk.LEFT, padx=5)
+                labels.append(label)
+            self.rows.append(row)
+            self.cells.append(labels)
+            self.cache.append([None] * len(labels))
+        self.is_shown = False
 
     # update new data to table
     def update_data(self, symbol, bids, asks):
-        # remove old data
-        for widget in self.data_container.winfo_children(): 
-            widget.destroy()
-            
+        # show rows instead of waiting text the first time
+        if not self.is_shown:
+            self.waiting_label.pack_forget()
+            for row in self.rows: row.pack(fill=tk.X, pady=1)
+            self.is_shown = True
+
         short_name = symbol.replace("/USDT", "")
+        n = self.levels
 
-        # function to create one row
-        def add_row(price, qty, side, color):
-            row = tk.Frame(self.data_container, bg=CARD_COLOR)
-            row.pack(fill=tk.X, pady=1)
-            try: 
-                price_text = f"{float(price):,.2f}"
-                qty_text = f"{float(qty):.4f}"
-            except: 
-                price_text, qty_text = str(price), str(qty)
-            
-            # add label to each column
-            tk.Label(row, text=short_name, fg=MUTED_COLOR, bg=CARD_COLOR, width=self.column_widths[0], anchor="w").pack(side=tk.LEFT, padx=5)
-            tk.Label(row, text=price_text, fg=color, bg=CARD_COLOR, width=self.column_widths[1], anchor="w").pack(side=tk.LEFT, padx=5)
-            tk.Label(row, text=qty_text, fg=TEXT_COLOR, bg=CARD_COLOR, width=self.column_widths[2], anchor="w").pack(side=tk.LEFT, padx=5)
-            tk.Label(row, text=side, fg=color, bg=CARD_COLOR, width=self.column_widths[3], anchor="w").pack(side=tk.LEFT, padx=5)
-
-        # show sell list (top 7)
-        current_asks = asks[:7][::-1] 
-        while len(current_asks) < 7: current_asks.insert(0, ["Wait", "0.0"]) 
-        for p, q in current_asks: add_row(p, q, "SELL", RED_COLOR)
+        # show sell list (top 7, best ask at the bottom)
+        current_asks = list(asks[:n])[::-1]
+        for i in range(n - len(current_asks)): self.set_row(i, short_name, "Wait", "0.0", "SELL", RED_COLOR)
+        for i, (p, q) in enumerate(current_asks, n - len(current_asks)): self.set_row(i, short_name, format_price(p), f"{q:.4f}", "SELL", RED_COLOR)
 
         # show buy list (top 7)
-        current_bids = bids[:7]
-        while len(current_bids) < 7: current_bids.append(["Wait", "0.0"])
-        for p, q in current_bids: add_row(p, q, "BUY", GREEN_COLOR)
\ No newline at end of file
+        current_bids = list(bids[:n])
+        for i, (p, q) in enumerate(current_bids, n): self.set_row(i, short_name, format_price(p), f"{q:.4f}", "BUY", GREEN_COLOR)
+        for i in range(n + len(current_bids), n * 2): self.set_row(i, short_name, "Wait", "0.0", "BUY", GREEN_COLOR)
+
+    # change the labels of one row, only cells that changed are configured
+    # prices and amounts are already floats from the local book, they are only formatted here
+    def set_row(self, i, short_name, price_text, qty_text, side, color):
+        values = ((short_name, MUTED_COLOR), (price_text, color), (qty_text, TEXT_COLOR), (side, color))
+        cache = self.cache[i]
+        labels = self.cells[i]
+        for col, value in enumerate(values):
+            if cache[col] != value:
+                cache[col] = value
+                labels[col].config(text=value[0], fg=value[1])
\ No newline at end of file
@@ -0,0 +1,39 @@
+# components/stats.py
+import tkinter as tk
+from utils.config import *
+
+# class for the stats overlay on top of the window (toggle with F12)
+class StatsOverlay(tk.Frame):
+    def __init__(self, parent):
+        super().__init__(parent, bg=CARD_COLOR, padx=10, pady=10, highlightbackground=MUTED_COLOR, highlightthickness=1)
+        tk.Label(self, text="Stats (F12)", fg=TEXT_COLOR, bg=CARD_COLOR, font=FONT_BOLD, anchor="w").pack(fill=tk.X, pady=(0, 5))
+        self.text_label = tk.Label(self, text="", fg=MUTED_COLOR, bg=CARD_COLOR, font=("Consolas", 9), justify=tk.LEFT, anchor="nw")
+        self.text_label.pack(fill=tk.BOTH)
+        self.is_visible = False
+
+    # show or hide the overlay
+    def toggle(self, event=None):
+        if self.is_visible:
+            self.place_forget()
+        else:
+            self.place(relx=1.0, rely=0.0, anchor="ne", x=-20, y=70)
+            self.lift()
+        self.is_visible = not self.is_visible
+
+    # show a metrics snapshot as a text table
+    def update_stats(self, snapshot):
+        lines = [f"{'metric':<28}{'count':>8}{'p50':>9}{'p95':>9}{'max':>9}"]
+        for name, s in snapshot["histograms"].items():
+            lines.append(f"{name:<28}{s['count']:>8}{s['p50']:>9.2f}{s['p95']:>9.2f}{s['max']:>9.2f}")
+
+        lines.append("")
+        for name, value in {**snapshot["counters"], **snapshot["gauges"]}.items():
+            lines.append(f"{name:<28}{value:>8}")
+
+        if snapshot["errors"]:
+            lines.append("")
+            lines.append("errors")
+            for where, e in snapshot["errors"].items():
+                lines.append(f"{where:<20}{e['count']:>6}  {e['last'][:50]}")
+
+        self.text_label.config(text="\n".join(lines))
@@ -2,59 +2,186 @@
 import tkinter as tk
 from utils.config import *
 
-# class for show list of coins on top left
+STAR_COLOR = "#F0B90B"
+
+# short text for a price of any size
+def format_price(price):
+    if price >= 100: return f"{price:,.2f}"
+    if price >= 1: return f"{price:,.4f}"
+    return f"{price:.8f}".rstrip("0") if price else "..."
+
+# decimals format_price shows, used when the tick size of a symbol is not known
+def price_decimals(price):
+    return 2 if price >= 100 else 4 if price >= 1 else 8
+
+# short text for a quote volume (e.g. 12.5M)
+def format_volume(volume):
+    for size, unit in ((1e9, "B"), (1e6, "M"), (1e3, "K")):
+        if volume >= size: return f"{volume / size:,.1f}{unit}"
+    return f"{volume:,.0f}"
+
+# class for the list of coins on top left
+# only `rows` rows of widgets are made once, scrolling moves market rows through them
+# click a column title to sort, click a row to show the coin, click the star to add it to the watchlist
 class WatchlistPanel(tk.Frame):
-    def __init__(self, parent):
+    def __init__(self, parent, rows=WATCHLIST_ROWS, on_select=None, on_star=None):
         super().__init__(parent, bg=CARD_COLOR, padx=15, pady=15)
         self.pack(fill=tk.X, pady=(0, 20))
-        self.price_labels = {} # dictionary to save label for update later
-
-    # create row for each coin in list
-    def create_rows(self, coin_list):
-        # delete old items
-        for widget in self.winfo_children():
-            widget.destroy()
-        self.price_labels.clear()
-
-        for symbol in coin_list:
-            row = tk.Frame(self, bg=CARD_COLOR)
-            row.pack(fill=tk.X, pady=6)
-            
-            # show symbol name
-            tk.Label(row, text=symbol, fg=MUTED_COLOR, bg=CARD_COLOR, font=FONT_BOLD, width=8, anchor="w").pack(side=tk.LEFT, anchor="n", pady=2)
-            
-            right_panel = tk.Frame(row, bg=CARD_COLOR)
-            right_panel.pack(side=tk.RIGHT, fill=tk.X, expand=True)
-
-            la_price = tk.Label(right_panel, text="...", fg=TEXT_COLOR, bg=CARD_COLOR, font=("Segoe UI", 14, "bold"), anchor="e")
-            la_price.pack(side=tk.TOP, fill=tk.X)
-
-            # frame for show volume and percent
-            stats_frame = tk.Frame(right_panel, bg=CARD_COLOR)
-            stats_frame.pack(side=tk.TOP, fill=tk.X)
-
-            la_volume = tk.Label(stats_frame, text="", fg=MUTED_COLOR, bg=CARD_COLOR, font=("Segoe UI", 9), width=10, anchor="e")
-            la_volume.pack(side=tk.RIGHT)
-
-            la_change = tk.Label(stats_frame, text="", fg=GREEN_COLOR, bg=CARD_COLOR, font=("Segoe UI", 10, "bold"), width=20, anchor="e")
-            la_change.pack(side=tk.RIGHT, padx=(0, 10))
-
-            # save label to variable 
-            self.price_labels[symbol] = (la_price, la_change, la_volume)
-
-    # update new data to label
-    def update_data(self, symbol, price, change, percent, volume):
-        if symbol not in self.price_labels: return
-        
-        la_p, la_c, la_v = self.price_labels[symbol]
-        
-        # update price text
-        la_p.config(text=f"${price:,.2f}")
-        
-        # check color green or red
-        color = GREEN_COLOR if percent >= 0 else RED_COLOR
-        la_p.config(fg=TEXT_COLOR)
-        
-        # update change text and volume
-        la_c.config(text=f"{change:+.2f} ({percent:+.2f}%)", fg=color)
-        la_v.config(text=f"Vol: {volume/1000:,.0f}K")
\ No newline at end of file
+        self.market = None      # MarketTable with the data of every symbol
+        self.on_select = on_select
+        self.on_star = on_star
+        self.starred = set()    # names in the watchlist
+        self.current = None     # name shown in the chart
+        self.sort_key = "volume"
+        self.descending = True
+        self.only_starred = False
+        self.order = []         # market rows in the order they are shown
+        self.offset = 0         # first shown position in order
+
+        # filter box and watchlist only switch
+        top = tk.Frame(self, bg=CARD_COLOR)
+        top.pack(fill=tk.X, pady=(0, 8))
+        self.filter_var = tk.StringVar()
+        self.filter_var.trace_add("write", lambda *args: self.on_filter())
+        tk.Entry(top, textvariable=self.filter_var, width=16, bg="#374151", fg="white", insertbackground="white").pack(side=tk.LEFT)
+        self.starred_button = tk.Button(top, text="All", bg="#374151", fg="white", font=FONT_MAIN, width=8, command=self.toggle_starred)
+        self.starred_button.pack(side=tk.RIGHT)
+
+        # column titles, click to sort
+        header = tk.Frame(self, bg=CARD_COLOR)
+        header.pack(fill=tk.X)
+        self.column_widths = [2, 10, 11, 8, 7]
+        self.titles = {}
+        for title, key, width in zip(["", "Symbol", "Price", "24h %", "Volume"], [None, "name", "price", "percent", "volume"], self.column_widths):
+            label = tk.Label(header, text=title, fg=MUTED_COLOR, bg=CARD_COLOR, width=width, anchor="w", font=FONT_MAIN)
+            label.pack(side=tk.LEFT, padx=2)
+            if key:
+                label.bind("<Button-1>", lambda e, k=key: self.sort_by(k))
+                self.titles[key] = (label, title)
+
+        # pooled rows and a scrollbar
+        body = tk.Frame(self, bg=CARD_COLOR)
+        body.pack(fill=tk.X)
+        self.scrollbar = tk.Scrollbar(body, orient=tk.VERTICAL, command=self.on_scroll)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        rows_frame = tk.Frame(body, bg=CARD_COLOR)
+        rows_frame.pack(side=tk.LEFT, fill=tk.X, expand=True)
+
+        self.rows = rows
+        self.cells = []  # 5 labels of each row
+        self.cache = []  # (text, color) shown in each label
+        self.names = [None] * rows # name shown in each row
+        for i in range(rows):
+            row = tk.Frame(rows_frame, bg=CARD_COLOR)
+            row.pack(fill=tk.X, pady=1)
+            labels = []
+            for width in self.column_widths:
+                label = tk.Label(row, text="", fg=TEXT_COLOR, bg=CARD_COLOR, width=width, anchor="w", font=FONT_MAIN)
+                label.pack(side=tk.LEFT, padx=2)
+                labels.append(label)
+
+            labels[0].bind("<Button-1>", lambda e, i=i: self.click_star(i))
+            for label in labels[1:]: label.bind("<Button-1>", lambda e, i=i: self.click_row(i))
+            for widget in [row] + labels:
+                widget.bind("<MouseWheel>", self.on_wheel)
+                widget.bind("<Button-4>", lambda e: self.scroll_to(self.offset - 1))
+                widget.bind("<Button-5>", lambda e: self.scroll_to(self.offset + 1))
+            self.cells.append(labels)
+            self.cache.append([None] * len(labels))
+        self.update_titles()
+
+    # show the rows of a market table
+    def set_market(self, market):
+        self.market = market
+        self.refresh()
+
+    # sort again and redraw the shown rows (call after new data)
+    def refresh(self):
+        if self.market is None: return
+        only = self.starred if self.only_starred else None
+        self.order = self.market.view(self.sort_key, self.descending, self.filter_var.get(), only)
+        self.scroll_to(self.offset)
+
+    # show rows starting at position offset of the sorted view
+    def scroll_to(self, offset):
+        if self.market is None: return
+        total = len(self.order)
+        self.offset = max(0, min(offset, total - self.rows))
+        change, percent = self.market.change()
+
+        for i in range(self.rows):
+            k = self.offset + i
+            if k >= total:
+                self.names[i] = None
+                self.set_row(i, ("", STAR_COLOR), ("", MUTED_COLOR), ("", TEXT_COLOR), ("", GREEN_COLOR), ("", MUTED_COLOR))
+                continue
+
+            row = self.order[k]
+            name = self.market.names[row]
+            self.names[i] = name
+            color = GREEN_COLOR if percent[row] >= 0 else RED_COLOR
+            self.set_row(i, ("★" if name in self.starred else "☆", STAR_COLOR),
+                         (name.replace("/USDT", ""), TEXT_COLOR if name == self.current else MUTED_COLOR),
+                         (format_price(self.market.price[row]), TEXT_COLOR),
+                         (f"{percent[row]:+.2f}%", color),
+                         (format_volume(self.market.volume[row]), MUTED_COLOR))
+
+        if total: self.scrollbar.set(self.offset / total, min(1.0, (self.offset + self.rows) / total))
+        else: self.scrollbar.set(0, 1)
+
+    # change the labels of one row, only cells that changed are configured
+    def set_row(self, i, *values):
+        cache = self.cache[i]
+        labels = self.cells[i]
+        for col, value in enumerate(values):
+            if cache[col] != value:
+                cache[col] = value
+                labels[col].config(text=value[0], fg=value[1])
+
+    # scrollbar commands: ("moveto", fraction) or ("scroll", n, "units" / "pages")
+    def on_scroll(self, *args):
+        if args[0] == "moveto": self.scroll_to(int(float(args[1]) * len(self.order)))
+        elif args[0] == "scroll":
+            step = self.rows if args[2] == "pages" else 1
+            self.scroll_to(self.offset + int(args[1]) * step)
+
+    def on_wheel(self, event):
+        self.scroll_to(self.offset - (1 if event.delta > 0 else -1))
+
+    # new filter text starts at the top of the list
+    def on_filter(self):
+        self.offset = 0
+        self.refresh()
+
+    # click the same column again to reverse the order
+    def sort_by(self, key):
+        if key == self.sort_key: self.descending = not self.descending
+        else:
+            self.sort_key = key
+            self.descending = key != "name"
+        self.update_titles()
+        self.refresh()
+
+    def update_titles(self):
+        for key, (label, title) in self.titles.items():
+            arrow = (" ▼" if self.descending else " ▲") if key == self.sort_key else ""
+            label.config(text=title + arrow)
+
+    # show every symbol or only the watchlist
+    def toggle_starred(self):
+        self.only_starred = not self.only_starred
+        self.starred_button.config(text="Watchlist" if self.only_starred else "All")
+        self.offset = 0
+        self.refresh()
+
+    # set the watchlist names and the coin shown in the chart
+    def set_starred(self, names, current=None):
+        self.starred = set(names)
+        if current: self.current = current
+        self.refresh()
+
+    def click_row(self, i):
+        if self.names[i] and self.on_select: self.on_select(self.names[i])
+
+    def click_star(self, i):
+        if self.names[i] and self.on_star: self.on_star(self.names[i], self.names[i] not in self.starred)
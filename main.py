@@ -1,27 +1,51 @@
 # main.py
+from utils.startup import startup # first import, the startup timer starts here
 import tkinter as tk
 from tkinter import Menu
-import threading
-import json
 import sys
-import requests
-import websocket
+import time
+import argparse
+import importlib
+import tempfile
+import numpy as np
 from datetime import datetime
 
-# import other files
+# import other files (the chart and its matplotlib are imported after the window is shown)
 from utils.config import *
-from components.ticker import WatchlistPanel
+from components.ticker import WatchlistPanel, price_decimals
 from components.orderbook import OrderBookPanel
-from components.chart import ChartPanel
 from components.history import TradeHistoryPanel
 from components.controls import ControlPanel
+from utils.engine import MarketEngine
+from utils.candles import CandleStore
+from utils.depth import OrderBook
+from utils.tape import TradeTape
+from utils.cache import KlineCache
+from utils.rest import RestClient
+from utils.resample import TimeframeStore
+from utils.recorder import FrameRecorder, ReplayFeed, ReplayRest
+from utils.metrics import metrics
+from utils.decode import decode_snapshot
+from utils.indicators import IndicatorStore, make_indicator
+from utils.warm import WarmSymbols
+from utils.scheduler import RenderScheduler
+from utils.alerts import AlertIndex, load_alerts, save_alerts
+from utils.paper import PaperTrader
+from utils.market import MarketTable, symbols_from_exchange_info, price_decimals_from_exchange_info, load_symbols, load_price_decimals, save_symbols
+from components.stats import StatsOverlay
+from components.alerts import AlertBanner
 
 # main class to control the application
 class CryptoApp(tk.Tk):
     # initialize the application and variables
-    def __init__(self):
+    # record_dir saves every raw frame and rest response, replay plays them instead of binance (offline)
+    # metrics_path (.json or .csv) gets a metrics snapshot every METRICS_EXPORT_SECONDS
+    # server is the url of a local data server (utils/server.py) to use instead of binance streams
+    # chart is "matplotlib" or "canvas" (zoom and pan over CANVAS_KLINE_HISTORY candles)
+    def __init__(self, record_dir=None, replay=None, speed=1.0, metrics_path=None, server=None, chart=CHART_BACKEND):
+        self.startup_phase("imports")
         super().__init__()
-        self.title("CRYPTO Dashboard (30m Timeframe)")
+        self.title(f"CRYPTO Dashboard ({KLINE_INTERVAL} Timeframe)")
         self.geometry("1280x850")
         
         # set minimum size of window
@@ -31,27 +55,73 @@ class CryptoApp(tk.Tk):
         self.protocol("WM_DELETE_WINDOW", self.close_app)
         self.is_running = True
 
-        # dictionary for coin list
+        # dictionary for coin list, every symbol of the exchange is added when exchangeInfo arrives
         self.coins = {
             "BTC/USDT": "btcusdt", "ETH/USDT": "ethusdt",
             "SOL/USDT": "solusdt", "BNB/USDT": "bnbusdt", "XRP/USDT": "xrpusdt"
         }
-        self.active_coins = list(self.coins.keys())
+        self.active_coins = list(self.coins.keys()) # watchlist (starred coins)
         self.current_coin = "BTC/USDT"
+        symbols = load_symbols(SYMBOLS_CACHE) or list(self.coins.items())
+        self.coins.update(symbols)
+        self.price_decimals = load_price_decimals(SYMBOLS_CACHE) # name -> decimals of the price tick
         
         # variables to save data
-        self.latest_prices = {} 
-        self.chart_data = {k: [] for k in self.coins}
-        self.trade_list = []
-        self.websockets = [] 
-
-        # create user interface
+        self.market = MarketTable(symbols) # 24h ticker of every symbol (tkinter thread)
+        self.chart_backend = chart
+        self.chart_panel = None # made when the chart module is imported
+        self.history = CANVAS_KLINE_HISTORY if chart == "canvas" else KLINE_HISTORY # candles to download and keep
+        self.chart_data = CandleStore(max(CANDLE_CAPACITY, self.history))
+        self.timeframes = TimeframeStore(self.chart_data, KLINE_INTERVAL) # bigger candles made from chart data
+        self.timeframe = KLINE_INTERVAL
+        self.indicators = IndicatorStore(self.timeframes, INDICATORS) # kept up to date with every candle
+        self.overlays = list(CHART_OVERLAYS)
+        self.sub_indicator = CHART_SUB_PANE
+        # a replay gets rest answers from the recording and keeps its candles out of the real disk cache
+        self.kline_cache = KlineCache(tempfile.mkdtemp(prefix="replay-klines-") if replay else KLINE_CACHE_DIR)
+        self.rest = ReplayRest(replay) if replay else RestClient()
+        self.books = {} # local order books, only used on the engine thread
+        self.tapes = {} # trade tape of each symbol, only used on the engine thread
+        self.live_bytes = {} # symbol -> bytes of its book and tape, posted by the engine thread every second
+        self.alerts = AlertIndex(ALERT_COOLDOWN) # alert rules, only used on the engine thread after start
+        for rule in load_alerts(ALERTS_FILE):
+            try: self.alerts.add(*rule)
+            except (TypeError, ValueError) as e: metrics.error("alerts.load", e)
+        self.paper = PaperTrader(PAPER_FEE_RATE) # paper trading orders and positions, only used on the engine thread
+        self.paper_symbols = set() # coins with paper orders or positions, their trades stay subscribed
+        self.account_posted = 0
+        self.all_streams = False # at startup only the current coin is subscribed until its first price arrives
+        self.warm = WarmSymbols(WARM_SYMBOLS, WARM_MEMORY_MB * 1024 * 1024, self.symbol_bytes)
+        self.warm.touch(self.current_coin)
+        recorder = FrameRecorder(record_dir, RECORD_SEGMENT_BYTES) if record_dir else None
+        self.rest.recorder = recorder # snapshots and klines go into the recording with the frames
+        replay_feed = ReplayFeed(replay, speed) if replay else None
+        self.engine = MarketEngine(url=server or STREAM_URL, recorder=recorder, replay=replay_feed)
+        self.metrics_path = metrics_path
+        self.last_export = 0
+
+        # newest data of each panel, drawn by the render scheduler when the panel is dirty
+        self.book_view = (self.current_coin, [], [])
+        self.trades_view = (self.current_coin, [])
+        self.tape_view = None
+        self.account_view = None
+
+        # create user interface, the chart is only a placeholder until its module is imported
         self.setup_ui()
+        self.setup_scheduler()
+        self.update()                 # show the window now
+        self.startup_phase("window")
         
-        # start background processes
-        self.load_historical_data()   # get old data
-        self.start_websockets()       # connect to socket
-        self.update_loop()            # start timer loop
+        # start background processes, most important first
+        self.load_historical_data()   # cached candles now, missing ones from the api
+        self.startup_phase("cache")
+        self.update_streams()         # streams of the current coin
+        self.engine.start()           # connect to socket
+        self.engine.run_blocking(self._load_chart_module) # matplotlib is imported off the tkinter thread
+        self.after(STARTUP_STREAM_DELAY * 1000, self.open_all_streams) # in case the first price is slow
+        self.after(STARTUP_REPORT_SECONDS * 1000, self.report_startup)
+        self.ui_loop()                # apply data from engine and draw dirty panels
+        self.stats_loop()             # refresh stats overlay and export
 
     # create all user interface components
     def setup_ui(self):
@@ -70,8 +140,9 @@ class CryptoApp(tk.Tk):
         right_panel.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=(10, 20))
 
         # add panels to the screen
-        self.watchlist_panel = WatchlistPanel(left_panel)
-        self.watchlist_panel.create_rows(self.active_coins)
+        self.watchlist_panel = WatchlistPanel(left_panel, on_select=self.select_coin, on_star=self.toggle_coin)
+        self.watchlist_panel.set_market(self.market)
+        self.watchlist_panel.set_starred(self.active_coins, self.current_coin)
         
         self.orderbook_panel = OrderBookPanel(left_panel)
 
@@ -85,20 +156,116 @@ class CryptoApp(tk.Tk):
         self.la_chart_title = tk.Label(top_chart_bar, text="Market Chart", fg=TEXT_COLOR, bg=CARD_COLOR, font=("Segoe UI", 16, "bold"))
         self.la_chart_title.pack(side=tk.LEFT)
         
-        # create menu to change coin
+        # create menu to change coin (coins of the watchlist, any coin can be picked in the watchlist panel)
         self.var_coin = tk.StringVar(value=self.current_coin)
-        option_menu = tk.OptionMenu(top_chart_bar, self.var_coin, *self.coins.keys(), command=self.change_coin)
-        option_menu.config(bg="#374151", fg="white", highlightthickness=0, borderwidth=0, font=FONT_MAIN)
-        option_menu["menu"].config(bg=CARD_COLOR, fg="white")
-        option_menu.pack(side=tk.RIGHT)
-
-        self.chart_panel = ChartPanel(chart_container)
+        self.coin_menu = tk.OptionMenu(top_chart_bar, self.var_coin, *self.active_coins, command=self.change_coin)
+        self.coin_menu.config(bg="#374151", fg="white", highlightthickness=0, borderwidth=0, font=FONT_MAIN)
+        self.coin_menu["menu"].config(bg=CARD_COLOR, fg="white")
+        self.coin_menu.pack(side=tk.RIGHT)
+
+        # create menu to change timeframe (made locally from base candles)
+        self.var_timeframe = tk.StringVar(value=self.timeframe)
+        timeframe_menu = tk.OptionMenu(top_chart_bar, self.var_timeframe, *TIMEFRAMES, command=self.change_timeframe)
+        timeframe_menu.config(bg="#374151", fg="white", highlightthickness=0, borderwidth=0, font=FONT_MAIN)
+        timeframe_menu["menu"].config(bg=CARD_COLOR, fg="white")
+        timeframe_menu.pack(side=tk.RIGHT, padx=(0, 10))
+
+        # menu to choose indicators on the candles and in the pane below
+        indicator_button = tk.Menubutton(top_chart_bar, text="Indicators", bg="#374151", fg="white", font=FONT_MAIN, relief=tk.FLAT)
+        indicator_menu = tk.Menu(indicator_button, tearoff=0, bg=CARD_COLOR, fg="white")
+        self.overlay_vars = {}
+        self.var_sub = tk.StringVar(value=self.sub_indicator)
+        for name in INDICATORS:
+            if make_indicator(name).pane == "price":
+                self.overlay_vars[name] = tk.BooleanVar(value=name in self.overlays)
+                indicator_menu.add_checkbutton(label=name, variable=self.overlay_vars[name], command=self.change_indicators)
+        indicator_menu.add_separator()
+        for name in INDICATORS:
+            if make_indicator(name).pane == "sub":
+                indicator_menu.add_radiobutton(label=name, variable=self.var_sub, value=name, command=self.change_indicators)
+        indicator_button["menu"] = indicator_menu
+        indicator_button.pack(side=tk.RIGHT, padx=(0, 10))
+
+        self.chart_container = chart_container
+        self.chart_placeholder = tk.Label(chart_container, text="Loading chart...", fg=MUTED_COLOR, bg=CARD_COLOR, font=FONT_MAIN)
+        self.chart_placeholder.pack(fill=tk.BOTH, expand=True, pady=(0, 20))
         self.trade_panel = TradeHistoryPanel(right_panel)
         
         self.control_panel = ControlPanel(right_panel, 
                                           on_buy=self.action_buy,
                                           on_sell=self.action_sell,
-                                          on_watchlist=self.popup_watchlist_menu)
+                                          on_watchlist=self.toggle_current_coin,
+                                          on_alert=self.add_price_alert,
+                                          on_order=self.place_order,
+                                          on_cancel=self.cancel_orders)
+
+        # stats overlay on top of everything, hidden until F12
+        self.stats_overlay = StatsOverlay(self)
+        self.bind("<F12>", self.stats_overlay.toggle)
+        self.alert_banner = AlertBanner(self)
+
+        # draw slower when the window is not focused, stop drawing when it is minimized
+        for event in ("<Map>", "<Unmap>", "<FocusIn>", "<FocusOut>"):
+            self.bind(event, lambda event: self.after_idle(self.update_window_state), add="+")
+
+    # import the module of the chart backend (executor thread)
+    def _load_chart_module(self):
+        name = "components.canvas_chart" if self.chart_backend == "canvas" else "components.chart"
+        try: module = importlib.import_module(name)
+        except ImportError as e:
+            metrics.error("chart.import", e)
+            self.engine.post(("chart_module",), self.chart_placeholder.config, {"text": f"Chart not available: {e}"})
+            return
+        self.engine.post(("chart_module",), self.setup_chart, module)
+
+    # put the chart panel in place of its placeholder and draw the data we already have (tkinter thread)
+    def setup_chart(self, module):
+        panel_class = module.CanvasChartPanel if self.chart_backend == "canvas" else module.ChartPanel
+        self.chart_placeholder.destroy()
+        self.chart_panel = panel_class(self.chart_container, on_change=lambda: self.mark("chart"))
+        self.chart_panel.set_indicators(self.overlays, self.sub_indicator)
+        self.mark("chart")
+        self.startup_phase("chart")
+
+    # second step of startup: watchlist prices and the full symbol list, once the current coin is live
+    def open_all_streams(self):
+        if self.all_streams or not self.is_running: return
+        self.all_streams = True
+        self.update_streams()
+        self.engine.run_blocking(self._fetch_symbols)
+
+    # the current coin shows its first live price (tkinter thread)
+    def on_first_price(self):
+        self.startup_phase("first_price")
+        self.open_all_streams()
+
+    # record a step of startup, the report is printed once every step in STARTUP_PHASES is done
+    def startup_phase(self, name):
+        if name in startup: return
+        done = startup.mark(name)
+        metrics.gauge(f"startup.{name}", startup.phases[name])
+        if done: self.report_startup()
+
+    def report_startup(self):
+        if not startup.reported: print(startup.report(), flush=True)
+
+    # panels are only drawn when their data changed, see RENDER_PANELS
+    def setup_scheduler(self):
+        self.scheduler = RenderScheduler(FRAME_BUDGET_MS, UNFOCUSED_SLOWDOWN)
+        renders = {"chart": self.draw_chart, "book": self.render_book, "trades": self.render_trades,
+                   "watchlist": self.watchlist_panel.refresh, "position": self.render_position,
+                   "tape_stats": self.render_tape_stats}
+        for name, rate in RENDER_PANELS: self.scheduler.add(name, renders[name], rate)
+
+    # data of a panel changed (tkinter thread)
+    def mark(self, name):
+        self.scheduler.mark(name, self.engine.bus.stamp)
+
+    # check if the window is minimized or focused
+    def update_window_state(self):
+        if not self.is_running: return
+        focus = self.tk.call("focus") # empty when another application has the focus
+        self.scheduler.set_state(self.state() not in ("iconic", "withdrawn"), bool(str(focus)))
 
     def action_buy(self):
         self.auto_fill_price("BUY")
@@ -106,150 +273,448 @@ class CryptoApp(tk.Tk):
     def action_sell(self):
         self.auto_fill_price("SELL")
 
-    # loop to update the screen every 5 seconds
-    def update_loop(self):
+    # apply the newest data the engine sent to tkinter and draw dirty panels, once per frame
+    # while minimized data is still applied (less often) so nothing is stale when the window comes back
+    def ui_loop(self):
         if not self.is_running: return
+        self.engine.drain()
+        self.scheduler.run()
+        self.after(1000 // (FRAME_RATE if self.scheduler.visible else HIDDEN_FRAME_RATE), self.ui_loop)
 
-        # update trade history panel
-        if self.trade_list:
-            self.trade_panel.update_trades(self.trade_list[:5]) # show top 5
-            self.trade_list = [] # clear list
-
-        # update chart panel
-        data = self.chart_data.get(self.current_coin, [])
-        self.chart_panel.draw_chart(data, self.current_coin)
+    # loop to refresh the stats overlay every second and export metrics
+    def stats_loop(self):
+        if not self.is_running: return
+        # an error here must not stop the loop (overlay and export would stop for good)
+        try:
+            for name, value in self.engine.bus.stats().items(): metrics.gauge(f"bus.{name}", value)
+            for name, value in self.scheduler.stats().items(): metrics.gauge(f"scheduler.{name}", value)
+            metrics.gauge("engine.dropped", self.engine.dropped)
+            metrics.gauge("engine.merged", self.engine.merged)
+            self.engine.call(self.post_live_bytes)
+            metrics.gauge("warm.symbols", len(self.warm))
+            metrics.gauge("warm.bytes", self.warm.nbytes())
+            metrics.gauge("alerts.rules", len(self.alerts))
+            metrics.gauge("alerts.suppressed", self.alerts.suppressed)
+
+            if self.stats_overlay.is_visible: self.stats_overlay.update_stats(metrics.snapshot())
+            if self.metrics_path and time.time() - self.last_export >= METRICS_EXPORT_SECONDS:
+                self.last_export = time.time()
+                try: metrics.export(self.metrics_path)
+                except OSError as e: metrics.error("export", e)
+        finally:
+            self.after(1000, self.stats_loop)
+
+    # show cached data now, then get only the missing candles of every coin at the same time
+    # without symbols (start, refresh) the starred coins that are not warm are also brought up to date
+    # on disk afterwards, so switching to one of them only needs a small delta request
+    def load_historical_data(self, symbols=None):
+        prefetch = []
+        if symbols is None:
+            symbols = [self.current_coin] + [c for c in self.warm if c != self.current_coin]
+            prefetch = [c for c in self.active_coins if c not in self.warm]
+        for symbol in symbols:
+            code = self.coins[symbol].upper()
+            self.set_history(symbol, self.kline_cache.load(code, KLINE_INTERVAL))
+        self.engine.run_blocking(self._fetch_history, symbols, prefetch)
 
-        # call this function again in 5000 milliseconds
-        self.after(5000, self.update_loop)
+    # shown coins first, then the disk cache of the others (executor thread)
+    def _fetch_history(self, symbols, prefetch):
+        self.rest.fetch_all(self._fetch_api_data, symbols)
+        self.rest.fetch_all(self._prefetch_klines, prefetch)
 
-    # start a background thread to get old data
-    def load_historical_data(self):
-        threading.Thread(target=self._fetch_api_data, args=(self.current_coin,), daemon=True).start()
+    # update the disk cache of a coin without loading it into memory (executor thread)
+    def _prefetch_klines(self, symbol):
+        try: self.kline_cache.update(self.coins[symbol].upper(), KLINE_INTERVAL, self.rest.klines, self.history)
+        except (OSError, ValueError) as e: metrics.error("rest.klines", e)
 
-    # connect to api to get candlestick data
+    # connect to api to get candlestick data missing from the cache
     def _fetch_api_data(self, symbol):
         try:
             code = self.coins[symbol].upper()
-            url = f"https://api.binance.com/api/v3/klines?symbol={code}&interval=30m&limit=50"
-            response = requests.get(url, timeout=5)
-            data = response.json()
-            
-            # organize data into a list
-            parsed_data = [{'t': i[0], 'o': float(i[1]), 'h': float(i[2]), 'l': float(i[3]), 'c': float(i[4]), 'v': float(i[5])} for i in data]
-            self.chart_data[symbol] = parsed_data
-            
-            # update the chart immediately
-            self.after(0, lambda: self.chart_panel.draw_chart(parsed_data, symbol))
-        except: pass
-
-    # connect to websocket for real-time updates
-    def start_websockets(self):
-        # close old connections
-        for ws in self.websockets:
-            try: ws.close()
-            except: pass
-        self.websockets = []
-
-        # connect ticker for all coins in watchlist
-        for coin in self.active_coins:
+            rows = self.kline_cache.update(code, KLINE_INTERVAL, self.rest.klines, self.history)
+            self.engine.post(("history", symbol), self.set_history, symbol, rows, "history")
+        except (OSError, ValueError) as e: metrics.error("rest.klines", e)
+
+    # save old data and update the chart immediately
+    # phase is the startup step this data finishes for the current coin
+    def set_history(self, symbol, rows, phase=None):
+        if symbol not in self.warm: return # evicted while the request was running
+        self.chart_data[symbol].load(rows)
+        self.timeframes.on_history(symbol)
+        self.indicators.on_history(symbol)
+        if symbol == self.current_coin:
+            self.mark("chart")
+            if phase: self.startup_phase(phase)
+        self.trim_warm()
+
+    # draw current coin in the selected timeframe
+    def draw_chart(self):
+        if self.chart_panel is None: return
+        series = self.timeframes.get(self.current_coin, self.timeframe)
+        self.chart_panel.draw_chart(series, self.current_coin, self.indicators.get(self.current_coin, self.timeframe))
+
+    # choose which streams we need, the stream manager only sends the difference
+    def update_streams(self):
+        self.engine.set_streams(self.stream_handlers())
+
+    # stream name -> handler for the watchlist and the warm coins (current and recently viewed)
+    def stream_handlers(self):
+        handlers = {}
+
+        # one stream with the 24h ticker of every symbol, at startup it waits for the current coin
+        if self.all_streams: handlers["!miniTicker@arr"] = self.on_mini_tickers
+
+        # specific data for warm coins, only the current coin is shown
+        for coin in self.warm:
             code = self.coins[coin]
-            url = f"wss://stream.binance.com:9443/ws/{code}@ticker"
-            ws = websocket.WebSocketApp(url, on_message=lambda ws, msg, c=coin: self.on_ticker_message(c, msg))
-            self.websockets.append(ws)
-            threading.Thread(target=ws.run_forever, daemon=True).start()
-
-        # connect specific data for current coin
-        code = self.coins[self.current_coin]
-        
-        # connect chart data
-        ws_chart = websocket.WebSocketApp(f"wss://stream.binance.com:9443/ws/{code}@kline_30m", on_message=lambda ws, msg: self.on_kline_message(self.current_coin, msg))
-        self.websockets.append(ws_chart)
-        threading.Thread(target=ws_chart.run_forever, daemon=True).start()
-
-        # connect order book data
-        ws_book = websocket.WebSocketApp(f"wss://stream.binance.com:9443/ws/{code}@depth20@1000ms", on_message=self.on_book_message)
-        self.websockets.append(ws_book)
-        threading.Thread(target=ws_book.run_forever, daemon=True).start()
-
-        # connect trade history data
-        ws_trade = websocket.WebSocketApp(f"wss://stream.binance.com:9443/ws/{code}@trade", on_message=self.on_trade_message)
-        self.websockets.append(ws_trade)
-        threading.Thread(target=ws_trade.run_forever, daemon=True).start()
-
-    # function to handle price updates from websocket
-    def on_ticker_message(self, symbol, msg): 
+            handlers[f"{code}@kline_{KLINE_INTERVAL}"] = lambda data, c=coin: self.on_kline_message(c, data)
+            handlers[f"{code}@depth@100ms"] = lambda data, c=coin: self.on_book_message(c, data)
+            handlers[f"{code}@trade"] = lambda data, c=coin: self.on_trade_message(c, data)
+
+        # paper orders of coins that are not warm anymore still fill from their trades
+        for coin in self.paper_symbols:
+            if coin not in self.warm:
+                handlers[f"{self.coins[coin]}@trade"] = lambda data, c=coin: self.on_paper_trade(c, data)
+        return handlers
+
+    # function to handle price updates of all symbols from websocket (engine thread)
+    # data is a MiniTickers record with only the symbols that changed, so every record is kept
+    def on_mini_tickers(self, data): 
         if not self.is_running: return
+        if len(self.alerts): self.check_ticker_alerts(data)
+        self.engine.post(("tickers", data.event_time), self.show_tickers, data)
+
+    # check price and 24h change alerts of the symbols in a MiniTickers record (engine thread)
+    def check_ticker_alerts(self, data):
+        now = time.time()
+        fired = self.alerts.update_many(data.codes, "price", data.close.tolist(), now)
+        if self.alerts.watched.get("change"):
+            change = np.divide(data.close - data.open, data.open, out=np.zeros(len(data.open)), where=data.open > 0) * 100
+            fired += self.alerts.update_many(data.codes, "change", change.tolist(), now)
+        self.post_alerts(fired)
+
+    # update market table, the watchlist panel is drawn by the scheduler (tkinter thread)
+    def show_tickers(self, data):
+        self.market.update(data)
+        self.mark("watchlist")
+        self.startup_phase("watchlist")
+
+    # connect to api to get every symbol of the exchange (executor thread)
+    def _fetch_symbols(self):
         try:
-            data = json.loads(msg)
-            price = float(data['c'])
-            change = float(data['p'])
-            percent = float(data['P'])
-            volume = float(data['v'])
-            
-            self.latest_prices[symbol] = price
-            # update watchlist panel
-            self.after(0, lambda: self.watchlist_panel.update_data(symbol, price, change, percent, volume))
-        except: pass
-
-    # function to handle graph updates from websocket
-    def on_kline_message(self, symbol, msg): 
-        try:
-            data = json.loads(msg)
-            k = data['k']
-            new_candle = {'t': k['t'], 'o': float(k['o']), 'h': float(k['h']), 'l': float(k['l']), 'c': float(k['c']), 'v': float(k['v'])}
-            
-            chart_list = self.chart_data.get(symbol, [])
-            if chart_list and chart_list[-1]['t'] == new_candle['t']: 
-                chart_list[-1] = new_candle 
-            else:
-                chart_list.append(new_candle) 
-                if len(chart_list) > 60: chart_list.pop(0)
-        except: pass
-
-    # function to handle order book updates from websocket
-    def on_book_message(self, ws, msg): 
+            info = self.rest.exchange_info()
+            symbols = symbols_from_exchange_info(info, WATCHLIST_QUOTES)
+            if not symbols: return
+            decimals = price_decimals_from_exchange_info(info, WATCHLIST_QUOTES)
+            save_symbols(SYMBOLS_CACHE, symbols, decimals)
+            self.engine.post(("symbols",), self.set_symbols, symbols, decimals)
+        except (OSError, ValueError) as e: metrics.error("rest.symbols", e)
+
+    # use the full symbol list (tkinter thread)
+    def set_symbols(self, symbols, decimals):
+        self.coins.update(symbols)
+        self.price_decimals.update(decimals)
+        self.market.set_symbols(symbols)
+        self.mark("watchlist")
+
+    # function to handle graph updates from websocket (engine thread)
+    def on_kline_message(self, symbol, data): 
+        new_candle = (data.open_time, data.open, data.high, data.low, data.close, data.volume)
+        self.engine.post(("kline", symbol, data.open_time), self.add_candle, symbol, new_candle)
+
+    # save new candle to chart data (tkinter thread)
+    def add_candle(self, symbol, new_candle):
+        if symbol not in self.warm: return # evicted, the stream is already closed
+        self.chart_data[symbol].upsert(*new_candle)
+        self.timeframes.on_candle(symbol)
+        self.indicators.on_candle(symbol)
+
+        # live tick only redraws the newest candle
+        if symbol == self.current_coin:
+            self.mark("chart")
+            if "first_price" not in startup: self.on_first_price()
+
+    # function to handle order book diffs from websocket (engine thread)
+    def on_book_message(self, symbol, data): 
+        book = self.books.get(symbol)
+        if book is None: book = self.books[symbol] = OrderBook(symbol)
+        changed = book.on_diff(data)
+
+        # book is not synced yet (first diff or gap), get a rest snapshot
+        if book.needs_snapshot():
+            book.snapshot_pending = True
+            self.engine.run_blocking(self._fetch_depth_snapshot, book)
+        if changed:
+            self.post_book(book)
+            self.check_spread_alert(book)
+
+    # connect to api to get order book snapshot (executor thread)
+    def _fetch_depth_snapshot(self, book):
         try:
-            data = json.loads(msg)
-            self.after(0, lambda: self.orderbook_panel.update_data(self.current_coin, data['bids'], data['asks']))
-        except: pass
-
-    # function to handle trade history updates from websocket
-    def on_trade_message(self, ws, msg): 
-        try:
-            data = json.loads(msg)
-            price = float(data['p'])
-            qty = float(data['q'])
-            side = "SELL" if data['m'] else "BUY"
-            time_str = datetime.now().strftime("%H:%M:%S")
-            color = GREEN_COLOR if side == "BUY" else RED_COLOR
-            total = price * qty
-            clean_sym = self.current_coin.replace("/USDT", "")
-            
-            self.trade_list.insert(0, (time_str, clean_sym, side, price, qty, total, color))
-        except: pass
+            code = self.coins[book.symbol].upper()
+            snapshot = decode_snapshot(self.rest.depth(code, DEPTH_LIMIT))
+            self.engine.call(self.on_book_snapshot, book, snapshot)
+        except (OSError, KeyError, ValueError) as e:
+            metrics.error("rest.depth", e)
+            book.snapshot_pending = False
+
+    # load snapshot into the local book (engine thread)
+    def on_book_snapshot(self, book, snapshot):
+        if book.load_snapshot(snapshot): self.post_book(book)
+
+    # send top levels of the book to the ui (engine thread)
+    def post_book(self, book):
+        bids, asks = book.top(7)
+        self.engine.post(("book", book.symbol), self.show_book, book.symbol, bids, asks)
+
+    # save the newest levels of the order book panel (tkinter thread)
+    def show_book(self, symbol, bids, asks):
+        if symbol != self.current_coin: return
+        self.book_view = (symbol, bids, asks)
+        self.mark("book")
+
+    def render_book(self):
+        self.orderbook_panel.update_data(*self.book_view)
+
+    # function to handle trade history updates from websocket (engine thread)
+    def on_trade_message(self, symbol, data): 
+        tape = self.tapes.get(symbol)
+        if tape is None: tape = self.tapes[symbol] = TradeTape(TAPE_CAPACITY, TAPE_AGGREGATE, TAPE_WINDOWS)
+        new_second = tape.add(data.time, data.price, data.qty, data.is_buy)
+
+        self.engine.post(("trades", symbol), self.show_trades, symbol, tape.last(5))
+        if new_second:
+            window = TAPE_WINDOWS[-1]
+            stats = tape.stats(window)
+            self.engine.post(("tape_stats", symbol), self.show_tape_stats, symbol, window, stats)
+            self.check_alert(symbol, "volume", (stats["vwap"] or 0) * (stats["buy_volume"] + stats["sell_volume"]))
+        self.on_paper_trade(symbol, data)
+
+    # save the newest trades of the trade history panel (tkinter thread)
+    def show_trades(self, symbol, rows):
+        if symbol != self.current_coin: return
+        self.trades_view = (symbol, rows)
+        self.mark("trades")
+        if "first_price" not in startup: self.on_first_price()
+
+    def render_trades(self):
+        symbol, rows = self.trades_view
+        clean_sym = symbol.replace("/USDT", "")
+
+        trades = []
+        for time_ms, price, qty, is_buy, count in rows:
+            time_str = datetime.fromtimestamp(time_ms / 1000).strftime("%H:%M:%S")
+            side = "BUY" if is_buy else "SELL"
+            color = GREEN_COLOR if is_buy else RED_COLOR
+            trades.append((time_str, clean_sym, side, price, qty, price * qty, color))
+        self.trade_panel.update_trades(trades)
+
+    # save rolling trade stats (tkinter thread)
+    def show_tape_stats(self, symbol, window, stats):
+        if symbol != self.current_coin: return
+        self.tape_view = (window, stats)
+        self.mark("tape_stats")
+
+    def render_tape_stats(self):
+        if self.tape_view: self.trade_panel.update_stats(*self.tape_view)
+
+    # check the alerts of one value of a symbol (engine thread)
+    # spread and volume come from the book and tape, so they are only checked for warm coins
+    def check_alert(self, symbol, metric, value):
+        code = self.alerts.code(symbol)
+        if self.alerts.watches(code, metric): self.post_alerts(self.alerts.update(code, metric, value, time.time()))
+
+    # spread of the best levels in basis points (engine thread)
+    def check_spread_alert(self, book):
+        bid, ask = book.best_bid(), book.best_ask()
+        if bid and ask: self.check_alert(book.symbol, "spread", (ask[0] - bid[0]) / (ask[0] + bid[0]) * 20000)
+
+    # send fired alerts to the ui, every batch has its own key so none is lost (engine thread)
+    def post_alerts(self, fired):
+        if not fired: return
+        metrics.count("alerts.fired", len(fired))
+        self.engine.post(("alerts", fired[0].time, fired[0].alert.id), self.show_alerts, fired)
+
+    # show fired alerts without blocking (tkinter thread)
+    def show_alerts(self, fired):
+        self.alert_banner.show([f"{self.alert_text(f.alert)}  now {f.value:,.8g}" for f in fired])
+        self.bell()
+
+    def alert_text(self, alert):
+        unit = {"change": "%", "volume": " quote volume", "spread": " bps"}.get(alert.metric, "")
+        return f"{alert.symbol} {alert.metric} {'above' if alert.above else 'below'} {alert.threshold:,.8g}{unit}"
+
+    # add a price alert at the price in the price box, above or below the last price
+    def add_price_alert(self):
+        price = self.control_panel.entered_price()
+        last = self.market.price_of(self.current_coin)
+        if not price or not last:
+            self.alert_banner.show(["Type a price to set an alert"])
+            return
+        self.engine.call(self._add_alert, self.current_coin, "price", price > last, price)
+
+    # (engine thread) add the rule and save all rules in the background
+    def _add_alert(self, symbol, metric, above, threshold):
+        alert = self.alerts.add(symbol, metric, above, threshold)
+        self.engine.run_blocking(self._save_alerts, self.alerts.rules())
+        self.engine.post(("alert_added", alert.id), self.alert_banner.show, [f"Alert set: {self.alert_text(alert)}"])
+
+    # save alert rules to disk (executor thread)
+    def _save_alerts(self, rules):
+        try: save_alerts(ALERTS_FILE, rules)
+        except OSError as e: metrics.error("alerts.save", e)
+
+    # send an order of the control panel to the paper trader (tkinter thread)
+    def place_order(self, side, price, qty):
+        self.engine.call(self._place_order, self.current_coin, side, price, qty)
+
+    def cancel_orders(self):
+        self.engine.call(self._cancel_orders, self.current_coin)
+
+    # (engine thread) take liquidity from the local book, the rest of a limit order rests until trades reach it
+    def _place_order(self, symbol, side, price, qty):
+        book = self.books.get(symbol)
+        if book is not None and not book.synced: book = None
+        try: order, fills = self.paper.submit(symbol, side, qty, price, book, time.time())
+        except ValueError as e:
+            self.engine.post(("order", time.time()), self.alert_banner.show, [f"Order rejected: {e}"])
+            return
+
+        text = f"Order #{order.id} {side} {qty:g} {symbol} {'MARKET' if price is None else f'@ {price:,.8g}'}: {order.status}"
+        if fills: text += f", filled {order.filled:g} @ {sum(f.price * f.qty for f in fills) / order.filled:,.8g}"
+        self.engine.post(("order", order.id), self.alert_banner.show, [text])
+        self.post_account()
+
+    # (engine thread)
+    def _cancel_orders(self, symbol):
+        count = self.paper.cancel_all(symbol)
+        self.engine.post(("order", time.time()), self.alert_banner.show, [f"Canceled {count} orders of {symbol}"])
+        self.post_account()
+
+    # match resting paper orders against a trade, pnl is sent at most once a second without fills (engine thread)
+    def on_paper_trade(self, symbol, data):
+        fills = self.paper.on_trade(symbol, data.price, data.qty, data.time / 1000, data.is_buy)
+        if fills:
+            lines = [f"Filled #{f.order_id} {f.side} {f.qty:g} {f.symbol} @ {f.price:,.8g}" for f in fills[-ALERT_LINES:]]
+            self.engine.post(("fills", fills[0].order_id, data.time), self.alert_banner.show, lines)
+        if fills or (time.time() - self.account_posted >= 1 and self.paper.active()): self.post_account()
+
+    # (engine thread)
+    def post_account(self):
+        self.account_posted = time.time()
+        self.engine.post(("account",), self.show_account, self.paper.summary())
+
+    # save the paper account, coins with orders or positions keep their trade stream (tkinter thread)
+    def show_account(self, summary):
+        self.account_view = summary
+        symbols = {s for s, v in summary["symbols"].items() if v["qty"] or v["orders"]}
+        if symbols != self.paper_symbols:
+            self.paper_symbols = symbols
+            self.update_streams()
+        self.mark("position")
+
+    def render_position(self):
+        summary = self.account_view
+        if summary is None: return
+        p = summary["symbols"].get(self.current_coin)
+        total = summary["realized"] + summary["unrealized"]
+        parts = [f"{self.current_coin} {p['qty']:+,.6g} @ {p['avg_price']:,.8g}  uPnL {p['unrealized']:+,.2f}" if p and p["qty"]
+                 else f"{self.current_coin} no position"]
+        if p and p["orders"]: parts.append(f"{p['orders']} open orders")
+        parts.append(f"Total PnL {total:+,.2f} ({summary['orders']} open orders)")
+        self.control_panel.update_position("   |   ".join(parts), GREEN_COLOR if total >= 0 else RED_COLOR)
 
     # function to change the current cryptocurrency
+    # a warm coin is shown at once from memory, a cold one starts from the disk cache
     def change_coin(self, value):
+        is_warm = value in self.warm
+        evicted = self.warm.touch(value)
         self.current_coin = value
-        self.trade_list = [] 
-        self.load_historical_data()
-        self.start_websockets() 
-
-    # show a menu to select coins for watchlist
-    def popup_watchlist_menu(self):
-        menu = tk.Menu(self, tearoff=0)
-        for name in self.coins:
-            is_active = tk.BooleanVar(value=(name in self.active_coins))
-            
-            cmd = self.create_toggle_cmd(name, is_active)
-            menu.add_checkbutton(label=name, onvalue=True, offvalue=False, variable=is_active, command=cmd)
-            
-        menu.tk_popup(self.winfo_pointerx(), self.winfo_pointery())
-
-    def create_toggle_cmd(self, name, var):
-        def callback():
-            self.toggle_coin(name, var.get())
-        return callback
+        self.var_coin.set(value)
+        self.watchlist_panel.current = value
+        self.mark("watchlist")
+        self.mark("position")
+
+        if is_warm:
+            self.mark("chart")
+            self.engine.call(self.post_symbol, value)
+        else:
+            self.book_view = (value, [], [])
+            self.trades_view = (value, [])
+            self.tape_view = None
+            for name in ("book", "trades"): self.mark(name)
+            self.load_historical_data([value])
+
+        # only streams of the new and evicted coins change
+        self.update_streams()
+        for symbol in evicted: self.drop_symbol(symbol)
+
+    # the data of a warm coin grew (history loaded, new book / tape sizes), evict the oldest coins over the budget
+    def trim_warm(self):
+        evicted = self.warm.trim()
+        if not evicted: return
+        self.update_streams()
+        for symbol in evicted: self.drop_symbol(symbol)
+
+    # send the book and tape of a warm coin to the ui (engine thread)
+    def post_symbol(self, symbol):
+        book = self.books.get(symbol)
+        if book and book.synced: self.post_book(book)
+        tape = self.tapes.get(symbol)
+        if tape and len(tape):
+            window = TAPE_WINDOWS[-1]
+            self.engine.post(("trades", symbol), self.show_trades, symbol, tape.last(5))
+            self.engine.post(("tape_stats", symbol), self.show_tape_stats, symbol, window, tape.stats(window))
+
+    # forget everything about an evicted coin
+    def drop_symbol(self, symbol):
+        self.chart_data.drop(symbol)
+        self.timeframes.drop(symbol)
+        self.indicators.drop(symbol)
+        self.engine.call(self._drop_engine_state, symbol)
+
+    # (engine thread) runs after the streams of the symbol are closed
+    def _drop_engine_state(self, symbol):
+        self.books.pop(symbol, None)
+        self.tapes.pop(symbol, None)
+
+    # (engine thread) bytes of the book and tape of every symbol, for the memory budget of the warm coins
+    def post_live_bytes(self):
+        sizes = {}
+        for symbol, book in self.books.items(): sizes[symbol] = book.nbytes()
+        for symbol, tape in self.tapes.items(): sizes[symbol] = sizes.get(symbol, 0) + tape.nbytes()
+        self.engine.post(("live_bytes",), self.set_live_bytes, sizes)
+
+    def set_live_bytes(self, sizes):
+        self.live_bytes = sizes
+        self.trim_warm()
+
+    # bytes of candles, timeframes, indicators, book and tape of a coin (tkinter thread)
+    # book and tape belong to the engine thread, their size is the one it posted last
+    def symbol_bytes(self, symbol):
+        return (self.chart_data.nbytes(symbol) + self.timeframes.nbytes(symbol) + self.indicators.nbytes(symbol)
+                + self.live_bytes.get(symbol, 0))
+
+    # function to change the chart timeframe, no new request or stream is needed
+    def change_timeframe(self, value):
+        self.timeframe = value
+        self.title(f"CRYPTO Dashboard ({value} Timeframe)")
+        self.mark("chart")
+
+    # indicators were picked in the indicator menu, values are already computed
+    def change_indicators(self):
+        self.overlays = [name for name, var in self.overlay_vars.items() if var.get()]
+        self.sub_indicator = self.var_sub.get()
+        if self.chart_panel: self.chart_panel.set_indicators(self.overlays, self.sub_indicator)
+        self.mark("chart")
+
+    # coin clicked in the watchlist panel
+    def select_coin(self, name):
+        if name != self.current_coin: self.change_coin(name)
+
+    # add or remove the coin of the chart from the watchlist
+    def toggle_current_coin(self):
+        self.toggle_coin(self.current_coin, self.current_coin not in self.active_coins)
 
     # add or remove coin from the watchlist
     def toggle_coin(self, name, state):
@@ -258,23 +723,40 @@ class CryptoApp(tk.Tk):
         
         if not self.active_coins: self.active_coins.append("BTC/USDT") 
         
-        self.watchlist_panel.create_rows(self.active_coins)
-        self.start_websockets()
+        self.watchlist_panel.set_starred(self.active_coins)
+        self.update_coin_menu()
+
+    # show the watchlist coins in the coin menu
+    def update_coin_menu(self):
+        menu = self.coin_menu["menu"]
+        menu.delete(0, tk.END)
+        for name in self.active_coins:
+            menu.add_command(label=name, command=lambda n=name: self.change_coin(n))
 
     # automatically put current price in the box
     def auto_fill_price(self, side):
-        price = self.latest_prices.get(self.current_coin, 0)
-        self.control_panel.fill_price(price)
+        price = self.market.price_of(self.current_coin)
+        if not price: return
+        self.control_panel.fill_price(price, self.price_decimals.get(self.current_coin, price_decimals(price)))
 
     # close all connections and exit the application
     def close_app(self):
         self.is_running = False
-        for ws in self.websockets:
-            try: ws.close()
-            except: pass
+        self.engine.close()
+        self.rest.close()
+        if self.metrics_path: metrics.export(self.metrics_path)
         self.destroy()
         sys.exit(0)
 
 if __name__ == "__main__":
-    app = CryptoApp()
+    parser = argparse.ArgumentParser(description="CRYPTO Dashboard")
+    parser.add_argument("--record", metavar="DIR", help="save every raw websocket frame to DIR")
+    parser.add_argument("--replay", metavar="DIR", help="play frames saved in DIR instead of live data")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed (1 = real time, 0 = max speed)")
+    parser.add_argument("--metrics", metavar="FILE", help="export metrics to FILE (.json or .csv) every minute")
+    parser.add_argument("--chart", choices=["matplotlib", "canvas"], default=CHART_BACKEND, help="chart backend (canvas can zoom and pan over the history)")
+    parser.add_argument("--server", metavar="URL", nargs="?", const=SERVER_URL, help=f"get streams from a local data server (default {SERVER_URL})")
+    args = parser.parse_args()
+
+    app = CryptoApp(record_dir=args.record, replay=args.replay, speed=args.speed, metrics_path=args.metrics, server=args.server, chart=args.chart)
     app.mainloop()
\ No newline at end of file
@@ -0,0 +1,64 @@
+# tests/test_alerts.py
+from utils.alerts import AlertIndex
+
+COOLDOWN = 60
+
+def ids(fired):
+    return [f.alert.id for f in fired]
+
+def test_a_move_through_several_thresholds_fires_each_rule_once():
+    index = AlertIndex(COOLDOWN)
+    up = [index.add("BTC/USDT", "price", True, t).id for t in (101, 102, 103, 110)]
+    down = [index.add("BTC/USDT", "price", False, t).id for t in (99, 98)]
+
+    assert index.update("BTCUSDT", "price", 100, 0) == [] # the first value only sets the start
+    fired = index.update("BTCUSDT", "price", 105, 1)
+    assert ids(fired) == up[:3]
+    assert [f.value for f in fired] == [105, 105, 105]
+    assert index.update("BTCUSDT", "price", 106, 2) == [] # already above
+
+    # falling back through the up levels does not fire them, only the down rules below fire
+    assert ids(index.update("BTCUSDT", "price", 97, 3)) == down[::-1]
+
+def test_touching_a_threshold_does_not_fire():
+    index = AlertIndex(COOLDOWN)
+    above = index.add("BTC/USDT", "price", True, 100).id
+    below = index.add("BTC/USDT", "price", False, 90).id
+    for t, price in enumerate((95, 100, 95, 90, 95)):
+        assert index.update("BTCUSDT", "price", price, t) == []
+
+    # from the level itself one step past it is a crossing
+    assert ids(index.update("BTCUSDT", "price", 100, 10)) == []
+    assert ids(index.update("BTCUSDT", "price", 100.5, 11)) == [above]
+    index.update("BTCUSDT", "price", 90, 12)
+    assert ids(index.update("BTCUSDT", "price", 89.5, 13)) == [below]
+
+def test_a_rule_is_quiet_until_the_cooldown_passed():
+    index = AlertIndex(COOLDOWN)
+    rule = index.add("ETH/USDT", "spread", True, 5).id
+    other = index.add("ETH/USDT", "spread", True, 8).id
+    index.update("ETHUSDT", "spread", 4, 0)
+    assert ids(index.update("ETHUSDT", "spread", 6, 0)) == [rule]
+
+    # the value moves around the level: every crossing inside the cooldown is suppressed
+    for t in range(1, COOLDOWN):
+        index.update("ETHUSDT", "spread", 4, t - 0.5)
+        assert index.update("ETHUSDT", "spread", 6, t) == []
+    assert index.suppressed == COOLDOWN - 1
+
+    # another rule is not held back by it, and the rule fires again once the cooldown is over
+    assert ids(index.update("ETHUSDT", "spread", 9, COOLDOWN - 0.1)) == [other]
+    index.update("ETHUSDT", "spread", 4, COOLDOWN)
+    assert ids(index.update("ETHUSDT", "spread", 6, COOLDOWN)) == [rule]
+
+def test_only_watched_codes_are_checked_and_removed_rules_stay_quiet():
+    index = AlertIndex(COOLDOWN)
+    rule = index.add("BTC/USDT", "price", True, 100).id
+    index.add("ETH/USDT", "price", True, 10)
+    index.update_many(["BTCUSDT", "ETHUSDT", "SOLUSDT"], "price", [90, 9, 1], 0)
+    assert len(index.update_many(["BTCUSDT", "ETHUSDT", "SOLUSDT"], "price", [110, 11, 2], 1)) == 2
+    assert not index.watches("SOLUSDT", "price")
+
+    assert index.remove(rule) and not index.remove(rule)
+    assert not index.watches("BTCUSDT", "price")
+    assert index.update("BTCUSDT", "price", 90, 2) == [] and index.update("BTCUSDT", "price", 120, 3) == []
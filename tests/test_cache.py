@@ -0,0 +1,79 @@
+# tests/test_cache.py
+import numpy as np
+from utils.cache import KlineCache, PAGE_LIMIT
+from utils.candles import T, C
+
+STEP = 1_800_000 # 30m in ms
+
+# stand-in for the binance klines endpoint over a list of candles, records every request
+class StandInKlines:
+    def __init__(self, count, first=0):
+        self.rows = [[(first + i) * STEP, 1.0, 2.0, 0.5, float(i), 10.0] for i in range(count)]
+        self.requests = []
+
+    def __call__(self, symbol, interval, start_time=None, end_time=None, limit=1000):
+        self.requests.append((start_time, end_time, limit))
+        rows = self.rows
+        if start_time is not None: rows = [r for r in rows if r[0] >= start_time]
+        if end_time is not None: rows = [r for r in rows if r[0] <= end_time]
+        return [list(r) for r in (rows[:limit] if start_time is not None else rows[-limit:])]
+
+    # a new candle opened and the last one changed
+    def tick(self):
+        self.rows[-1][C] += 0.5
+        t = self.rows[-1][0] + STEP
+        self.rows.append([t, 1.0, 2.0, 0.5, 99.0, 1.0])
+
+def test_first_update_pages_back_to_the_history(tmp_path):
+    cache = KlineCache(str(tmp_path))
+    api = StandInKlines(2500)
+    rows = cache.update("BTCUSDT", "30m", api, 2200)
+    assert len(rows) == 2200
+    assert rows[-1, T] == api.rows[-1][0]
+    assert np.all(np.diff(rows[:, T]) == STEP)
+    assert [r[1] for r in api.requests][1:] == [api.rows[-1000][0] - 1, api.rows[-2000][0] - 1] # pages going back
+
+def test_second_update_only_gets_the_delta(tmp_path):
+    cache = KlineCache(str(tmp_path))
+    api = StandInKlines(1200)
+    cache.update("BTCUSDT", "30m", api, 1000)
+    api.requests.clear()
+    api.tick()
+
+    rows = cache.update("BTCUSDT", "30m", api, 1000)
+    # one request from the last stored candle on (it may have been open)
+    assert api.requests == [(api.rows[-2][0], None, PAGE_LIMIT)]
+    assert len(rows) == 1001
+    assert rows[-2, C] == api.rows[-2][C] # the open candle was replaced, not repeated
+    assert rows[-1, T] == api.rows[-1][0]
+    assert len(np.unique(rows[:, T])) == len(rows)
+
+def test_save_truncates_where_new_rows_overlap(tmp_path):
+    cache = KlineCache(str(tmp_path))
+    first = np.array([[i * STEP, 1, 2, 0, i, 1] for i in range(10)], dtype=float)
+    cache.save("ETHUSDT", "30m", first)
+    newer = np.array([[i * STEP, 1, 2, 0, 100 + i, 1] for i in range(7, 12)], dtype=float)
+    cache.save("ETHUSDT", "30m", newer)
+
+    rows = cache.load("ETHUSDT", "30m")
+    assert list(rows[:, T] // STEP) == list(range(12))
+    assert list(rows[7:, C]) == [107, 108, 109, 110, 111]
+
+def test_young_symbol_stops_asking_for_older_candles(tmp_path):
+    cache = KlineCache(str(tmp_path))
+    api = StandInKlines(300)
+    assert len(cache.update("NEWUSDT", "30m", api, 1000)) == 300
+    assert cache.has_start("NEWUSDT", "30m")
+
+    api.requests.clear()
+    cache.update("NEWUSDT", "30m", api, 1000)
+    assert len(api.requests) == 1 and api.requests[0][0] is not None # only the forward delta
+
+def test_more_history_is_prepended(tmp_path):
+    cache = KlineCache(str(tmp_path))
+    api = StandInKlines(3000)
+    cache.update("BTCUSDT", "30m", api, 1000)
+    rows = cache.update("BTCUSDT", "30m", api, 2500)
+    assert len(rows) == 2500
+    assert np.all(np.diff(rows[:, T]) == STEP)
+    assert not cache.has_start("BTCUSDT", "30m")
@@ -0,0 +1,51 @@
+# tests/test_candles.py
+import numpy as np
+from utils.candles import T, C, CandleSeries
+
+STEP = 1_800_000
+
+def bar(i, close=None):
+    return [i * STEP, 1.0, 2.0, 0.5, float(i) if close is None else close, 10.0]
+
+def test_the_ring_wraps_and_the_newest_bars_stay_one_view():
+    series = CandleSeries(5)
+    assert len(series) == 0 and series.last_time() is None and series.last().shape == (6, 0)
+    for i in range(13): series.append(*bar(i))
+
+    assert len(series) == 5
+    assert series.last_time() == 12 * STEP
+    for n in range(1, 6):
+        view = series.last(n)
+        assert list(view[C]) == [float(i) for i in range(13 - n, 13)]
+        assert np.shares_memory(view, series.data) # no copy, even across the wrap
+    assert series.last(50).shape == (6, 5)
+
+def test_update_last_writes_both_copies():
+    series = CandleSeries(4)
+    for i in range(6): series.append(*bar(i))
+    series.update_last(*bar(5, close=99.0))
+    assert series.last(1)[C, 0] == 99.0
+    series.append(*bar(6)) # the slot of bar 5 is read from the other half after more bars
+    series.append(*bar(7))
+    assert list(series.last()[C]) == [4.0, 99.0, 6.0, 7.0]
+
+def test_upsert_updates_the_open_bar_and_ignores_older_ones():
+    series = CandleSeries(10)
+    series.upsert(*bar(0))
+    series.upsert(*bar(0, close=5.0))
+    series.upsert(*bar(1))
+    series.upsert(*bar(0, close=7.0)) # late update of a closed bar
+    assert list(series.last()[T]) == [0, STEP]
+    assert list(series.last()[C]) == [5.0, 1.0]
+
+def test_load_keeps_live_bars_newer_than_the_history():
+    series = CandleSeries(8)
+    for i in (10, 11, 12): series.append(*bar(i, close=100.0 + i)) # live bars that came before the history
+    history = np.array([bar(i) for i in range(11)]) # overlaps bar 10, ends before 11
+
+    series.load(history)
+    assert list(series.last()[T] // STEP) == [5, 6, 7, 8, 9, 10, 11, 12] # only capacity bars are kept
+    assert list(series.last()[C]) == [5.0, 6.0, 7.0, 8.0, 9.0, 10.0, 111.0, 112.0] # history wins where both have a bar
+
+    series.load(np.empty((0, 6)))
+    assert len(series) == 8
@@ -0,0 +1,120 @@
+# tests/test_depth.py
+import asyncio
+import random
+from utils.decode import decode_depth, decode_snapshot
+from utils.depth import OrderBook, merge_diffs
+from utils.engine import MarketEngine
+
+# depth diff with update ids first..last, levels are [price, qty] like the stream sends them
+def diff(first, last, bids=(), asks=()):
+    return decode_depth({"E": last, "U": first, "u": last,
+                         "b": [[str(p), str(q)] for p, q in bids], "a": [[str(p), str(q)] for p, q in asks]})
+
+def snapshot(last_id, bids, asks):
+    return decode_snapshot({"lastUpdateId": last_id, "bids": [[str(p), str(q)] for p, q in bids],
+                            "asks": [[str(p), str(q)] for p, q in asks]})
+
+def test_snapshot_replays_buffered_diffs():
+    book = OrderBook("BTC/USDT")
+    assert book.needs_snapshot()
+
+    # diffs before the snapshot are buffered, the ones it already contains are dropped
+    assert not book.on_diff(diff(98, 100, bids=[(99, 5)]))
+    assert not book.on_diff(diff(101, 103, bids=[(99, 0), (98, 2)], asks=[(101, 1)]))
+    assert book.load_snapshot(snapshot(100, bids=[(99, 1), (97, 3)], asks=[(101, 4), (102, 2)]))
+
+    assert book.synced
+    assert book.last_update_id == 103
+    assert book.top(5) == ([(98, 2), (97, 3)], [(101, 1), (102, 2)])
+
+def test_diffs_after_sync_update_levels_in_order():
+    book = OrderBook("BTC/USDT")
+    book.on_diff(diff(11, 11))
+    book.load_snapshot(snapshot(10, bids=[(100, 1)], asks=[(101, 1)]))
+
+    assert book.on_diff(diff(12, 14, bids=[(100.5, 2)], asks=[(101, 0), (103, 1)]))
+    assert not book.on_diff(diff(13, 14, bids=[(90, 9)])) # old event, ignored
+    assert book.best_bid() == (100.5, 2)
+    assert book.best_ask() == (103, 1)
+    assert book.spread() == 2.5
+    assert book.depth_to("BUY", 1) == (1, 103, 103)
+
+def test_gap_throws_the_book_away_and_syncs_again():
+    book = OrderBook("BTC/USDT")
+    book.load_snapshot(snapshot(10, bids=[(100, 1)], asks=[(101, 1)]))
+    assert book.on_diff(diff(11, 12, bids=[(100, 2)]))
+
+    # update ids 13..19 are missing
+    assert not book.on_diff(diff(20, 21, bids=[(100, 3)]))
+    assert not book.synced and book.resyncs == 1
+    assert book.needs_snapshot()
+
+    # a snapshot older than the first buffered diff is refused, a newer one syncs the book again
+    assert not book.load_snapshot(snapshot(15, bids=[(100, 7)], asks=[(101, 7)]))
+    book.on_diff(diff(22, 22, asks=[(101, 5)]))
+    assert book.load_snapshot(snapshot(21, bids=[(100, 3)], asks=[(101, 1)]))
+    assert book.synced and book.last_update_id == 22
+    assert book.top(1) == ([(100, 3)], [(101, 5)])
+
+def test_snapshot_request_is_asked_once():
+    book = OrderBook("BTC/USDT")
+    book.on_diff(diff(1, 1))
+    assert book.needs_snapshot()
+    book.snapshot_pending = True
+    book.on_diff(diff(2, 2))
+    assert not book.needs_snapshot()
+
+def test_snapshot_right_before_the_first_diff_syncs():
+    book = OrderBook("BTC/USDT")
+    book.on_diff(diff(11, 12, asks=[(101, 2)]))
+    assert book.load_snapshot(snapshot(10, bids=[(100, 1)], asks=[(101, 1)]))
+    assert book.last_update_id == 12 and book.best_ask() == (101, 2)
+
+# synced book and a run of random diffs that continue from its snapshot
+def random_run(count, seed=1):
+    rng = random.Random(seed)
+    diffs, last = [], 10
+    for _ in range(count):
+        n = rng.randint(1, 3)
+        bids = [(rng.randint(90, 100), rng.choice((0, 1, 2, 3))) for _ in range(rng.randint(0, 4))]
+        asks = [(rng.randint(101, 110), rng.choice((0, 1, 2, 3))) for _ in range(rng.randint(0, 4))]
+        diffs.append(diff(last + 1, last + n, bids, asks))
+        last += n
+    return diffs
+
+def synced_book():
+    book = OrderBook("BTC/USDT")
+    book.load_snapshot(snapshot(10, bids=[(p, 1) for p in range(90, 101)], asks=[(p, 1) for p in range(101, 111)]))
+    return book
+
+def test_merged_diffs_give_the_same_book():
+    diffs = random_run(50)
+    one_by_one, merged = synced_book(), synced_book()
+    for d in diffs: one_by_one.on_diff(d)
+
+    combined = diffs[0]
+    for d in diffs[1:]: combined = merge_diffs(combined, d)
+    assert (combined.first_id, combined.last_id) == (diffs[0].first_id, diffs[-1].last_id)
+    assert merged.on_diff(combined)
+    assert merged.top(100) == one_by_one.top(100)
+    assert merged.last_update_id == one_by_one.last_update_id and merged.synced
+
+def test_full_depth_queue_merges_instead_of_dropping():
+    engine = MarketEngine(queue_size=3)
+    depth, trades = asyncio.Queue(3), asyncio.Queue(3)
+    diffs = random_run(20, seed=2)
+    for d in diffs: engine._push("btcusdt@depth@100ms", depth, d, "depth@100ms")
+    for k in range(5): engine._push("btcusdt@trade", trades, k, "trade")
+
+    # the waiting diffs still follow on from each other and build the same book
+    waiting = [depth.get_nowait()[1] for _ in range(depth.qsize())]
+    assert len(waiting) == 3 and engine.merged == 17
+    assert all(a.last_id + 1 == b.first_id for a, b in zip(waiting, waiting[1:]))
+    one_by_one, queued = synced_book(), synced_book()
+    for d in diffs: one_by_one.on_diff(d)
+    for d in waiting: assert queued.on_diff(d)
+    assert queued.top(100) == one_by_one.top(100) and queued.resyncs == 0
+
+    # other streams drop their oldest frames
+    assert [trades.get_nowait()[1] for _ in range(trades.qsize())] == [2, 3, 4]
+    assert engine.dropped == 2
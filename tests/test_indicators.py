@@ -0,0 +1,63 @@
+# tests/test_indicators.py
+import random
+import numpy as np
+from utils.candles import CandleSeries
+from utils.indicators import IndicatorSet
+
+NAMES = ["EMA(20)", "RSI(14)", "MACD(12,26,9)", "ATR(14)", "SMA(20)", "BB(20,2)", "VWAP"]
+
+def synthetic(n, seed=1):
+    rng = random.Random(seed)
+    price, rows = 100.0, []
+    for i in range(n):
+        o = price
+        price = max(1.0, price + rng.uniform(-2, 2))
+        rows.append([1_700_000_000_000 + i * 1_800_000, o, max(o, price) + rng.random(), min(o, price) - rng.random(), price, rng.uniform(1, 10)])
+    return np.array(rows)
+
+def series_of(rows, capacity=1000):
+    series = CandleSeries(capacity)
+    series.load(rows)
+    return series
+
+# the same values as a numpy backfill over every bar, nan where the backfill has nan
+def check(live, rows):
+    full = IndicatorSet(series_of(rows), NAMES)
+    n = len(rows)
+    for name in NAMES:
+        np.testing.assert_allclose(live.last(name, n), full.last(name, n), rtol=1e-9, atol=1e-9, err_msg=name)
+
+def test_live_update_of_a_new_bar_matches_the_backfill():
+    rows = synthetic(301)
+    series = series_of(rows[:300])
+    live = IndicatorSet(series, NAMES)
+
+    # bar N + 1 opens, changes a few times and closes at its final values
+    t, o, h, l, c, v = rows[300]
+    for step in (1, 2):
+        close = o + (c - o) * step / 3
+        part = [t, o, max(o, close), min(o, close), close, v * step / 3]
+        series.upsert(*part)
+        live.sync()
+        check(live, np.vstack([rows[:300], part]))
+    series.upsert(*rows[300])
+    live.sync()
+    check(live, rows)
+
+def test_many_live_bars_stay_equal_to_the_backfill():
+    rows = synthetic(400, seed=2)
+    series = series_of(rows[:40])
+    live = IndicatorSet(series, NAMES)
+    for row in rows[40:]:
+        series.upsert(*row)
+        live.sync()
+    check(live, rows)
+
+def test_short_history_grows_into_the_seeding_window():
+    rows = synthetic(60, seed=3)
+    series = series_of(rows[:2])
+    live = IndicatorSet(series, NAMES)
+    for k in range(2, len(rows)):
+        series.upsert(*rows[k])
+        live.sync()
+        check(live, rows[:k + 1])
@@ -0,0 +1,31 @@
+# tests/test_paper.py
+from utils.paper import PaperTrader
+
+def resting(paper):
+    return {s: v["orders"] for s, v in paper.summary()["symbols"].items() if v["orders"]}
+
+def test_open_order_counts_follow_fills_and_cancels():
+    paper = PaperTrader(fee_rate=0)
+    ids = [paper.submit("BTC/USDT", "BUY", 1, 100 - i)[0].id for i in range(3)]
+    paper.submit("ETH/USDT", "SELL", 1, 10)
+    assert resting(paper) == {"BTC/USDT": 3, "ETH/USDT": 1}
+
+    # an aggressive sell at 99 fills the buys at 100 and 99, half of a buy qty is only a partial fill
+    fills = paper.on_trade("BTC/USDT", 99, 2.5, 1, is_buy=False)
+    assert [(f.price, f.qty) for f in fills] == [(100, 1), (99, 1)]
+    assert resting(paper) == {"BTC/USDT": 1, "ETH/USDT": 1}
+
+    assert paper.cancel(ids[0]) is None # already filled
+    assert paper.cancel_all("BTC/USDT") == 1
+    assert resting(paper) == {"ETH/USDT": 1}
+    summary = paper.summary()
+    assert summary["orders"] == 1
+    assert summary["symbols"]["BTC/USDT"]["qty"] == 2 and paper.active("BTC/USDT") # the position stays
+
+def test_aggressor_side_picks_the_resting_side():
+    paper = PaperTrader(fee_rate=0)
+    paper.submit("BTC/USDT", "BUY", 1, 100)
+    paper.submit("BTC/USDT", "SELL", 1, 100)
+    assert [f.side for f in paper.on_trade("BTC/USDT", 100, 5, 1, is_buy=True)] == ["SELL"]
+    assert [f.side for f in paper.on_trade("BTC/USDT", 100, 5, 2, is_buy=False)] == ["BUY"]
+    assert paper.summary()["orders"] == 0 and paper.open == {}
@@ -0,0 +1,55 @@
+# tests/test_recorder.py
+import json
+from utils.rest import RestClient
+from utils.recorder import FrameRecorder, ReplayRest, read_frames, REST_PREFIX
+
+# stand-in for a requests response
+class Response:
+    def __init__(self, data):
+        self.text = json.dumps(data, indent=1) # newlines like a pretty printed answer
+        self.content = self.text.encode()
+        self.status_code = 200
+        self.headers = {}
+
+    def raise_for_status(self):
+        pass
+
+# stand-in for the requests session, answers every url with the next answer of its list
+class StandInSession:
+    def __init__(self, answers):
+        self.answers = answers
+        self.calls = 0
+
+    def get(self, url, params=None, timeout=None):
+        self.calls += 1
+        return Response(self.answers[url.rsplit("/", 1)[-1]].pop(0))
+
+def record(directory, answers, calls):
+    recorder = FrameRecorder(str(directory))
+    client = RestClient(base_url="http://stand-in")
+    client.session = StandInSession(answers)
+    client.recorder = recorder
+    got = [call(client) for call in calls]
+    recorder.close()
+    return got
+
+def test_every_response_is_recorded_once_and_replayed_in_order(tmp_path):
+    snapshots = [{"lastUpdateId": i, "bids": [["100.0", "1.0"]], "asks": [["101.0", "1.0"]]} for i in (1, 2, 3)]
+    depth = lambda client: client.depth("BTCUSDT")
+    got = record(tmp_path, {"depth": list(snapshots)}, [depth, depth, depth])
+    assert [s["lastUpdateId"] for s in got] == [1, 2, 3]
+
+    lines = [stream for received, stream, raw in read_frames(str(tmp_path)) if stream.startswith(REST_PREFIX)]
+    assert len(lines) == 3
+
+    replay = ReplayRest(str(tmp_path))
+    assert [replay.depth("BTCUSDT")["lastUpdateId"] for _ in range(3)] == [1, 2, 3]
+
+def test_replayed_klines_follow_the_request(tmp_path):
+    rows = [[i * 60_000, "1", "2", "0.5", "1.5", "10"] for i in range(10)]
+    calls = [lambda client: client.klines("BTCUSDT", "1m", limit=5), lambda client: client.klines("BTCUSDT", "1m", end_time=4 * 60_000, limit=5)]
+    record(tmp_path, {"klines": [rows[5:], rows[:5]]}, calls)
+
+    replay = ReplayRest(str(tmp_path))
+    assert [r[0] for r in replay.klines("BTCUSDT", "1m", limit=3)] == [7 * 60_000, 8 * 60_000, 9 * 60_000]
+    assert [r[0] for r in replay.klines("BTCUSDT", "1m", start_time=3 * 60_000, limit=4)] == [3 * 60_000, 4 * 60_000, 5 * 60_000, 6 * 60_000]
@@ -0,0 +1,67 @@
+# tests/test_resample.py
+import random
+import numpy as np
+from utils.candles import T, H, L, C, V, CandleStore
+from utils.resample import TimeframeStore, interval_ms
+
+BASE_MS = 1_800_000
+START = 1_700_000_000_000 // BASE_MS * BASE_MS + 3 * BASE_MS # a 30m bar in the middle of hours, days and weeks
+
+def synthetic(n, seed=1):
+    rng = random.Random(seed)
+    price, rows = 100.0, []
+    for i in range(n):
+        o = price
+        price = max(1.0, price + rng.uniform(-2, 2))
+        rows.append([START + i * BASE_MS, o, max(o, price) + rng.random(), min(o, price) - rng.random(), price, rng.uniform(1, 10)])
+    return np.array(rows)
+
+# the same candles by grouping every base bar into its bucket one by one
+def direct(rows, interval):
+    ms = interval_ms(interval)
+    offset = 4 * 86_400_000 if interval.endswith("w") else 0 # weeks start on monday
+    buckets = {}
+    for t, o, h, l, c, v in rows:
+        start = (int(t) - offset) // ms * ms + offset
+        if start not in buckets: buckets[start] = [start, o, h, l, c, v]
+        else:
+            b = buckets[start]
+            b[H], b[L], b[C], b[V] = max(b[H], h), min(b[L], l), c, b[V] + v
+    return np.array([buckets[t] for t in sorted(buckets)])
+
+def check(store, rows, interval):
+    got = store.get("BTC/USDT", interval).last().T
+    assert np.allclose(got, direct(rows, interval))
+
+def test_history_is_aligned_into_buckets():
+    candles = CandleStore(2000)
+    store = TimeframeStore(candles, "30m")
+    rows = synthetic(800)
+    candles["BTC/USDT"].load(rows)
+    store.on_history("BTC/USDT")
+    for interval in ("1h", "4h", "1d", "1w"): check(store, rows, interval)
+    assert store.get("BTC/USDT", "4h").last()[T, 0] % interval_ms("4h") == 0 # the first bucket starts before the first bar
+    assert store.get("BTC/USDT", "30m") is candles["BTC/USDT"]
+
+def test_live_base_bars_update_the_partial_bucket():
+    candles = CandleStore(2000)
+    store = TimeframeStore(candles, "30m")
+    rows = synthetic(301, seed=2)
+    candles["BTC/USDT"].load(rows[:200])
+    for interval in ("1h", "4h", "1d"): store.get("BTC/USDT", interval)
+
+    # every base bar arrives as a few live updates of the open candle, then the next one opens
+    rng = random.Random(3)
+    for k in range(200, len(rows)):
+        t, o, h, l, c, v = rows[k]
+        for step in (1, 2):
+            close = o + (c - o) * step / 3
+            part = [t, o, max(o, close), min(o, close), close, v * step / 3]
+            candles["BTC/USDT"].upsert(*part)
+            store.on_candle("BTC/USDT")
+            if rng.random() < 0.3:
+                live = np.vstack([rows[:k], part])
+                for interval in ("1h", "4h", "1d"): check(store, live, interval)
+        candles["BTC/USDT"].upsert(*rows[k])
+        store.on_candle("BTC/USDT")
+    for interval in ("1h", "4h", "1d"): check(store, rows, interval)
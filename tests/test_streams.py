@@ -0,0 +1,120 @@
+# tests/test_streams.py
+import asyncio
+import json
+import websockets
+import utils.streams
+from utils.streams import StreamManager
+
+# local stand-in for the exchange: records the url and control frames of every connection,
+# answers control frames like binance and can push frames or drop the connection
+class StandInServer:
+    def __init__(self):
+        self.paths = []    # url path of each connection
+        self.controls = [] # (method, params) of every control frame
+        self.sockets = []
+
+    async def handler(self, ws):
+        self.paths.append(ws.request.path)
+        self.sockets.append(ws)
+        async for msg in ws:
+            frame = json.loads(msg)
+            self.controls.append((frame["method"], frame["params"]))
+            await ws.send(json.dumps({"result": None, "id": frame["id"]}))
+
+    # streams subscribed by the control frames so far
+    def streams(self):
+        subscribed = set()
+        for method, params in self.controls:
+            if method == "SUBSCRIBE": subscribed.update(params)
+            else: subscribed.difference_update(params)
+        return subscribed
+
+    async def start(self):
+        self.server = await websockets.serve(self.handler, "127.0.0.1", 0)
+        port = self.server.sockets[0].getsockname()[1]
+        return f"ws://127.0.0.1:{port}/stream"
+
+# wait until check() is true or fail after timeout seconds
+async def wait_for(check, timeout=3):
+    for _ in range(int(timeout / 0.01)):
+        if check(): return
+        await asyncio.sleep(0.01)
+    raise AssertionError("timed out")
+
+def trade_frame(stream, price):
+    return json.dumps({"stream": stream, "data": {"e": "trade", "E": 1, "T": 1, "p": str(price), "q": "1", "m": False}})
+
+def test_subscribe_diffs_and_routing():
+    async def run():
+        server = StandInServer()
+        manager = StreamManager(await server.start())
+        got = []
+        manager.set_streams({"btcusdt@trade": lambda t: got.append(("btc", t.price)), "ethusdt@trade": lambda t: got.append(("eth", t.price))})
+        task = asyncio.ensure_future(manager.run())
+        try:
+            # first streams go in the url, no control frame is needed
+            await wait_for(lambda: manager.ws is not None)
+            assert server.paths[0] == "/stream?streams=btcusdt@trade/ethusdt@trade"
+            assert server.controls == []
+
+            # only the difference is sent
+            manager.set_streams({"btcusdt@trade": lambda t: got.append(("btc", t.price)), "solusdt@trade": lambda t: got.append(("sol", t.price))})
+            await wait_for(lambda: len(server.controls) == 2)
+            assert server.controls == [("UNSUBSCRIBE", ["ethusdt@trade"]), ("SUBSCRIBE", ["solusdt@trade"])]
+
+            # frames are routed by their stream name, streams without a handler are ignored
+            for stream, price in (("btcusdt@trade", 1), ("ethusdt@trade", 2), ("solusdt@trade", 3)):
+                await server.sockets[0].send(trade_frame(stream, price))
+            await wait_for(lambda: len(got) == 2)
+            assert got == [("btc", 1.0), ("sol", 3.0)]
+        finally:
+            await manager.close()
+            task.cancel()
+            server.server.close()
+    asyncio.run(run())
+
+def test_control_frames_are_rate_limited_and_merged():
+    async def run():
+        server = StandInServer()
+        manager = StreamManager(await server.start(), control_rate=2)
+        task = asyncio.ensure_future(manager.run())
+        try:
+            await wait_for(lambda: manager.ws is not None)
+            for i in range(10): # ten coin switches in a row
+                manager.set_streams({f"coin{i}@trade": print})
+                await asyncio.sleep(0.02)
+            await asyncio.sleep(0.2)
+            assert len(server.controls) <= 2 # the rest waits for the next second
+
+            # wait on what the server got, manager.subscribed changes before the frame arrives
+            await wait_for(lambda: server.streams() == {"coin9@trade"}, timeout=3)
+            assert manager.subscribed == {"coin9@trade"}
+            assert len(server.controls) < 10
+        finally:
+            await manager.close()
+            task.cancel()
+            server.server.close()
+    asyncio.run(run())
+
+def test_reconnect_subscribes_current_streams(monkeypatch):
+    monkeypatch.setattr(utils.streams, "RECONNECT_MIN_DELAY", 0.05)
+    async def run():
+        server = StandInServer()
+        manager = StreamManager(await server.start())
+        manager.set_streams({"btcusdt@trade": print})
+        task = asyncio.ensure_future(manager.run())
+        try:
+            await wait_for(lambda: manager.ws is not None)
+            manager.set_streams({"btcusdt@trade": print, "ethusdt@depth@100ms": print})
+            await wait_for(lambda: len(server.controls) == 1)
+
+            # the server drops the connection, the manager connects again with every current stream
+            await server.sockets[0].close()
+            await wait_for(lambda: len(server.paths) == 2)
+            assert server.paths[1] == "/stream?streams=btcusdt@trade/ethusdt@depth@100ms"
+            assert manager.reconnects == 1
+        finally:
+            await manager.close()
+            task.cancel()
+            server.server.close()
+    asyncio.run(run())
@@ -0,0 +1,56 @@
+# tests/test_tape.py
+import pytest
+from utils.tape import TradeTape
+
+T0 = 1_700_000_000_000
+
+def test_same_side_and_price_trades_merge_into_one_row():
+    tape = TradeTape(capacity=10)
+    tape.add(T0, 100.0, 1.0, True)
+    tape.add(T0 + 5, 100.0, 2.0, True)   # merged
+    tape.add(T0 + 6, 100.0, 1.0, False)  # other side
+    tape.add(T0 + 7, 101.0, 1.0, False)  # other price
+    tape.add(T0 + 8, 101.0, 0.5, False)  # merged
+    assert tape.last(10) == [(T0 + 8, 101.0, 1.5, False, 2), (T0 + 6, 100.0, 1.0, False, 1), (T0 + 5, 100.0, 3.0, True, 2)]
+
+    plain = TradeTape(capacity=10, aggregate=False)
+    for k in range(3): plain.add(T0 + k, 100.0, 1.0, True)
+    assert len(plain) == 3
+
+def test_the_tape_keeps_the_newest_rows():
+    tape = TradeTape(capacity=4)
+    for k in range(10): tape.add(T0 + k, 100.0 + k, 1.0, k % 2 == 0)
+    assert len(tape) == 4
+    assert [row[1] for row in tape.last(10)] == [109.0, 108.0, 107.0, 106.0]
+
+def test_rolling_stats_of_the_window():
+    tape = TradeTape(capacity=100, windows=(10, 60))
+    assert tape.stats(10)["vwap"] is None and tape.stats(10)["trades_per_sec"] == 0
+    assert tape.add(T0, 100.0, 3.0, True)           # a new second
+    assert not tape.add(T0 + 400, 110.0, 1.0, False)
+    for s in range(1, 10): tape.add(T0 + s * 1000, 100.0, 1.0, True)
+
+    stats = tape.stats(10)
+    assert stats["trades_per_sec"] == pytest.approx(11 / 10)
+    assert stats["buy_volume"] == pytest.approx(12.0) and stats["sell_volume"] == pytest.approx(1.0)
+    assert stats["imbalance"] == pytest.approx(11 / 13) # buy share 12 / 13
+    assert stats["vwap"] == pytest.approx((3 * 100 + 110 + 9 * 100) / 13)
+
+    # the first second leaves the 10 s window, the 60 s window still has it
+    tape.add(T0 + 10_000, 100.0, 1.0, True)
+    assert tape.stats(10)["trades_per_sec"] == pytest.approx(10 / 10)
+    assert tape.stats(60)["trades_per_sec"] == pytest.approx(12 / 60)
+
+def test_quiet_seconds_empty_their_buckets():
+    tape = TradeTape(capacity=100, windows=(10,))
+    for s in range(10): tape.add(T0 + s * 1000, 100.0, 1.0, True)
+    tape.add(T0 + 9_000 + 25_000, 200.0, 2.0, False) # nothing for 25 s, longer than the window
+    stats = tape.stats(10)
+    assert stats["trades_per_sec"] == pytest.approx(0.1)
+    assert stats["buy_volume"] == 0 and stats["vwap"] == pytest.approx(200.0)
+
+    tape.add(T0 + 1_000, 300.0, 2.0, False) # a late trade counts in the newest second
+    assert tape.stats(1)["vwap"] == pytest.approx(250.0)
+
+    tape.clear()
+    assert len(tape) == 0 and tape.stats(10)["vwap"] is None
@@ -0,0 +1,24 @@
+# tests/test_warm.py
+from utils.warm import WarmSymbols
+
+def test_oldest_symbols_leave_above_the_count():
+    warm = WarmSymbols(3, 10_000, lambda symbol: 0)
+    for symbol in "ABC": assert warm.touch(symbol) == []
+    assert warm.touch("A") == [] # viewed again, now the newest
+    assert warm.touch("D") == ["B"]
+    assert list(warm) == ["C", "A", "D"]
+
+def test_budget_is_checked_again_when_a_symbol_grows():
+    sizes = {}
+    warm = WarmSymbols(10, 100, lambda symbol: sizes.get(symbol, 0))
+    for symbol in "ABC":
+        warm.touch(symbol) # admitted before its data is loaded
+        sizes[symbol] = 40
+    assert warm.nbytes() == 120 and len(warm) == 3 # over the budget until the next check
+    assert warm.trim() == ["A"]
+    assert warm.nbytes() <= 100
+
+    # the newest symbol stays even when it alone is over the budget
+    sizes["D"] = 500
+    assert warm.touch("D") == ["B", "C"]
+    assert warm.trim() == [] and list(warm) == ["D"]
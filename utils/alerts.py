@@ -0,0 +1,126 @@
+# utils/alerts.py
+import bisect
+import json
+import os
+from collections import namedtuple
+
+# values an alert can watch:
+# price = last price, change = 24h change in %, volume = quote volume of the last tape window, spread = spread in bps
+ALERT_METRICS = ("price", "change", "volume", "spread")
+
+Alert = namedtuple("Alert", "id symbol metric above threshold") # above: fires when the value rises through threshold
+Fired = namedtuple("Fired", "alert value time")
+
+# alert rules saved on disk as [symbol, metric, above, threshold]
+def load_alerts(path):
+    try:
+        with open(path) as f: return [tuple(a) for a in json.load(f)]
+    except (OSError, ValueError):
+        return []
+
+def save_alerts(path, rules):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f: json.dump(rules, f)
+
+# class to keep alert rules in sorted threshold lists, one per (code, metric, direction)
+# a new value only fires the rules whose threshold is between the old and the new value,
+# found with two binary searches, so the cost does not grow with the number of rules.
+# a rule that fired is quiet for cooldown seconds so a price moving around a level fires it once
+class AlertIndex:
+    def __init__(self, cooldown=60):
+        self.cooldown = cooldown
+        self.alerts = {}     # id -> Alert
+        self.levels = {}     # (code, metric, above) -> ([threshold], [id]) both sorted by threshold
+        self.values = {}     # (code, metric) -> last value (None before the first one), only for keys with rules
+        self.watched = {}    # metric -> {code: number of rules}
+        self.last_fired = {} # id -> time it fired last
+        self.next_id = 1
+        self.suppressed = 0  # crossings ignored because of the cooldown
+
+    def __len__(self):
+        return len(self.alerts)
+
+    # add a rule, symbol is a name like "BTC/USDT", returns the new Alert
+    def add(self, symbol, metric, above, threshold):
+        if metric not in ALERT_METRICS: raise ValueError(f"unknown alert metric {metric}")
+        alert = Alert(self.next_id, symbol, metric, bool(above), float(threshold))
+        self.next_id += 1
+        self.alerts[alert.id] = alert
+
+        code = self.code(symbol)
+        codes = self.watched.setdefault(metric, {})
+        codes[code] = codes.get(code, 0) + 1
+        self.values.setdefault((code, metric), None)
+
+        thresholds, ids = self.levels.setdefault((code, metric, alert.above), ([], []))
+        i = bisect.bisect_right(thresholds, alert.threshold)
+        thresholds.insert(i, alert.threshold)
+        ids.insert(i, alert.id)
+        return alert
+
+    # remove a rule, returns false if there is no rule with this id
+    def remove(self, alert_id):
+        alert = self.alerts.pop(alert_id, None)
+        if alert is None: return False
+        self.last_fired.pop(alert_id, None)
+        key = (self.code(alert.symbol), alert.metric, alert.above)
+        thresholds, ids = self.levels[key]
+        lo = bisect.bisect_left(thresholds, alert.threshold)
+        i = lo + ids[lo:].index(alert_id)
+        del thresholds[i], ids[i]
+        if not ids: del self.levels[key]
+
+        codes = self.watched[alert.metric]
+        codes[key[0]] -= 1
+        if not codes[key[0]]:
+            del codes[key[0]]
+            del self.values[key[:2]]
+        return True
+
+    # true if any rule watches this symbol code and metric
+    def watches(self, code, metric):
+        return (code, metric) in self.values
+
+    # new value of a symbol code ("BTCUSDT"), returns the rules that fired as Fired records
+    def update(self, code, metric, value, now):
+        key = (code, metric)
+        if key not in self.values: return []
+        prev = self.values[key]
+        self.values[key] = value
+        if prev is None or value == prev: return []
+
+        # rising: thresholds in [prev, value), falling: thresholds in (value, prev]
+        # the value has to get past a threshold, touching it and turning back does not fire
+        if value > prev:
+            thresholds, ids = self.levels.get((code, metric, True), ((), ()))
+            lo, hi = bisect.bisect_left(thresholds, prev), bisect.bisect_left(thresholds, value)
+        else:
+            thresholds, ids = self.levels.get((code, metric, False), ((), ()))
+            lo, hi = bisect.bisect_right(thresholds, value), bisect.bisect_right(thresholds, prev)
+
+        fired = []
+        for alert_id in ids[lo:hi]:
+            last = self.last_fired.get(alert_id)
+            if last is not None and now - last < self.cooldown:
+                self.suppressed += 1
+                continue
+            self.last_fired[alert_id] = now
+            fired.append(Fired(self.alerts[alert_id], value, now))
+        return fired
+
+    # new values of many symbols at once (e.g. one MiniTickers record), only watched codes are checked
+    def update_many(self, codes, metric, values, now):
+        watched = self.watched.get(metric)
+        fired = []
+        if not watched: return fired
+        for code, value in zip(codes, values):
+            if code in watched: fired += self.update(code, metric, value, now)
+        return fired
+
+    # every rule as [symbol, metric, above, threshold] (for save_alerts)
+    def rules(self):
+        return [[a.symbol, a.metric, a.above, a.threshold] for a in self.alerts.values()]
+
+    # "BTC/USDT" -> "BTCUSDT", the code used by the streams
+    def code(self, symbol):
+        return symbol.replace("/", "")
@@ -0,0 +1,50 @@
+# utils/bus.py
+import threading
+import time
+from utils.metrics import metrics
+
+# class to send the newest value of each key to the tkinter thread
+# if a key is written again before the ui drains it, only the newest value is kept
+class UpdateBus:
+    def __init__(self):
+        self.pending = {} # key -> (function, args)
+        self.lock = threading.Lock()
+
+        # counters to see how much work the bus saved
+        self.posted = 0    # updates written by ingest
+        self.applied = 0   # updates run on the ui thread
+        self.coalesced = 0 # updates replaced by a newer one before the ui saw them
+        self.drains = 0    # number of ui frames
+        self.stamp = None  # receive time of the update that is running
+
+    # save the newest update of a key (safe to call from any thread)
+    # stamp is the time the data was received, used to measure receive to screen latency
+    def put(self, key, func, *args, stamp=None):
+        with self.lock:
+            if key in self.pending: self.coalesced += 1
+            self.pending[key] = (func, args, stamp)
+            self.posted += 1
+
+    # run the newest update of every key, must be called from the tkinter thread
+    def drain(self):
+        with self.lock:
+            pending = self.pending
+            self.pending = {}
+            self.drains += 1
+
+        # updates only change ui state, panels are drawn later by the render scheduler
+        for key, (func, args, stamp) in pending.items():
+            name = key[0] if isinstance(key, tuple) else key
+            start = time.perf_counter()
+            self.stamp = stamp
+            try: func(*args)
+            except Exception as e: metrics.error(f"ui.{name}", e)
+            metrics.observe(f"apply.{name}", (time.perf_counter() - start) * 1000)
+        self.stamp = None
+        self.applied += len(pending)
+
+    # counters as a dictionary
+    def stats(self):
+        return {"posted": self.posted, "applied": self.applied,
+                "coalesced": self.coalesced, "drains": self.drains,
+                "pending": len(self.pending)}
@@ -0,0 +1,109 @@
+# utils/cache.py
+import os
+import threading
+import numpy as np
+from utils.candles import T, candles_from_klines
+
+PAGE_LIMIT = 1000 # max klines binance returns in one request
+ROW_BYTES = 6 * 8 # t, o, h, l, c, v as float64
+
+# class to keep klines on disk, one binary file of float64 rows for each (symbol, interval)
+# only candles newer than the last stored open time are downloaded again.
+# when a backward page comes back short the exchange has no older candles, a ".start" marker file
+# is written next to the data so a young symbol does not ask for older candles on every update
+class KlineCache:
+    def __init__(self, directory):
+        self.directory = directory
+        self.locks = {} # one lock for each file
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, symbol, interval):
+        return os.path.join(self.directory, f"{symbol.upper()}_{interval}.bin")
+
+    # true if the first candle of the symbol is already stored
+    def has_start(self, symbol, interval):
+        return os.path.exists(self.path(symbol, interval) + ".start")
+
+    def mark_start(self, symbol, interval):
+        open(self.path(symbol, interval) + ".start", "w").close()
+
+    # all stored candles as a (n, 6) array (empty if nothing is stored)
+    def load(self, symbol, interval):
+        path = self.path(symbol, interval)
+        if not os.path.exists(path): return np.empty((0, 6))
+        data = np.fromfile(path, dtype="<f8")
+        return data[:len(data) - len(data) % 6].reshape(-1, 6)
+
+    # write new candles, rows with the same or newer open time are replaced
+    def save(self, symbol, interval, rows):
+        if not len(rows): return
+        path = self.path(symbol, interval)
+        stored = self.load(symbol, interval)
+
+        # cut the file where the new rows start, then append them
+        keep = np.searchsorted(stored[:, T], rows[0, T]) if len(stored) else 0
+        with open(path, "ab") as f:
+            f.truncate(keep * ROW_BYTES)
+            np.ascontiguousarray(rows, dtype="<f8").tofile(f)
+
+    # put older candles in front of the stored ones (rewrites the file)
+    def prepend(self, symbol, interval, rows):
+        if not len(rows): return
+        stored = self.load(symbol, interval)
+        if len(stored): rows = rows[rows[:, T] < stored[0, T]]
+        merged = np.concatenate([rows, stored])
+
+        tmp = self.path(symbol, interval) + ".tmp"
+        np.ascontiguousarray(merged, dtype="<f8").tofile(tmp)
+        os.replace(tmp, self.path(symbol, interval))
+
+    # download only what is missing and return all stored candles
+    # fetch(symbol, interval, start_time=None, end_time=None, limit=1000) must return rest klines
+    def update(self, symbol, interval, fetch, history=PAGE_LIMIT):
+        with self.lock:
+            lock = self.locks.setdefault((symbol.upper(), interval), threading.Lock())
+        with lock:
+            stored = self.load(symbol, interval)
+
+            # newer candles (the last stored one may still be open, so get it again)
+            if len(stored):
+                newer = self.page_forward(fetch, symbol, interval, int(stored[-1, T]))
+            else:
+                newer, at_start = self.page_backward(fetch, symbol, interval, None, history)
+                if at_start: self.mark_start(symbol, interval)
+            self.save(symbol, interval, newer)
+
+            # older candles if we keep less history than wanted and older ones exist
+            stored = self.load(symbol, interval)
+            if 0 < len(stored) < history and not self.has_start(symbol, interval):
+                older, at_start = self.page_backward(fetch, symbol, interval, int(stored[0, T]) - 1, history - len(stored))
+                if at_start: self.mark_start(symbol, interval)
+                self.prepend(symbol, interval, older)
+            return self.load(symbol, interval)
+
+    # get pages from start_time to now
+    def page_forward(self, fetch, symbol, interval, start_time):
+        pages = []
+        while True:
+            page = fetch(symbol, interval, start_time=start_time, limit=PAGE_LIMIT)
+            if page: pages.extend(page)
+            if len(page) < PAGE_LIMIT: break
+            start_time = page[-1][0] + 1
+        return candles_from_klines(pages)
+
+    # get pages going back from end_time until count candles
+    # returns the candles and true if a short page showed there are no older candles
+    def page_backward(self, fetch, symbol, interval, end_time, count):
+        pages = []
+        at_start = False
+        while count > 0:
+            limit = min(count, PAGE_LIMIT)
+            page = fetch(symbol, interval, end_time=end_time, limit=limit)
+            if page: pages = page + pages
+            if len(page) < limit:
+                at_start = True
+                break
+            count -= len(page)
+            end_time = page[0][0] - 1
+        return candles_from_klines(pages), at_start
@@ -0,0 +1,92 @@
+# utils/candles.py
+import numpy as np
+
+# column index of each candle field
+T, O, H, L, C, V = range(6)
+
+# convert rest klines (lists of strings) to a (n, 6) float array in one numpy call
+def candles_from_klines(klines):
+    if not klines: return np.empty((0, 6))
+    return np.array([k[:6] for k in klines], dtype=float)
+
+# class to keep candles of one symbol in preallocated numpy arrays
+# every bar is written twice (at i and i + capacity) so the newest bars are
+# always one continuous block and last(n) can return a view without copying
+class CandleSeries:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.data = np.zeros((6, capacity * 2))
+        self.end = 0 # number of bars ever written
+
+    def __len__(self):
+        return min(self.end, self.capacity)
+
+    # position of the newest bar in the second half of the array
+    def _last_index(self):
+        return (self.end - 1) % self.capacity + self.capacity
+
+    # open time of the newest bar (None if empty)
+    def last_time(self):
+        if self.end == 0: return None
+        return self.data[T, self._last_index()]
+
+    # view (6, n) of the newest n bars, rows are t, o, h, l, c, v
+    def last(self, n=None):
+        size = len(self)
+        n = size if n is None else min(n, size)
+        stop = self._last_index() + 1 if size else 0
+        return self.data[:, stop - n:stop]
+
+    # add a new bar at the end, the oldest bar is dropped when full
+    def append(self, t, o, h, l, c, v):
+        pos = self.end % self.capacity
+        self.data[:, pos] = self.data[:, pos + self.capacity] = (t, o, h, l, c, v)
+        self.end += 1
+
+    # change the newest bar in place
+    def update_last(self, t, o, h, l, c, v):
+        pos = (self.end - 1) % self.capacity
+        self.data[:, pos] = self.data[:, pos + self.capacity] = (t, o, h, l, c, v)
+
+    # live kline: update the newest bar if it is the same candle, else append
+    def upsert(self, t, o, h, l, c, v):
+        last_t = self.last_time()
+        if last_t == t: self.update_last(t, o, h, l, c, v)
+        elif last_t is None or t > last_t: self.append(t, o, h, l, c, v)
+
+    # replace all bars with a (n, 6) array, keep live bars newer than the array
+    def load(self, rows):
+        if not len(rows): return
+        newer = np.empty((0, 6))
+        if self.end:
+            bars = self.last()
+            newer = bars[:, bars[T] > rows[-1, T]].T.copy()
+
+        rows = rows[-self.capacity:]
+        n = len(rows)
+        self.data[:, :n] = rows.T
+        self.data[:, self.capacity:self.capacity + n] = rows.T
+        self.end = n
+        for row in newer: self.append(*row)
+
+# class to keep one candle series for each symbol
+class CandleStore:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.series = {}
+
+    def __getitem__(self, symbol):
+        if symbol not in self.series:
+            self.series[symbol] = CandleSeries(self.capacity)
+        return self.series[symbol]
+
+    def __contains__(self, symbol):
+        return symbol in self.series
+
+    # forget the candles of a symbol
+    def drop(self, symbol):
+        self.series.pop(symbol, None)
+
+    # bytes used by the candles of a symbol
+    def nbytes(self, symbol):
+        return self.series[symbol].data.nbytes if symbol in self.series else 0
@@ -1,4 +1,5 @@
 # utils/config.py
+import os
 
 # setting color and font for application
 BG_COLOR = "#131722"
@@ -9,4 +10,64 @@ GREEN_COLOR = "#0ECB81"
 RED_COLOR = "#F6465D"
 
 FONT_MAIN = ("Segoe UI", 10)
-FONT_BOLD = ("Segoe UI", 12, "bold")
\ No newline at end of file
+FONT_BOLD = ("Segoe UI", 12, "bold")
+
+# setting address for binance api
+STREAM_URL = "wss://stream.binance.com:9443/stream"
+REST_URL = "https://api.binance.com/api/v3"
+
+# setting for rest api client
+REST_WEIGHT_LIMIT = 5000  # request weight per minute we allow (binance limit is 6000)
+REST_RETRIES = 3          # retries of a failed request
+REST_RETRY_DELAY = 0.5    # seconds before first retry
+REST_POOL_SIZE = 8        # keep-alive connections and parallel requests
+
+# setting for market data engine
+QUEUE_SIZE = 500          # max frames waiting for each stream
+RECONNECT_MIN_DELAY = 1   # seconds before first reconnect
+RECONNECT_MAX_DELAY = 60  # max seconds between reconnects
+STREAM_CONTROL_RATE = 4   # max SUBSCRIBE / UNSUBSCRIBE frames per second (binance drops a socket over 5 messages a second)
+FRAME_RATE = 20           # tkinter updates per second
+HIDDEN_FRAME_RATE = 2     # tkinter updates per second while the window is minimized (data only, no drawing)
+FRAME_BUDGET_MS = 12      # drawing time of one frame, dirty panels over it wait for the next frame
+UNFOCUSED_SLOWDOWN = 4    # panel rates are divided by this while the window is not focused
+# panels in priority order with their max renders per second
+RENDER_PANELS = [("chart", 10), ("book", 10), ("trades", 5), ("watchlist", 4), ("position", 2), ("tape_stats", 1)]
+METRICS_EXPORT_SECONDS = 60 # seconds between metrics exports
+# startup steps timed from the start of main.py, reported once all of them are done
+STARTUP_PHASES = ("imports", "window", "cache", "first_price", "chart", "history", "watchlist")
+STARTUP_STREAM_DELAY = 3  # seconds to wait for the first price of the current coin before the other streams open anyway
+STARTUP_REPORT_SECONDS = 30 # report the phases done by then if some never finish (offline, replay)
+RECORD_SEGMENT_BYTES = 64 * 1024 * 1024 # frames in one recorder file before a new one starts
+CANDLE_CAPACITY = 5000    # max candles kept for each symbol
+KLINE_INTERVAL = "30m"    # candle interval of chart and kline stream
+TIMEFRAMES = ["30m", "1h", "4h", "1d"] # chart timeframes made from KLINE_INTERVAL candles
+KLINE_HISTORY = 1000      # candles kept in the disk cache for each symbol
+KLINE_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache", "klines")
+WATCHLIST_QUOTES = ("USDT",) # quote assets of the symbols in the watchlist
+WATCHLIST_ROWS = 12       # rows of widgets in the watchlist, other symbols are scrolled into them
+SYMBOLS_CACHE = os.path.join(os.path.dirname(KLINE_CACHE_DIR), "symbols.json")
+INDICATORS = ["EMA(20)", "EMA(50)", "SMA(20)", "BB(20,2)", "VWAP", "RSI(14)", "MACD(12,26,9)", "ATR(14)"] # kept up to date for the shown chart
+CHART_OVERLAYS = ["EMA(20)", "BB(20,2)"] # indicators drawn on the candles at start
+CHART_SUB_PANE = "RSI(14)" # indicator in the pane below the volume at start
+CHART_BACKEND = "matplotlib" # "matplotlib" (last 40 candles) or "canvas" (tk canvas with zoom and pan over the history)
+CHART_CANDLE_PX = 3       # canvas chart: min pixels per candle, zoomed out candles are merged (min/max) to keep it
+CANVAS_KLINE_HISTORY = 20000 # candles kept on disk and in memory for the canvas chart
+INDICATOR_COLORS = ["#F0B90B", "#3B82F6", "#A855F7", "#EC4899", "#14B8A6"]
+WARM_SYMBOLS = 5          # recently viewed symbols whose streams and data stay live
+WARM_MEMORY_MB = 64       # memory budget of the warm symbols, the oldest is evicted above it
+ALERTS_FILE = os.path.join(os.path.dirname(KLINE_CACHE_DIR), "alerts.json") # alert rules, kept between runs
+ALERT_COOLDOWN = 60       # seconds a rule stays quiet after it fired
+ALERT_SHOW_SECONDS = 8    # seconds the alert notice stays on screen
+ALERT_LINES = 5           # newest alerts shown in the notice
+PAPER_FEE_RATE = 0.001    # paper trading fee of every fill (0.1% of its value)
+DEPTH_LIMIT = 1000        # levels in the order book rest snapshot
+TAPE_CAPACITY = 1000      # trades kept in the trade tape of each symbol
+TAPE_AGGREGATE = True     # merge trades with the same side and price in a row
+TAPE_WINDOWS = (10, 60)   # seconds for rolling trade stats
+
+# setting for the local data server (one upstream connection for many dashboards)
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 9444
+SERVER_URL = f"ws://{SERVER_HOST}:{SERVER_PORT}/stream"
+SERVER_CLIENT_QUEUE = 1000 # frames waiting for one client before the oldest is dropped
@@ -0,0 +1,61 @@
+# utils/decode.py
+import json
+from collections import namedtuple
+import numpy as np
+
+# use orjson when it is installed (several times faster), otherwise the standard json module
+try:
+    import orjson
+    loads = orjson.loads
+    JSON_BACKEND = "orjson"
+except ImportError:
+    loads = json.loads
+    JSON_BACKEND = "json"
+
+# compact records with only the fields the handlers use, every value is converted once
+# times are ms integers, prices and quantities are floats
+Ticker = namedtuple("Ticker", "event_time price change percent volume")
+Kline = namedtuple("Kline", "event_time open_time open high low close volume closed")
+Trade = namedtuple("Trade", "event_time time price qty is_buy")
+DepthDiff = namedtuple("DepthDiff", "event_time first_id last_id bids asks") # bids / asks are (n, 2) arrays
+DepthSnapshot = namedtuple("DepthSnapshot", "last_update_id bids asks")
+MiniTickers = namedtuple("MiniTickers", "event_time codes close open quote_volume") # one row per symbol, columns are arrays
+
+# [[price, qty], ...] as strings -> (n, 2) float array in one numpy call
+def parse_levels(levels):
+    if not levels: return np.empty((0, 2))
+    return np.array(levels, dtype=float)
+
+def decode_ticker(data):
+    return Ticker(data["E"], float(data["c"]), float(data["p"]), float(data["P"]), float(data["v"]))
+
+def decode_kline(data):
+    k = data["k"]
+    return Kline(data["E"], k["t"], float(k["o"]), float(k["h"]), float(k["l"]), float(k["c"]), float(k["v"]), k.get("x", False))
+
+# buyer is maker means the taker sold
+def decode_trade(data):
+    return Trade(data["E"], data["T"], float(data["p"]), float(data["q"]), not data["m"])
+
+# !miniTicker@arr: list of the symbols that changed in the last second
+def decode_mini_tickers(data):
+    return MiniTickers(max((t["E"] for t in data), default=None), [t["s"] for t in data],
+                       np.array([t["c"] for t in data], dtype=float),
+                       np.array([t["o"] for t in data], dtype=float),
+                       np.array([t["q"] for t in data], dtype=float))
+
+def decode_depth(data):
+    return DepthDiff(data["E"], data["U"], data["u"], parse_levels(data["b"]), parse_levels(data["a"]))
+
+# rest snapshot {"lastUpdateId", "bids", "asks"}
+def decode_snapshot(data):
+    return DepthSnapshot(data["lastUpdateId"], parse_levels(data["bids"]), parse_levels(data["asks"]))
+
+# decoder for the type of a stream ("ticker", "kline_30m", "depth@100ms", "trade", "miniTicker@arr")
+def decoder_for(kind):
+    if kind == "ticker": return decode_ticker
+    if kind == "miniTicker@arr": return decode_mini_tickers
+    if kind.startswith("kline"): return decode_kline
+    if kind.startswith("depth"): return decode_depth
+    if kind == "trade": return decode_trade
+    return None
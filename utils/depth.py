@@ -0,0 +1,183 @@
+# utils/depth.py
+import sys
+from bisect import bisect_left
+import numpy as np
+from utils.decode import DepthDiff
+
+# levels of two diffs in one (n, 2) array, the last quantity in apply order wins for the same price
+def merge_levels(old, new):
+    if not len(old): return new
+    if not len(new): return old
+    levels = np.concatenate([old, new])[::-1]
+    prices, first = np.unique(levels[:, 0], return_index=True)
+    return levels[first]
+
+# one diff with the changes of two diffs in a row (old.last_id + 1 == new.first_id),
+# applying it gives the same book as applying both and its update ids still follow on
+def merge_diffs(old, new):
+    return DepthDiff(new.event_time, old.first_id, new.last_id, merge_levels(old.bids, new.bids), merge_levels(old.asks, new.asks))
+
+# class to keep one side of the book sorted by price, best level first
+# prices are stored as sign * price so bids and asks both sort ascending
+class BookSide:
+    def __init__(self, descending=False):
+        self.sign = -1 if descending else 1
+        self.keys = [] # sign * price, sorted
+        self.qtys = [] # quantity of each level
+
+    def __len__(self):
+        return len(self.keys)
+
+    # set quantity of one price level (binary search), qty 0 removes the level
+    def set(self, price, qty):
+        key = self.sign * price
+        i = bisect_left(self.keys, key)
+        found = i < len(self.keys) and self.keys[i] == key
+
+        if qty == 0:
+            if found:
+                del self.keys[i]
+                del self.qtys[i]
+        elif found:
+            self.qtys[i] = qty
+        else:
+            self.keys.insert(i, key)
+            self.qtys.insert(i, qty)
+
+    def clear(self):
+        self.keys = []
+        self.qtys = []
+
+    # bytes of the two lists and their float objects
+    def nbytes(self):
+        return sys.getsizeof(self.keys) + sys.getsizeof(self.qtys) + 2 * sys.getsizeof(0.0) * len(self.keys)
+
+    # best (price, qty) or None
+    def best(self):
+        if not self.keys: return None
+        return self.sign * self.keys[0], self.qtys[0]
+
+    # best n levels as (price, qty)
+    def top(self, n):
+        return [(self.sign * k, q) for k, q in zip(self.keys[:n], self.qtys[:n])]
+
+    # walk levels from the best one until size is filled
+    # returns (filled qty, cost, worst price touched)
+    def depth_to(self, size):
+        filled = cost = 0.0
+        price = None
+        for key, qty in zip(self.keys, self.qtys):
+            price = self.sign * key
+            take = min(qty, size - filled)
+            filled += take
+            cost += take * price
+            if filled >= size: break
+        return filled, cost, price
+
+    # (price, qty) taken from the best level on to fill size, no level worse than limit
+    def take(self, size, limit=None):
+        taken, left = [], size
+        for key, qty in zip(self.keys, self.qtys):
+            if left <= 0 or (limit is not None and key > self.sign * limit): break
+            q = min(qty, left)
+            taken.append((self.sign * key, q))
+            left -= q
+        return taken
+
+# class to keep a full local order book from a rest snapshot and the diff depth stream
+# follows the binance sync rules: buffer diffs, load snapshot, drop old diffs,
+# then every diff must continue from the last update id or the book is synced again
+class OrderBook:
+    def __init__(self, symbol, max_buffer=1000):
+        self.symbol = symbol
+        self.bids = BookSide(descending=True)
+        self.asks = BookSide()
+        self.last_update_id = None
+        self.synced = False
+        self.buffer = []          # diffs received before the snapshot
+        self.max_buffer = max_buffer
+        self.snapshot_pending = False
+        self.resyncs = 0          # times a gap forced a new snapshot
+
+    # true if the book needs a rest snapshot and nobody asked for one yet
+    def needs_snapshot(self):
+        return not self.synced and not self.snapshot_pending
+
+    # handle one DepthDiff record, returns true if the book changed
+    def on_diff(self, event):
+        if not self.synced:
+            self.buffer.append(event)
+            if len(self.buffer) > self.max_buffer: self.buffer.pop(0)
+            return False
+        return self.apply(event)
+
+    # load a DepthSnapshot record and replay buffered diffs
+    def load_snapshot(self, snapshot):
+        self.snapshot_pending = False
+        last_id = snapshot.last_update_id
+
+        # snapshot is older than the first buffered diff (ids in between are missing), ask again
+        if self.buffer and last_id + 1 < self.buffer[0].first_id: return False
+
+        self.bids.clear()
+        self.asks.clear()
+        for price, qty in snapshot.bids.tolist(): self.bids.set(price, qty)
+        for price, qty in snapshot.asks.tolist(): self.asks.set(price, qty)
+        self.last_update_id = last_id
+        self.synced = True
+
+        buffer = self.buffer
+        self.buffer = []
+        for event in buffer:
+            if event.last_id <= last_id: continue
+            self.apply(event)
+        return True
+
+    # apply one diff after checking its update ids
+    def apply(self, event):
+        if event.last_id <= self.last_update_id: return False # old event
+
+        # gap in the stream, throw the book away and sync again
+        if event.first_id > self.last_update_id + 1:
+            self.resync(event)
+            return False
+
+        for price, qty in event.bids.tolist(): self.bids.set(price, qty)
+        for price, qty in event.asks.tolist(): self.asks.set(price, qty)
+        self.last_update_id = event.last_id
+        return True
+
+    def resync(self, event=None):
+        self.synced = False
+        self.resyncs += 1
+        self.buffer = [event] if event else []
+
+    # bytes of both sides and the diffs waiting for a snapshot
+    def nbytes(self):
+        return self.bids.nbytes() + self.asks.nbytes() + sum(e.bids.nbytes + e.asks.nbytes for e in self.buffer)
+
+    def best_bid(self):
+        return self.bids.best()
+
+    def best_ask(self):
+        return self.asks.best()
+
+    # difference between best ask and best bid
+    def spread(self):
+        bid, ask = self.bids.best(), self.asks.best()
+        if bid is None or ask is None: return None
+        return ask[0] - bid[0]
+
+    # cost to buy (walk asks) or sell (walk bids) a given size
+    def depth_to(self, side, size):
+        book_side = self.asks if side == "BUY" else self.bids
+        return book_side.depth_to(size)
+
+    # levels a buy (asks) or sell (bids) of size would take, up to a limit price
+    def take(self, side, size, limit=None):
+        book_side = self.asks if side == "BUY" else self.bids
+        return book_side.take(size, limit)
+
+    # best n bids and asks
+    def top(self, n):
+        return self.bids.top(n), self.asks.top(n)
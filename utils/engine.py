@@ -0,0 +1,125 @@
+# utils/engine.py
+import asyncio
+import threading
+import time
+from utils.config import *
+from utils.streams import StreamManager, stream_kind
+from utils.metrics import metrics
+from utils.bus import UpdateBus
+from utils.depth import merge_diffs
+
+# class to run all market data work on one background event loop
+# handlers run one at a time on the loop thread, results go to tkinter through post()
+# recorder saves every raw frame, replay feeds recorded frames instead of the network
+class MarketEngine:
+    def __init__(self, url=STREAM_URL, queue_size=QUEUE_SIZE, recorder=None, replay=None):
+        self.loop = asyncio.new_event_loop()
+        self.streams = StreamManager(url)
+        self.streams.recorder = recorder
+        self.replay = replay
+        self.queue_size = queue_size
+
+        self.handlers = {} # stream name -> function(record)
+        self.queues = {}   # stream name -> bounded asyncio.Queue
+        self.workers = {}  # stream name -> task reading the queue
+        self.newest = {}   # stream name -> newest [receive time, record] put in its queue
+        self.dropped = 0   # frames dropped because a queue was full
+        self.merged = 0    # depth diffs merged into a waiting one because a queue was full
+        self.received = None # receive time of the frame the running handler works on
+
+        # the only place where data crosses from the loop thread to tkinter
+        self.bus = UpdateBus()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    # start the background loop thread
+    def start(self):
+        self.thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        if self.replay: self.loop.create_task(self.replay.run(self.streams))
+        else: self.loop.create_task(self.streams.run())
+        self.loop.run_forever()
+
+    # change the subscribed streams (safe to call from tkinter)
+    def set_streams(self, handlers):
+        self.loop.call_soon_threadsafe(self._set_streams, dict(handlers))
+
+    def _set_streams(self, handlers):
+        # stop workers of streams we do not need anymore
+        for stream in list(self.queues):
+            if stream not in handlers:
+                self.workers.pop(stream).cancel()
+                del self.queues[stream]
+                self.newest.pop(stream, None)
+
+        # one bounded queue and one worker for each new stream
+        for stream in handlers:
+            if stream not in self.queues:
+                queue = asyncio.Queue(self.queue_size)
+                self.queues[stream] = queue
+                self.workers[stream] = self.loop.create_task(self._work(stream, queue))
+
+        self.handlers = handlers
+        self.streams.set_streams({s: (lambda data, s=s, q=q, k=stream_kind(s): self._push(s, q, data, k)) for s, q in self.queues.items()})
+
+    # put a frame in the stream queue so a slow handler never stops the socket reader.
+    # when the queue is full a depth diff is merged into the newest waiting diff (no update id gap,
+    # so no rest snapshot to resync), other streams drop their oldest frame
+    def _push(self, stream, queue, data, kind):
+        if queue.full():
+            if kind.startswith("depth"):
+                waiting = self.newest[stream]
+                waiting[1] = merge_diffs(waiting[1], data)
+                self.merged += 1
+                metrics.count(f"merged.{kind}")
+                return
+            queue.get_nowait()
+            self.dropped += 1
+            metrics.count(f"dropped.{kind}")
+        item = [time.time(), data]
+        self.newest[stream] = item
+        queue.put_nowait(item)
+        metrics.observe(f"queue.{kind}", queue.qsize())
+
+    # read frames of one stream and call its handler
+    async def _work(self, stream, queue):
+        kind = stream_kind(stream)
+        while True:
+            received, data = await queue.get()
+            handler = self.handlers.get(stream)
+            if handler is None: continue
+
+            # time from the exchange event to our socket (a replay has the recorded event times)
+            event_time = getattr(data, "event_time", None)
+            if event_time and not self.replay: metrics.observe(f"latency.exchange.{kind}", received * 1000 - event_time)
+
+            self.received = received
+            try: handler(data)
+            except Exception as e: metrics.error(f"handler.{kind}", e)
+            self.received = None
+
+    # run a function on the loop thread (safe to call from any thread)
+    def call(self, func, *args):
+        self.loop.call_soon_threadsafe(func, *args)
+
+    # run a blocking function (e.g. rest request) in the loop executor
+    def run_blocking(self, func, *args):
+        self.loop.call_soon_threadsafe(self.loop.run_in_executor, None, func, *args)
+
+    # send a function call to the tkinter thread, a newer call with the same key replaces it
+    def post(self, key, func, *args):
+        self.bus.put(key, func, *args, stamp=self.received)
+
+    # run the newest call of every key, must be called from the tkinter thread
+    def drain(self):
+        self.bus.drain()
+
+    # stop the connection and the loop
+    def close(self):
+        if not self.loop.is_running(): return
+        future = asyncio.run_coroutine_threadsafe(self.streams.close(), self.loop)
+        try: future.result(timeout=2)
+        except Exception as e: metrics.error("engine.close", e)
+        if self.streams.recorder: self.loop.call_soon_threadsafe(self.streams.recorder.close)
+        self.loop.call_soon_threadsafe(self.loop.stop)
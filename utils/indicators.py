@@ -0,0 +1,378 @@
+# utils/indicators.py
+import re
+import numpy as np
+from utils.candles import T, H, L, C, V
+
+DAY_MS = 86_400_000
+EMA_BLOCK = 256 # values per block in the vectorized ema, keeps the powers inside float range
+
+# exponential moving average of a whole array, y = prev + alpha * (x - prev)
+# inside a block y_k = q^(k+1) * (prev + alpha * sum(x_i / q^(i+1))) with q = 1 - alpha
+def ema(values, alpha, prev=None):
+    out = np.empty(len(values))
+    if len(values) == 0: return out
+    if alpha >= 1:
+        out[:] = values
+        return out
+    if prev is None: prev = values[0]
+
+    q = 1 - alpha
+    for start in range(0, len(values), EMA_BLOCK):
+        x = values[start:start + EMA_BLOCK]
+        decay = q ** np.arange(1, len(x) + 1)
+        block = decay * (prev + alpha * np.cumsum(x / decay))
+        out[start:start + len(x)] = block
+        prev = block[-1]
+    return out
+
+# sum of the last n values at every position (nan until n values exist)
+def rolling_sum(values, n):
+    out = np.full(len(values), np.nan)
+    if len(values) < n: return out
+    total = np.cumsum(values)
+    out[n - 1] = total[n - 1]
+    out[n:] = total[n:] - total[:-n]
+    return out
+
+# every indicator has two ways to compute:
+# compute(bars) works on a (6, n) array of history at once and returns (outputs (k, n), state after the last bar)
+# step(state, window) computes the newest bar from the state after the bar before it,
+# window is a view of the newest `lookback` bars, returns (values, state after the newest bar)
+class Indicator:
+    pane = "price"   # "price" draws on the candles, "sub" in the pane below the volume
+    outputs = ()     # name of each output line
+    lookback = 1     # bars step() needs to see
+    limits = None    # fixed y range of the pane, None fits the values
+
+    def __init__(self, name):
+        self.name = name
+
+class SMA(Indicator):
+    outputs = ("sma",)
+
+    def __init__(self, name, period=20):
+        super().__init__(name)
+        self.period = self.lookback = int(period)
+
+    # state: sum of the last period - 1 closes, bars seen
+    def compute(self, bars):
+        c = bars[C]
+        out = rolling_sum(c, self.period) / self.period
+        keep = self.period - 1
+        return out[None], (c[len(c) - keep:].sum() if keep else 0.0, len(c))
+
+    def step(self, state, window):
+        total, count = state
+        c = window[C, -1]
+        total += c
+        count += 1
+        if count < self.period: return (np.nan,), (total, count)
+        return (total / self.period,), (total - window[C, -self.period], count)
+
+class EMA(Indicator):
+    outputs = ("ema",)
+
+    def __init__(self, name, period=20):
+        super().__init__(name)
+        self.alpha = 2 / (int(period) + 1)
+
+    # state: ema of the bar
+    def compute(self, bars):
+        out = ema(bars[C], self.alpha)
+        return out[None], (out[-1] if len(out) else None)
+
+    def step(self, state, window):
+        c = window[C, -1]
+        value = c if state is None else state + self.alpha * (c - state)
+        return (value,), value
+
+# bollinger bands: sma +- width * population standard deviation
+class BB(Indicator):
+    outputs = ("upper", "middle", "lower")
+
+    def __init__(self, name, period=20, width=2):
+        super().__init__(name)
+        self.period = self.lookback = int(period)
+        self.width = float(width)
+
+    def bands(self, total, squares):
+        mean = total / self.period
+        std = np.sqrt(np.maximum(squares / self.period - mean * mean, 0))
+        return mean + self.width * std, mean, mean - self.width * std
+
+    # state: sum and sum of squares of the last period - 1 closes, bars seen
+    def compute(self, bars):
+        c = bars[C]
+        out = np.array(self.bands(rolling_sum(c, self.period), rolling_sum(c * c, self.period)))
+        keep = c[len(c) - self.period + 1:] if self.period > 1 else c[:0]
+        return out, (keep.sum(), (keep * keep).sum(), len(c))
+
+    def step(self, state, window):
+        total, squares, count = state
+        c = window[C, -1]
+        total += c
+        squares += c * c
+        count += 1
+        if count < self.period: return (np.nan,) * 3, (total, squares, count)
+        values = self.bands(total, squares)
+        old = window[C, -self.period]
+        return values, (total - old, squares - old * old, count)
+
+# relative strength index with wilder smoothing
+class RSI(Indicator):
+    pane = "sub"
+    outputs = ("rsi",)
+    lookback = 2
+    limits = (0, 100)
+
+    def __init__(self, name, period=14):
+        super().__init__(name)
+        self.period = int(period)
+
+    def rsi(self, gain, loss):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(loss > 0, 100 - 100 / (1 + gain / loss), np.where(gain > 0, 100.0, 50.0))
+
+    # state: average gain, average loss, bars seen
+    def compute(self, bars):
+        c = bars[C]
+        out = np.full(len(c), np.nan)
+        if len(c) < 2: return out[None], (None, None, len(c))
+        diff = np.diff(c)
+        gain = ema(np.maximum(diff, 0), 1 / self.period)
+        loss = ema(np.maximum(-diff, 0), 1 / self.period)
+        out[1:] = self.rsi(gain, loss)
+        out[:self.period] = np.nan
+        return out[None], (gain[-1], loss[-1], len(c))
+
+    def step(self, state, window):
+        gain, loss, count = state
+        count += 1
+        if window.shape[1] < 2: return (np.nan,), (gain, loss, count)
+        diff = window[C, -1] - window[C, -2]
+        up, down = max(diff, 0.0), max(-diff, 0.0)
+        gain = up if gain is None else gain + (up - gain) / self.period
+        loss = down if loss is None else loss + (down - loss) / self.period
+        value = float(self.rsi(gain, loss)) if count > self.period else np.nan
+        return (value,), (gain, loss, count)
+
+class MACD(Indicator):
+    pane = "sub"
+    outputs = ("macd", "signal", "hist")
+
+    def __init__(self, name, fast=12, slow=26, signal=9):
+        super().__init__(name)
+        self.fast, self.slow, self.signal = (2 / (int(n) + 1) for n in (fast, slow, signal))
+
+    # state: fast ema, slow ema, signal ema
+    def compute(self, bars):
+        fast = ema(bars[C], self.fast)
+        slow = ema(bars[C], self.slow)
+        macd = fast - slow
+        signal = ema(macd, self.signal)
+        state = (fast[-1], slow[-1], signal[-1]) if len(macd) else (None, None, None)
+        return np.array([macd, signal, macd - signal]), state
+
+    def step(self, state, window):
+        fast, slow, signal = state
+        c = window[C, -1]
+        fast = c if fast is None else fast + self.fast * (c - fast)
+        slow = c if slow is None else slow + self.slow * (c - slow)
+        macd = fast - slow
+        signal = macd if signal is None else signal + self.signal * (macd - signal)
+        return (macd, signal, macd - signal), (fast, slow, signal)
+
+# volume weighted average price of the day (utc), starts again every day
+class VWAP(Indicator):
+    outputs = ("vwap",)
+
+    def typical(self, bars):
+        return (bars[H] + bars[L] + bars[C]) / 3
+
+    # state: day, sum of price * volume and sum of volume of the day
+    def compute(self, bars):
+        if bars.shape[1] == 0: return np.empty((1, 0)), (None, 0.0, 0.0)
+        day = bars[T] // DAY_MS
+        tp = self.typical(bars)
+        pv = np.cumsum(tp * bars[V])
+        vv = np.cumsum(bars[V])
+
+        # totals before the first bar of each day
+        first = np.maximum.accumulate(np.where(np.r_[True, day[1:] != day[:-1]], np.arange(len(day)), 0))
+        pv_day = pv - (pv - tp * bars[V])[first]
+        vv_day = vv - (vv - bars[V])[first]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out = np.where(vv_day > 0, pv_day / vv_day, tp)
+        return out[None], (day[-1], pv_day[-1], vv_day[-1])
+
+    def step(self, state, window):
+        day, pv, vv = state
+        bar = window[:, -1]
+        if bar[T] // DAY_MS != day: day, pv, vv = bar[T] // DAY_MS, 0.0, 0.0
+        tp = (bar[H] + bar[L] + bar[C]) / 3
+        pv += tp * bar[V]
+        vv += bar[V]
+        return (pv / vv if vv > 0 else tp,), (day, pv, vv)
+
+# average true range with wilder smoothing
+class ATR(Indicator):
+    pane = "sub"
+    outputs = ("atr",)
+    lookback = 2
+
+    def __init__(self, name, period=14):
+        super().__init__(name)
+        self.period = int(period)
+
+    # state: atr, bars seen
+    def compute(self, bars):
+        h, l, c = bars[H], bars[L], bars[C]
+        tr = h - l
+        if len(c) > 1: tr[1:] = np.maximum(tr[1:], np.maximum(np.abs(h[1:] - c[:-1]), np.abs(l[1:] - c[:-1])))
+        atr = ema(tr, 1 / self.period)
+        out = atr.copy()
+        out[:self.period - 1] = np.nan
+        return out[None], (atr[-1] if len(atr) else None, len(c))
+
+    def step(self, state, window):
+        atr, count = state
+        bar = window[:, -1]
+        tr = bar[H] - bar[L]
+        if window.shape[1] > 1:
+            prev = window[C, -2]
+            tr = max(tr, abs(bar[H] - prev), abs(bar[L] - prev))
+        atr = tr if atr is None else atr + (tr - atr) / self.period
+        count += 1
+        return (atr if count >= self.period else np.nan,), (atr, count)
+
+INDICATOR_TYPES = {"SMA": SMA, "EMA": EMA, "BB": BB, "RSI": RSI, "MACD": MACD, "VWAP": VWAP, "ATR": ATR}
+
+# make an indicator from a name like "EMA(20)", "BB(20,2)" or "VWAP"
+def make_indicator(name):
+    match = re.fullmatch(r"(\w+)(?:\(([\d.,\s]*)\))?", name.strip())
+    if not match or match.group(1) not in INDICATOR_TYPES: raise ValueError(f"unknown indicator {name}")
+    args = [a for a in (match.group(2) or "").split(",") if a.strip()]
+    return INDICATOR_TYPES[match.group(1)](name, *(float(a) for a in args))
+
+# ring buffer of indicator outputs, written twice like CandleSeries so last(n) is a view
+class OutputSeries:
+    def __init__(self, rows, capacity):
+        self.capacity = capacity
+        self.data = np.full((rows, capacity * 2), np.nan)
+        self.end = 0
+
+    def last(self, n):
+        size = min(self.end, self.capacity)
+        n = min(n, size)
+        stop = (self.end - 1) % self.capacity + self.capacity + 1 if size else 0
+        return self.data[:, stop - n:stop]
+
+    # replace everything with a (rows, n) array
+    def load(self, values):
+        values = values[:, -self.capacity:]
+        n = values.shape[1]
+        self.data[:, :n] = self.data[:, self.capacity:self.capacity + n] = values
+        self.end = n
+
+    def append(self, values):
+        pos = self.end % self.capacity
+        self.data[:, pos] = self.data[:, pos + self.capacity] = values
+        self.end += 1
+
+    def set_last(self, values):
+        pos = (self.end - 1) % self.capacity
+        self.data[:, pos] = self.data[:, pos + self.capacity] = values
+
+# class to keep indicators of one candle series up to date
+# history is computed once with numpy, after that a live tick only computes the newest bar:
+# `state` is after the second newest bar (fixed), `pending` is after the newest bar (changes with every tick)
+class IndicatorSet:
+    def __init__(self, series, names):
+        self.indicators = {}
+        self.outputs = {}
+        for name in names:
+            indicator = make_indicator(name)
+            self.indicators[name] = indicator
+            self.outputs[name] = OutputSeries(len(indicator.outputs), series.capacity)
+        self.backfill(series)
+
+    # compute every indicator over the whole series
+    def backfill(self, series):
+        self.series = series
+        self.end = series.end
+        self.state = {}
+        self.pending = {}
+        bars = series.last()
+        for name, indicator in self.indicators.items():
+            if bars.shape[1] == 0:
+                self.outputs[name].load(np.empty((len(indicator.outputs), 0)))
+                continue
+            out, self.state[name] = indicator.compute(bars[:, :-1])
+            values, self.pending[name] = indicator.step(self.state[name], bars[:, -indicator.lookback:])
+            self.outputs[name].load(np.column_stack([out, values]))
+
+    # follow the series after a live tick: same bar changed, one bar added, or anything else
+    def sync(self):
+        series = self.series
+        if series.end == self.end and self.end and self.state:
+            self.update_last()
+        elif series.end == self.end + 1 and self.end and self.state:
+            self.append()
+        else:
+            self.backfill(series)
+
+    def update_last(self):
+        for name, indicator in self.indicators.items():
+            window = self.series.last(indicator.lookback)
+            values, self.pending[name] = indicator.step(self.state[name], window)
+            self.outputs[name].set_last(values)
+
+    def append(self):
+        for name, indicator in self.indicators.items():
+            # the bar before is final now, compute it once more with its last values and keep its state
+            before = self.series.last(indicator.lookback + 1)
+            values, state = indicator.step(self.state[name], before[:, :-1])
+            self.outputs[name].set_last(values)
+            self.state[name] = state
+
+            values, self.pending[name] = indicator.step(state, before[:, -indicator.lookback:])
+            self.outputs[name].append(values)
+        self.end = self.series.end
+
+    # newest n values of one indicator, (outputs, n) view aligned with series.last(n)
+    def last(self, name, n):
+        return self.outputs[name].last(n)
+
+    def nbytes(self):
+        return sum(output.data.nbytes for output in self.outputs.values())
+
+# class to keep indicator sets for every (symbol, timeframe) that was shown
+class IndicatorStore:
+    def __init__(self, timeframes, names):
+        self.timeframes = timeframes
+        self.names = list(names)
+        self.sets = {} # (symbol, interval) -> IndicatorSet
+
+    def get(self, symbol, interval):
+        key = (symbol, interval)
+        if key not in self.sets:
+            self.sets[key] = IndicatorSet(self.timeframes.get(symbol, interval), self.names)
+        return self.sets[key]
+
+    # history of a symbol was loaded (series of higher timeframes are new objects)
+    def on_history(self, symbol):
+        for (sym, interval), indicator_set in self.sets.items():
+            if sym == symbol: indicator_set.backfill(self.timeframes.get(symbol, interval))
+
+    # live candle of a symbol changed
+    def on_candle(self, symbol):
+        for (sym, interval), indicator_set in self.sets.items():
+            if sym == symbol: indicator_set.sync()
+
+    # forget the indicators of a symbol
+    def drop(self, symbol):
+        for key in [key for key in self.sets if key[0] == symbol]: del self.sets[key]
+
+    # bytes used by the indicators of a symbol
+    def nbytes(self, symbol):
+        return sum(s.nbytes() for (sym, interval), s in self.sets.items() if sym == symbol)
@@ -0,0 +1,51 @@
+# utils/lod.py
+import numpy as np
+from utils.candles import T, O, H, L, C, V
+
+# merge every two neighbour bars of a (6, n) array into one: (6, ceil(n / 2))
+# open / time of the first, close of the last, highest high, lowest low, summed volume
+def halve(bars):
+    n = bars.shape[1]
+    starts = np.arange(0, n, 2)
+    out = np.empty((6, len(starts)))
+    out[T] = bars[T, starts]
+    out[O] = bars[O, starts]
+    out[H] = np.maximum.reduceat(bars[H], starts)
+    out[L] = np.minimum.reduceat(bars[L], starts)
+    out[C] = bars[C, np.minimum(starts + 1, n - 1)]
+    out[V] = np.add.reduceat(bars[V], starts)
+    return out
+
+# class to keep level-of-detail copies of a candle series for zooming out
+# level k has one bar for every 2**k base bars (counted from the oldest bar), with the
+# min low / max high of the bars inside, so wicks of a zoomed out chart still show every extreme.
+# building is O(n) once per new bar, a live tick only changes the newest bar of each level
+class CandlePyramid:
+    def __init__(self, min_bars=64):
+        self.min_bars = min_bars # the top level has about this many bars
+        self.levels = []
+
+    # build every level from a (6, n) array of base bars (level 0 is the array itself, not a copy)
+    def build(self, bars):
+        self.levels = [bars]
+        while self.levels[-1].shape[1] > self.min_bars:
+            self.levels.append(halve(self.levels[-1]))
+
+    # the newest base bar changed, merge the newest bar of each level again
+    def update_last(self):
+        for k in range(1, len(self.levels)):
+            below, level = self.levels[k - 1], self.levels[k]
+            j = level.shape[1] - 1
+            t, o, h, l, c, v = below[:, 2 * j:2 * j + 2].tolist()
+            level[:, j] = (t[0], o[0], max(h), min(l), c[-1], sum(v))
+
+    # smallest level that shows count base bars in at most columns bars
+    def level_for(self, count, columns):
+        k = 0
+        while k + 1 < len(self.levels) and count > columns * 2 ** k: k += 1
+        return k
+
+    # bars of a level that cover base bars [start, stop), and the index of the first one
+    def window(self, k, start, stop):
+        first, last = start >> k, (stop - 1 >> k) + 1
+        return self.levels[k][:, first:last], first
@@ -0,0 +1,138 @@
+# utils/market.py
+import json
+import os
+import numpy as np
+
+# columns the watchlist can sort by
+SORT_KEYS = ("name", "price", "percent", "volume")
+
+# (name, code) of every trading pair with one of the quote assets, e.g. ("BTC/USDT", "btcusdt")
+def symbols_from_exchange_info(info, quotes=("USDT",)):
+    symbols = []
+    for s in info.get("symbols", []):
+        if s.get("status") != "TRADING" or s.get("quoteAsset") not in quotes: continue
+        symbols.append((f"{s['baseAsset']}/{s['quoteAsset']}", s["symbol"].lower()))
+    return symbols
+
+# decimals of the price tick of every trading pair, e.g. {"BTC/USDT": 2, "PEPE/USDT": 8}
+def price_decimals_from_exchange_info(info, quotes=("USDT",)):
+    decimals = {}
+    for s in info.get("symbols", []):
+        if s.get("status") != "TRADING" or s.get("quoteAsset") not in quotes: continue
+        for f in s.get("filters", []):
+            if f.get("filterType") == "PRICE_FILTER" and float(f.get("tickSize", 0)) > 0:
+                decimals[f"{s['baseAsset']}/{s['quoteAsset']}"] = len(f["tickSize"].rstrip("0").partition(".")[2])
+    return decimals
+
+# symbol list saved on disk so the next start does not wait for exchangeInfo
+# rows are [name, code] or [name, code, price decimals]
+def read_symbols(path):
+    try:
+        with open(path) as f: return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+def load_symbols(path):
+    return [(s[0], s[1]) for s in read_symbols(path)]
+
+def load_price_decimals(path):
+    return {s[0]: s[2] for s in read_symbols(path) if len(s) > 2}
+
+def save_symbols(path, symbols, decimals=None):
+    decimals = decimals or {}
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f: json.dump([[name, code, decimals[name]] if name in decimals else [name, code] for name, code in symbols], f)
+
+# class to keep the 24h ticker of every symbol in numpy columns
+# one row per symbol, lookup by exchange code, sorting and filtering return row numbers
+class MarketTable:
+    def __init__(self, symbols=()):
+        self.names = []  # "BTC/USDT"
+        self.codes = []  # "btcusdt"
+        self.rows = {}   # "BTCUSDT" -> row
+        self.price = np.zeros(0)
+        self.open = np.zeros(0)
+        self.volume = np.zeros(0)  # 24h quote volume
+        self.version = 0 # changes when the symbol list changes
+        self.filter_cache = {}     # filter text -> rows matching it
+        self.set_symbols(symbols)
+
+    def __len__(self):
+        return len(self.names)
+
+    # replace the symbol list, values of symbols we already had are kept
+    def set_symbols(self, symbols):
+        old_rows, price, open_, volume = self.rows, self.price, self.open, self.volume
+        self.names = [name for name, code in symbols]
+        self.codes = [code for name, code in symbols]
+        self.rows = {code.upper(): i for i, code in enumerate(self.codes)}
+        self.search = [name.lower() for name in self.names]
+        self.name_order = np.argsort(self.names, kind="stable") if self.names else np.zeros(0, dtype=int)
+
+        n = len(self.names)
+        self.price, self.open, self.volume = np.zeros(n), np.zeros(n), np.zeros(n)
+        keep = [(i, old_rows[code.upper()]) for i, code in enumerate(self.codes) if code.upper() in old_rows]
+        if keep:
+            new, old = np.array(keep).T
+            self.price[new], self.open[new], self.volume[new] = price[old], open_[old], volume[old]
+        self.version += 1
+        self.filter_cache = {}
+
+    # apply one MiniTickers record, symbols we do not know are skipped
+    def update(self, tickers):
+        rows = np.fromiter((self.rows.get(code, -1) for code in tickers.codes), dtype=int, count=len(tickers.codes))
+        known = rows >= 0
+        rows = rows[known]
+        self.price[rows] = tickers.close[known]
+        self.open[rows] = tickers.open[known]
+        self.volume[rows] = tickers.quote_volume[known]
+
+    def row_of(self, name):
+        code = name.replace("/", "")
+        return self.rows.get(code)
+
+    # last price of a symbol name, 0 if we have none
+    def price_of(self, name):
+        row = self.row_of(name)
+        return float(self.price[row]) if row is not None else 0.0
+
+    # change and percent change of the last 24h
+    def change(self):
+        change = self.price - self.open
+        with np.errstate(divide="ignore", invalid="ignore"):
+            percent = np.where(self.open > 0, change / self.open * 100, 0.0)
+        return change, percent
+
+    # rows whose name contains the text, a longer text only searches the rows of the shorter one
+    def filter(self, text):
+        text = text.strip().lower()
+        if not text: return None
+        if text in self.filter_cache: return self.filter_cache[text]
+
+        base = range(len(self.search))
+        for i in range(len(text) - 1, 0, -1):
+            if text[:i] in self.filter_cache:
+                base = self.filter_cache[text[:i]]
+                break
+        rows = np.array([i for i in base if text in self.search[i]], dtype=int)
+        self.filter_cache[text] = rows
+        return rows
+
+    # row numbers to show, filtered by text and (optional) a set of names, sorted by key
+    def view(self, key="volume", descending=True, text="", only=None):
+        if key == "name": order = self.name_order
+        else:
+            column = self.change()[1] if key == "percent" else getattr(self, key)
+            order = np.argsort(column, kind="stable")
+        if descending: order = order[::-1]
+
+        rows = self.filter(text)
+        if only is not None:
+            wanted = [self.row_of(name) for name in only]
+            wanted = np.array([r for r in wanted if r is not None], dtype=int)
+            rows = wanted if rows is None else np.intersect1d(rows, wanted)
+        if rows is None: return order
+
+        mask = np.zeros(len(self.names), dtype=bool)
+        mask[rows] = True
+        return order[mask[order]]
@@ -0,0 +1,120 @@
+# utils/metrics.py
+import csv
+import json
+import math
+import threading
+import time
+import traceback
+
+SUB_BUCKETS = 4  # buckets per power of two (about 19% resolution)
+MIN_EXPONENT = -10 # smallest bucket starts near 0.001
+BUCKETS = 40 * SUB_BUCKETS
+
+# histogram with log sized buckets, recording is a few operations and never allocates
+class Histogram:
+    def __init__(self):
+        self.buckets = [0] * BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value):
+        if value < 0: value = 0.0
+        self.count += 1
+        self.total += value
+        if value > self.max: self.max = value
+        if value == 0:
+            self.buckets[0] += 1
+            return
+
+        # value = mantissa * 2 ** exponent with mantissa in [0.5, 1)
+        mantissa, exponent = math.frexp(value)
+        i = (exponent - MIN_EXPONENT) * SUB_BUCKETS + int((mantissa - 0.5) * 2 * SUB_BUCKETS)
+        self.buckets[min(max(i, 0), BUCKETS - 1)] += 1
+
+    # upper edge of the bucket holding the p-th percentile
+    def percentile(self, p):
+        if self.count == 0: return 0.0
+        rank = self.count * p / 100
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                exponent, sub = divmod(i, SUB_BUCKETS)
+                edge = math.ldexp(0.5 + (sub + 1) / (2 * SUB_BUCKETS), exponent + MIN_EXPONENT)
+                return min(edge, self.max)
+        return self.max
+
+    def summary(self):
+        return {"count": self.count, "mean": self.total / self.count if self.count else 0.0,
+                "p50": self.percentile(50), "p95": self.percentile(95),
+                "p99": self.percentile(99), "max": self.max}
+
+# class to collect every metric of the app in one place
+# names look like "latency.exchange.trade" or "render.book", times are in milliseconds.
+# metrics are recorded from the engine, executor and tkinter threads: new names are added
+# under the lock and snapshot copies the dicts under it, so a snapshot never sees a dict grow
+class Metrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}
+        self.errors = {}  # where -> {"count", "last"}
+        self.started = time.time()
+
+    def observe(self, name, value):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self.lock: histogram = self.histograms.setdefault(name, Histogram())
+        histogram.record(value)
+
+    def count(self, name, n=1):
+        if name in self.counters: self.counters[name] += n
+        else:
+            with self.lock: self.counters[name] = self.counters.get(name, 0) + n
+
+    def gauge(self, name, value):
+        if name in self.gauges: self.gauges[name] = value
+        else:
+            with self.lock: self.gauges[name] = value
+
+    # remember an exception that was caught and not shown to the user
+    def error(self, where, exc):
+        entry = self.errors.get(where)
+        if entry is None:
+            with self.lock: entry = self.errors.setdefault(where, {"count": 0, "last": ""})
+        entry["count"] += 1
+        entry["last"] = "".join(traceback.format_exception_only(type(exc), exc)).strip()
+
+    def snapshot(self):
+        with self.lock:
+            histograms, counters = list(self.histograms.items()), list(self.counters.items())
+            gauges, errors = list(self.gauges.items()), [(where, dict(e)) for where, e in self.errors.items()]
+        return {"time": time.time(), "uptime": time.time() - self.started,
+                "histograms": {name: h.summary() for name, h in sorted(histograms)},
+                "counters": dict(sorted(counters)),
+                "gauges": dict(sorted(gauges)),
+                "errors": dict(sorted(errors))}
+
+    # write the snapshot to a .json or .csv file
+    def export(self, path):
+        snapshot = self.snapshot()
+        if path.endswith(".csv"):
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["kind", "name", "count", "mean", "p50", "p95", "p99", "max", "last"])
+                for name, s in snapshot["histograms"].items():
+                    writer.writerow(["histogram", name, s["count"], s["mean"], s["p50"], s["p95"], s["p99"], s["max"], ""])
+                for name, n in snapshot["counters"].items():
+                    writer.writerow(["counter", name, n, "", "", "", "", "", ""])
+                for name, value in snapshot["gauges"].items():
+                    writer.writerow(["gauge", name, value, "", "", "", "", "", ""])
+                for where, e in snapshot["errors"].items():
+                    writer.writerow(["error", where, e["count"], "", "", "", "", "", e["last"]])
+        else:
+            with open(path, "w") as f:
+                json.dump(snapshot, f, indent=2)
+
+# one metrics object shared by the whole app
+metrics = Metrics()
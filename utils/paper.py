@@ -0,0 +1,227 @@
+# utils/paper.py
+from bisect import bisect_left, insort
+from collections import deque, namedtuple
+
+Fill = namedtuple("Fill", "order_id symbol side price qty fee time")
+
+# one paper order, qty and filled are in base units, price is None for a market order
+class Order:
+    def __init__(self, order_id, symbol, side, qty, price, time):
+        self.id = order_id
+        self.symbol = symbol
+        self.side = side # "BUY" or "SELL"
+        self.qty = qty
+        self.price = price
+        self.time = time
+        self.filled = 0.0
+        self.status = "NEW" # NEW, PARTIAL, FILLED, CANCELED
+
+    @property
+    def remaining(self):
+        return self.qty - self.filled
+
+# class to keep the resting orders of one side of one symbol
+# prices are stored as sign * price so the best level is always last and a filled level
+# is removed with pop() in O(1), every level is a queue of orders in time priority
+class RestingSide:
+    def __init__(self, is_buy):
+        self.sign = 1 if is_buy else -1
+        self.keys = []   # sign * price, sorted, best last
+        self.levels = {} # key -> deque of orders
+
+    def __len__(self):
+        return len(self.keys)
+
+    # best resting price or None
+    def best(self):
+        return self.sign * self.keys[-1] if self.keys else None
+
+    # true if an order of this side is priced at price or better
+    def crosses(self, price):
+        return bool(self.keys) and self.keys[-1] >= self.sign * price
+
+    def add(self, order):
+        key = self.sign * order.price
+        level = self.levels.get(key)
+        if level is None:
+            level = self.levels[key] = deque()
+            insort(self.keys, key)
+        level.append(order)
+
+    def remove(self, order):
+        key = self.sign * order.price
+        level = self.levels[key]
+        level.remove(order)
+        if not level:
+            del self.levels[key]
+            del self.keys[bisect_left(self.keys, key)]
+
+    # fill orders priced at price or better with up to qty, best level and oldest order first
+    # returns (order, fill qty); only the levels that fill are touched
+    def match(self, price, qty):
+        fills = []
+        limit = self.sign * price
+        while self.keys and self.keys[-1] >= limit and qty > 0:
+            key = self.keys[-1]
+            level = self.levels[key]
+            while level and qty > 0:
+                order = level[0]
+                q = min(order.remaining, qty)
+                order.filled += q
+                qty -= q
+                fills.append((order, q))
+                if order.remaining <= 1e-12: level.popleft()
+            if not level:
+                del self.levels[key]
+                self.keys.pop()
+        return fills
+
+# class to keep the position of one symbol with average cost accounting
+# qty is signed (short is negative), realized pnl includes fees
+class Position:
+    def __init__(self):
+        self.qty = 0.0
+        self.avg_price = 0.0
+        self.realized = 0.0
+
+    def fill(self, side, price, qty, fee):
+        signed = qty if side == "BUY" else -qty
+        self.realized -= fee
+        if self.qty == 0 or (self.qty > 0) == (signed > 0):
+            # open or add: new average price
+            self.avg_price = (self.avg_price * abs(self.qty) + price * qty) / (abs(self.qty) + qty)
+            self.qty += signed
+            return
+
+        # reduce, close or flip
+        closed = min(qty, abs(self.qty))
+        self.realized += closed * (price - self.avg_price) * (1 if self.qty > 0 else -1)
+        self.qty += signed
+        if abs(self.qty) <= 1e-12: self.qty, self.avg_price = 0.0, 0.0
+        elif (self.qty > 0) == (signed > 0): self.avg_price = price # flipped, the rest opened at price
+
+    def unrealized(self, mark):
+        return self.qty * (mark - self.avg_price) if self.qty and mark else 0.0
+
+# class to simulate order execution for paper trading
+# market orders and the marketable part of limit orders take liquidity from the local order book,
+# the rest of a limit order rests until a trade prints at its price or better.
+# a trade only looks at the best resting price of each side and the open orders are indexed
+# per symbol, so the cost of a tick, a cancel or a summary depends on the orders that change
+# and the symbols, not on how many orders are resting
+class PaperTrader:
+    def __init__(self, fee_rate=0.001, max_fills=100):
+        self.fee_rate = fee_rate
+        self.sides = {}     # symbol -> (resting buys, resting sells)
+        self.orders = {}    # id -> resting Order
+        self.open = {}      # symbol -> {id: resting Order}
+        self.positions = {} # symbol -> Position
+        self.marks = {}     # symbol -> last trade price
+        self.fills = deque(maxlen=max_fills) # newest fills
+        self.next_id = 1
+
+    # true if the symbol has resting orders or an open position
+    def active(self, symbol=None):
+        if symbol is None: return bool(self.orders) or any(p.qty for p in self.positions.values())
+        position = self.positions.get(symbol)
+        return symbol in self.sides or bool(position and position.qty)
+
+    # new order, book is the local OrderBook of the symbol (needed for market orders)
+    # returns the order and its fills
+    def submit(self, symbol, side, qty, price=None, book=None, time=0):
+        if qty <= 0: raise ValueError("quantity must be positive")
+        if price is not None and price <= 0: raise ValueError("price must be positive")
+        if price is None and book is None: raise ValueError("market order needs an order book")
+        order = Order(self.next_id, symbol, side, qty, price, time)
+        self.next_id += 1
+
+        # take liquidity from the book up to the limit price
+        fills = []
+        if book is not None:
+            for level_price, q in book.take(side, qty, price):
+                order.filled += q
+                fills.append(self._fill(order, level_price, q, time))
+
+        if order.remaining <= 1e-12:
+            order.status = "FILLED"
+        elif price is None:
+            order.status = "CANCELED" # the book was not deep enough, the rest of a market order is dropped
+        else:
+            order.status = "PARTIAL" if order.filled else "NEW"
+            self._sides(symbol)[side == "SELL"].add(order)
+            self.orders[order.id] = order
+            self.open.setdefault(symbol, {})[order.id] = order
+        return order, fills
+
+    # cancel one resting order, returns it or None
+    def cancel(self, order_id):
+        order = self.orders.get(order_id)
+        if order is None: return None
+        self._close(order)
+        buys, sells = self.sides[order.symbol]
+        (buys if order.side == "BUY" else sells).remove(order)
+        if not buys and not sells: del self.sides[order.symbol]
+        order.status = "CANCELED"
+        return order
+
+    # cancel every resting order of a symbol, returns how many
+    def cancel_all(self, symbol):
+        ids = list(self.open.get(symbol, ()))
+        for order_id in ids: self.cancel(order_id)
+        return len(ids)
+
+    # a trade printed: an aggressive buy (is_buy) fills resting sells at or below price, an aggressive
+    # sell fills resting buys at or above it, up to the trade qty. without the aggressor side
+    # both sides are tried and share the trade qty
+    def on_trade(self, symbol, price, qty, time, is_buy=None):
+        self.marks[symbol] = price
+        sides = self.sides.get(symbol)
+        if sides is None: return []
+
+        fills = []
+        for resting in (sides if is_buy is None else (sides[1] if is_buy else sides[0],)):
+            if qty <= 0 or not resting.crosses(price): continue # nothing can cross
+            for order, q in resting.match(price, qty):
+                qty -= q
+                fills.append(self._fill(order, order.price, q, time))
+                if order.remaining <= 1e-12:
+                    order.status = "FILLED"
+                    self._close(order)
+                else:
+                    order.status = "PARTIAL"
+        if not sides[0] and not sides[1]: del self.sides[symbol]
+        return fills
+
+    # remove an order that is not resting anymore from the indexes
+    def _close(self, order):
+        del self.orders[order.id]
+        open_orders = self.open[order.symbol]
+        del open_orders[order.id]
+        if not open_orders: del self.open[order.symbol]
+
+    def _sides(self, symbol):
+        if symbol not in self.sides: self.sides[symbol] = (RestingSide(True), RestingSide(False))
+        return self.sides[symbol]
+
+    # record a fill and update the position
+    def _fill(self, order, price, qty, time):
+        fee = price * qty * self.fee_rate
+        position = self.positions.get(order.symbol)
+        if position is None: position = self.positions[order.symbol] = Position()
+        position.fill(order.side, price, qty, fee)
+        fill = Fill(order.id, order.symbol, order.side, price, qty, fee, time)
+        self.fills.append(fill)
+        return fill
+
+    # position, pnl and open orders of every symbol with activity, and the totals
+    def summary(self):
+        symbols = {}
+        for symbol, p in self.positions.items():
+            symbols[symbol] = {"qty": p.qty, "avg_price": p.avg_price, "realized": p.realized,
+                               "unrealized": p.unrealized(self.marks.get(symbol)), "orders": 0}
+        for symbol, open_orders in self.open.items():
+            symbols.setdefault(symbol, {"qty": 0.0, "avg_price": 0.0, "realized": 0.0, "unrealized": 0.0, "orders": 0})["orders"] = len(open_orders)
+        return {"symbols": symbols,
+                "realized": sum(s["realized"] for s in symbols.values()),
+                "unrealized": sum(s["unrealized"] for s in symbols.values()),
+                "orders": len(self.orders)}
@@ -0,0 +1,179 @@
+# utils/recorder.py
+import asyncio
+import glob
+import gzip
+import json
+import os
+import threading
+import time
+from urllib.parse import urlencode
+import websockets
+from utils.decode import loads
+from utils.rest import RestClient
+
+REST_PREFIX = "rest:" # stream name prefix of recorded rest responses, e.g. "rest:/depth?limit=1000&symbol=BTCUSDT"
+
+# stream name of a rest response in the log
+def rest_stream(path, params):
+    return f"{REST_PREFIX}{path}?{urlencode(sorted(params.items()))}"
+
+# class to save every raw frame to gzip log files, one line per frame:
+# receive time <tab> stream name <tab> raw frame
+# a new segment file is started after segment_bytes of frames.
+# rest responses (snapshots, klines) are written to the same log under a "rest:" stream name,
+# so a replay sees them in the same order as the frames around them
+class FrameRecorder:
+    def __init__(self, directory, segment_bytes=64 * 1024 * 1024):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.file = None
+        self.written = 0
+        self.segment = 0
+        self.frames = 0
+        self.closed = False
+        self.lock = threading.Lock() # rest responses are written from executor threads
+        self.name = time.strftime("%Y%m%d-%H%M%S")
+        os.makedirs(directory, exist_ok=True)
+
+    # start the next segment file
+    def _next_segment(self):
+        if self.file: self.file.close()
+        self.segment += 1
+        path = os.path.join(self.directory, f"frames-{self.name}-{self.segment:04d}.log.gz")
+        self.file = gzip.open(path, "at", encoding="utf-8", compresslevel=1)
+        self.written = 0
+
+    def write(self, stream, raw, received=None):
+        line = f"{received or time.time():.6f}\t{stream}\t{raw}\n"
+        with self.lock:
+            if self.closed: return
+            if self.file is None or self.written >= self.segment_bytes: self._next_segment()
+            self.file.write(line)
+            self.written += len(line)
+            self.frames += 1
+
+    # save the json text of a rest response (newlines are only whitespace in json)
+    def write_rest(self, path, params, text):
+        self.write(rest_stream(path, params), text.replace("\n", "").replace("\r", ""))
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            if self.file:
+                self.file.close()
+                self.file = None
+
+# read (receive time, stream, raw frame) from log files in order
+def read_frames(paths):
+    if isinstance(paths, str): paths = sorted(glob.glob(os.path.join(paths, "*.log.gz")))
+    for path in paths:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                received, stream, raw = line.rstrip("\n").split("\t", 2)
+                yield float(received), stream, raw
+
+# call send(stream, raw) for every frame with the recorded timing, rest responses are skipped
+# speed 1 = real time, 10 = ten times faster, 0 = as fast as possible
+async def play_frames(paths, send, speed=1.0):
+    first = None
+    start = time.monotonic()
+    count = 0
+    for received, stream, raw in read_frames(paths):
+        if stream.startswith(REST_PREFIX): continue
+        if speed:
+            if first is None: first = received
+            wait = (received - first) / speed - (time.monotonic() - start)
+            if wait > 0: await asyncio.sleep(wait)
+        elif count % 100 == 0:
+            await asyncio.sleep(0) # let other tasks run at max speed
+        await send(stream, raw)
+        count += 1
+    return count
+
+# class to feed recorded frames into a stream manager instead of the network
+# the frames go through the same routing and handlers as live data
+class ReplayFeed:
+    def __init__(self, paths, speed=1.0):
+        self.paths = paths
+        self.speed = speed
+        self.frames = 0
+        self.done = False
+
+    async def run(self, stream_manager):
+        async def send(stream, raw):
+            stream_manager.on_message(raw)
+        self.frames = await play_frames(self.paths, send, self.speed)
+        self.done = True
+
+# rest client that answers from the responses saved in a recording instead of the network,
+# so a replay is offline and the order book syncs with the snapshot it synced with when recorded.
+# klines of all recorded pages are merged and filtered by the request, other paths give
+# the recorded responses of the same request in order (the last one again when they run out)
+class ReplayRest(RestClient):
+    def __init__(self, paths):
+        super().__init__()
+        self.responses = {} # rest stream name -> [raw text] in recorded order
+        self.next = {}      # rest stream name -> index of the next response
+        self.kline_rows = {} # (symbol, interval) -> {open time: kline}
+        for received, stream, raw in read_frames(paths):
+            if not stream.startswith(REST_PREFIX): continue
+            path, _, query = stream[len(REST_PREFIX):].partition("?")
+            if path == "/klines":
+                params = dict(p.split("=", 1) for p in query.split("&") if p)
+                rows = self.kline_rows.setdefault((params.get("symbol"), params.get("interval")), {})
+                for row in loads(raw): rows[row[0]] = row
+            else:
+                self.responses.setdefault(stream, []).append(raw)
+
+    # same answer as the exchange would give, from recorded data; OSError if it was not recorded
+    def get(self, path, params=None, weight=1):
+        params = params or {}
+        if path == "/klines": return self._klines(params)
+        stream = rest_stream(path, params)
+        answers = self.responses.get(stream)
+        if not answers: raise OSError(f"{stream} is not in the recording")
+        with self.lock:
+            i = self.next.get(stream, 0)
+            self.next[stream] = i + 1
+        return loads(answers[min(i, len(answers) - 1)])
+
+    def _klines(self, params):
+        rows = self.kline_rows.get((params.get("symbol"), params.get("interval")))
+        if not rows: raise OSError(f"no klines of {params.get('symbol')} {params.get('interval')} in the recording")
+        times = sorted(rows)
+        start, end, limit = params.get("startTime"), params.get("endTime"), int(params.get("limit", 500))
+        if start is not None: times = [t for t in times if t >= int(start)]
+        if end is not None: times = [t for t in times if t <= int(end)]
+        times = times[:limit] if start is not None else times[-limit:]
+        return [rows[t] for t in times]
+
+# local websocket server that plays recorded frames to every client
+# point STREAM_URL at ws://host:port/stream to test the full app offline
+async def serve_replay(paths, host="127.0.0.1", port=9443, speed=1.0):
+    async def handler(ws):
+        async def reply():
+            # answer SUBSCRIBE / UNSUBSCRIBE like the exchange
+            async for msg in ws:
+                try: await ws.send(json.dumps({"result": None, "id": json.loads(msg).get("id")}))
+                except ValueError: pass
+
+        replies = asyncio.ensure_future(reply())
+        try:
+            await play_frames(paths, lambda stream, raw: ws.send(raw), speed)
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            replies.cancel()
+
+    async with websockets.serve(handler, host, port, max_size=None):
+        await asyncio.Future()
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Play recorded frames on a local websocket server")
+    parser.add_argument("paths", nargs="+", help="log files or one directory")
+    parser.add_argument("--port", type=int, default=9443)
+    parser.add_argument("--speed", type=float, default=1.0, help="1 = real time, 0 = max speed")
+    args = parser.parse_args()
+    paths = args.paths[0] if len(args.paths) == 1 and os.path.isdir(args.paths[0]) else args.paths
+    asyncio.run(serve_replay(paths, port=args.port, speed=args.speed))
@@ -0,0 +1,89 @@
+# utils/resample.py
+import numpy as np
+from utils.candles import T, O, H, L, C, V, CandleSeries
+
+UNIT_MS = {"m": 60_000, "h": 3_600_000, "d": 86_400_000, "w": 604_800_000}
+WEEK_OFFSET = 4 * 86_400_000 # binance weeks start on monday, 1970-01-01 was a thursday
+
+# convert an interval like "30m", "4h" or "1d" to milliseconds
+def interval_ms(interval):
+    return int(interval[:-1]) * UNIT_MS[interval[-1]]
+
+# open time of the bucket each candle belongs to
+def bucket_times(times, ms):
+    offset = WEEK_OFFSET if ms % UNIT_MS["w"] == 0 else 0
+    return (times - offset) // ms * ms + offset
+
+# build bigger candles from a (6, n) array of base candles in one pass
+def resample(bars, ms):
+    if bars.shape[1] == 0: return np.empty((6, 0))
+    buckets = bucket_times(bars[T], ms)
+
+    # index of the first base candle of every bucket
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], bars.shape[1]] - 1
+
+    out = np.empty((6, len(starts)))
+    out[T] = buckets[starts]
+    out[O] = bars[O, starts]
+    out[H] = np.maximum.reduceat(bars[H], starts)
+    out[L] = np.minimum.reduceat(bars[L], starts)
+    out[C] = bars[C, ends]
+    out[V] = np.add.reduceat(bars[V], starts)
+    return out
+
+# class to keep one higher timeframe series built from a base series
+class Resampler:
+    def __init__(self, base, base_interval, interval):
+        self.base = base
+        self.ms = interval_ms(interval)
+        self.per_bucket = max(1, self.ms // interval_ms(base_interval)) # base candles in one bucket
+        self.series = CandleSeries(base.capacity)
+        self.rebuild()
+
+    # build the whole series again (after history is loaded)
+    def rebuild(self):
+        self.series = CandleSeries(self.base.capacity)
+        bars = resample(self.base.last(), self.ms)
+        if bars.shape[1]: self.series.load(bars.T)
+
+    # the newest base candle changed, only build the newest bucket again
+    def update(self):
+        bars = self.base.last(self.per_bucket)
+        if bars.shape[1] == 0: return
+        bucket = bucket_times(bars[T, -1:], self.ms)[0]
+        bar = resample(bars[:, bars[T] >= bucket], self.ms)[:, -1]
+        self.series.upsert(*bar)
+
+# class to keep every timeframe asked for, for every symbol
+class TimeframeStore:
+    def __init__(self, candle_store, base_interval):
+        self.candle_store = candle_store
+        self.base_interval = base_interval
+        self.resamplers = {} # (symbol, interval) -> Resampler
+
+    # candle series of a symbol in any timeframe
+    def get(self, symbol, interval):
+        if interval == self.base_interval: return self.candle_store[symbol]
+        key = (symbol, interval)
+        if key not in self.resamplers:
+            self.resamplers[key] = Resampler(self.candle_store[symbol], self.base_interval, interval)
+        return self.resamplers[key].series
+
+    # history of a symbol was loaded, build its timeframes again
+    def on_history(self, symbol):
+        for (sym, interval), resampler in self.resamplers.items():
+            if sym == symbol: resampler.rebuild()
+
+    # live candle of a symbol changed
+    def on_candle(self, symbol):
+        for (sym, interval), resampler in self.resamplers.items():
+            if sym == symbol: resampler.update()
+
+    # forget every timeframe of a symbol
+    def drop(self, symbol):
+        for key in [key for key in self.resamplers if key[0] == symbol]: del self.resamplers[key]
+
+    # bytes used by the timeframes of a symbol
+    def nbytes(self, symbol):
+        return sum(r.series.data.nbytes for (sym, interval), r in self.resamplers.items() if sym == symbol)
@@ -0,0 +1,145 @@
+# utils/rest.py
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from utils.config import *
+from utils.decode import loads
+
+# class to call the binance rest api over pooled keep-alive connections
+# it follows the used weight headers, waits before the limit, retries with backoff
+# and shares one response between identical requests that run at the same time.
+# requests is imported by the first request (on a worker thread), not while the window starts
+class RestClient:
+    def __init__(self, base_url=REST_URL, weight_limit=REST_WEIGHT_LIMIT, retries=REST_RETRIES, pool_size=REST_POOL_SIZE):
+        self.base_url = base_url
+        self.weight_limit = weight_limit
+        self.retries = retries
+        self.pool_size = pool_size
+
+        self.session = None # made by the first request
+        self.recorder = None # FrameRecorder to save every response (replayed by ReplayRest)
+
+        self.lock = threading.Lock()
+        self.used_weight = 0    # weight used in the current minute
+        self.weight_minute = 0  # minute the used weight belongs to
+        self.blocked_until = 0  # time when a 429 / 418 ban ends
+        self.in_flight = {}     # request key -> future of the running request
+
+    # get json from an api path, identical requests running now share one call
+    def get(self, path, params=None, weight=1):
+        params = params or {}
+        key = (path, tuple(sorted(params.items())))
+        with self.lock:
+            future = self.in_flight.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self.in_flight[key] = future
+        if not is_owner: return future.result()
+
+        try:
+            result = self._request(path, params, weight)
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.lock:
+                del self.in_flight[key]
+
+    # pooled keep-alive session, made once
+    def open_session(self):
+        with self.lock:
+            if self.session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self.session = session
+            return self.session
+
+    # send the request, retry network errors, server errors and rate limits with backoff
+    # (requests.RequestException is an OSError, callers catch it as OSError)
+    def _request(self, path, params, weight):
+        session = self.open_session()
+        delay = REST_RETRY_DELAY
+        for attempt in range(self.retries + 1):
+            is_last = attempt == self.retries
+            self.throttle(weight)
+            try:
+                response = session.get(f"{self.base_url}{path}", params=params, timeout=5)
+            except OSError:
+                if is_last: raise
+                time.sleep(delay)
+                delay *= 2
+                continue
+
+            self.track_weight(response)
+            if response.status_code in (418, 429):
+                # rate limited, wait as long as the server asks
+                wait = float(response.headers.get("Retry-After", delay))
+                with self.lock: self.blocked_until = time.time() + wait
+                if is_last: response.raise_for_status()
+                continue
+            if response.status_code >= 500 and not is_last:
+                time.sleep(delay)
+                delay *= 2
+                continue
+
+            response.raise_for_status()
+            if self.recorder: self.recorder.write_rest(path, params, response.text)
+            return loads(response.content)
+
+    # wait until the request weight fits in the limit of this minute
+    def throttle(self, weight):
+        while True:
+            with self.lock:
+                now = time.time()
+                minute = int(now // 60)
+                if minute != self.weight_minute:
+                    self.weight_minute = minute
+                    self.used_weight = 0
+
+                if now < self.blocked_until:
+                    wait = self.blocked_until - now
+                elif self.used_weight + weight > self.weight_limit:
+                    wait = 60 - now % 60
+                else:
+                    self.used_weight += weight # guess until the header tells the real value
+                    return
+            time.sleep(wait)
+
+    # save the weight the server says we used
+    def track_weight(self, response):
+        used = response.headers.get("X-MBX-USED-WEIGHT-1M") or response.headers.get("X-MBX-USED-WEIGHT")
+        if used is None: return
+        with self.lock:
+            self.weight_minute = int(time.time() // 60)
+            self.used_weight = int(used)
+
+    # candles of one symbol
+    def klines(self, code, interval, start_time=None, end_time=None, limit=1000):
+        params = {"symbol": code, "interval": interval, "limit": limit}
+        if start_time is not None: params["startTime"] = start_time
+        if end_time is not None: params["endTime"] = end_time
+        return self.get("/klines", params, weight=2)
+
+    # order book snapshot of one symbol
+    def depth(self, code, limit=1000):
+        weight = 5 if limit <= 100 else 25 if limit <= 500 else 50 if limit <= 1000 else 250
+        return self.get("/depth", {"symbol": code, "limit": limit}, weight=weight)
+
+    # every symbol of the exchange (large answer, called once at start)
+    def exchange_info(self):
+        return self.get("/exchangeInfo", {"permissions": "SPOT"}, weight=20)
+
+    # run func(item) for every item at the same time over the connection pool
+    def fetch_all(self, func, items):
+        with ThreadPoolExecutor(max_workers=self.pool_size) as pool:
+            return list(pool.map(func, items))
+
+    def close(self):
+        if self.session: self.session.close()
@@ -0,0 +1,86 @@
+# utils/scheduler.py
+import time
+from utils.metrics import metrics
+
+# one panel of the scheduler
+class Panel:
+    def __init__(self, name, render, rate):
+        self.name = name
+        self.render = render
+        self.interval = 1 / rate # seconds between two renders
+        self.last = 0.0          # time of the last render
+        self.stamp = None        # receive time of the oldest data not on screen yet
+
+# class to render only the panels whose data changed
+# data sources call mark(name), the tkinter loop calls run() once per frame.
+# panels are rendered in the order they were added (most important first) but not more
+# often than their rate, and only until the frame budget is used; the rest wait for the next frame.
+# when the window is not focused every rate is divided by slowdown, when it is hidden nothing is rendered
+class RenderScheduler:
+    def __init__(self, budget_ms, slowdown=4):
+        self.budget = budget_ms / 1000
+        self.slowdown = slowdown
+        self.panels = [] # in priority order
+        self.by_name = {}
+        self.dirty = set()
+        self.visible = True
+        self.focused = True
+
+        # counters to see how much work the scheduler saved
+        self.rendered = 0 # panels rendered
+        self.deferred = 0 # dirty panels that waited for their rate or the budget
+        self.frames = 0   # frames that rendered something
+
+    # add a panel, render() draws it, rate is the most renders per second
+    def add(self, name, render, rate):
+        panel = Panel(name, render, rate)
+        self.panels.append(panel)
+        self.by_name[name] = panel
+
+    # data of a panel changed, stamp is the time the data was received
+    def mark(self, name, stamp=None):
+        panel = self.by_name[name]
+        if name not in self.dirty:
+            self.dirty.add(name)
+            panel.stamp = stamp
+        elif panel.stamp is None:
+            panel.stamp = stamp
+
+    # render dirty panels that are due, returns the number of panels rendered
+    def run(self):
+        if not self.dirty or not self.visible: return 0
+        start = time.perf_counter()
+        factor = 1 if self.focused else self.slowdown
+        rendered = 0
+
+        for panel in self.panels:
+            if panel.name not in self.dirty: continue
+            now = time.perf_counter()
+            if now - panel.last < panel.interval * factor or (rendered and now - start >= self.budget):
+                self.deferred += 1
+                continue
+
+            self.dirty.discard(panel.name)
+            panel.last = now
+            try: panel.render()
+            except Exception as e: metrics.error(f"ui.{panel.name}", e)
+            metrics.observe(f"render.{panel.name}", (time.perf_counter() - now) * 1000)
+            if panel.stamp: metrics.observe(f"latency.screen.{panel.name}", (time.time() - panel.stamp) * 1000)
+            panel.stamp = None
+            rendered += 1
+
+        if rendered:
+            self.rendered += rendered
+            self.frames += 1
+            metrics.observe("render.frame", (time.perf_counter() - start) * 1000)
+        return rendered
+
+    # window was minimized / restored or lost / got the focus
+    def set_state(self, visible, focused):
+        self.visible = visible
+        self.focused = focused
+
+    # counters as a dictionary
+    def stats(self):
+        return {"rendered": self.rendered, "deferred": self.deferred, "frames": self.frames,
+                "dirty": len(self.dirty), "visible": self.visible, "focused": self.focused}
@@ -0,0 +1,179 @@
+# utils/server.py
+import asyncio
+import collections
+import json
+import time
+from urllib.parse import urlparse, parse_qs
+import websockets
+from utils.config import *
+from utils.streams import StreamManager, stream_kind
+from utils.metrics import metrics
+
+# all-market array streams: a frame only has the symbols that changed, so frames waiting for a
+# slow client are merged into one with the newest entry of every symbol
+# trades, klines and depth diffs are always sent in order
+MERGE_KINDS = ("miniTicker@arr",)
+
+# one array frame with the entries of both frames, entries of new win for the same symbol "s"
+def merge_array_frames(old, new):
+    old_frame, new_frame = json.loads(old), json.loads(new)
+    entries = {e["s"]: e for e in old_frame["data"]}
+    entries.update((e["s"], e) for e in new_frame["data"])
+    return json.dumps({"stream": new_frame["stream"], "data": list(entries.values())}, separators=(",", ":"))
+
+# class for one dashboard connected to the data server
+class Client:
+    def __init__(self, ws, max_queue):
+        self.ws = ws
+        self.streams = set()
+        self.queue = collections.deque() # raw frames that must keep their order
+        self.latest = {}                 # stream -> waiting raw frame of merged streams
+        self.max_queue = max_queue
+        self.ready = asyncio.Event()
+        self.sent = 0
+        self.dropped = 0
+
+    # add one frame, array frames are merged and the oldest other frame is dropped when the client is too slow
+    def push(self, stream, raw):
+        if stream_kind(stream) in MERGE_KINDS:
+            waiting = self.latest.get(stream)
+            if waiting is None: self.latest[stream] = raw
+            else:
+                try: self.latest[stream] = merge_array_frames(waiting, raw)
+                except (ValueError, KeyError, TypeError) as e:
+                    metrics.error("server.merge", e)
+                    self.latest[stream] = raw
+                metrics.count("server.merged")
+        else:
+            if len(self.queue) >= self.max_queue:
+                self.queue.popleft()
+                self.dropped += 1
+                metrics.count("server.dropped")
+            self.queue.append(raw)
+        self.ready.set()
+
+    # send waiting frames, new frames keep coming in while the socket is busy
+    async def write(self):
+        while True:
+            await self.ready.wait()
+            self.ready.clear()
+            frames = list(self.queue) + list(self.latest.values())
+            self.queue.clear()
+            self.latest.clear()
+            try:
+                for raw in frames: await self.ws.send(raw)
+            except websockets.ConnectionClosed:
+                return
+            self.sent += len(frames)
+
+# class to share one upstream connection (or one replay) with many dashboards
+# clients use the same protocol as the exchange: /stream?streams=a/b and SUBSCRIBE / UNSUBSCRIBE
+# so a dashboard only needs another stream url to use it
+class DataServer:
+    def __init__(self, url=STREAM_URL, max_queue=SERVER_CLIENT_QUEUE, recorder=None, replay=None):
+        self.upstream = StreamManager(url, raw=True)
+        self.upstream.recorder = recorder
+        self.replay = replay
+        self.max_queue = max_queue
+        self.clients = set()
+        self.subscribers = {} # stream -> set of clients
+
+    # send one upstream frame to every client of its stream
+    def fan_out(self, stream, raw):
+        for client in self.subscribers.get(stream, ()):
+            client.push(stream, raw)
+
+    # upstream streams are the union of all client streams
+    def update_upstream(self):
+        self.upstream.set_streams({s: (lambda raw, s=s: self.fan_out(s, raw)) for s in self.subscribers})
+
+    def subscribe(self, client, streams):
+        changed = False
+        for stream in streams:
+            if stream not in self.subscribers:
+                self.subscribers[stream] = set()
+                changed = True
+            self.subscribers[stream].add(client)
+            client.streams.add(stream)
+        if changed: self.update_upstream()
+
+    def unsubscribe(self, client, streams):
+        changed = False
+        for stream in streams:
+            client.streams.discard(stream)
+            clients = self.subscribers.get(stream)
+            if clients is None: continue
+            clients.discard(client)
+            if not clients:
+                del self.subscribers[stream]
+                changed = True
+        if changed: self.update_upstream()
+
+    # one connected dashboard
+    async def handler(self, ws):
+        client = Client(ws, self.max_queue)
+        self.clients.add(client)
+        query = parse_qs(urlparse(ws.request.path).query)
+        self.subscribe(client, [s for s in query.get("streams", [""])[0].split("/") if s])
+        writer = asyncio.ensure_future(client.write())
+
+        try:
+            async for msg in ws:
+                try:
+                    frame = json.loads(msg)
+                    method, params = frame.get("method"), frame.get("params") or []
+                except (ValueError, AttributeError):
+                    continue
+
+                result = None
+                if method == "SUBSCRIBE": self.subscribe(client, params)
+                elif method == "UNSUBSCRIBE": self.unsubscribe(client, params)
+                elif method == "LIST_SUBSCRIPTIONS": result = sorted(client.streams)
+                await ws.send(json.dumps({"result": result, "id": frame.get("id")}))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            writer.cancel()
+            self.clients.discard(client)
+            self.unsubscribe(client, list(client.streams))
+
+    def stats(self):
+        return {"clients": len(self.clients), "streams": len(self.subscribers),
+                "reconnects": self.upstream.reconnects,
+                "sent": sum(c.sent for c in self.clients),
+                "dropped": sum(c.dropped for c in self.clients)}
+
+    # print stats every few seconds
+    async def report(self, every):
+        while True:
+            await asyncio.sleep(every)
+            print(time.strftime("%H:%M:%S"), " ".join(f"{k}={v}" for k, v in self.stats().items()), flush=True)
+
+    # serve clients until cancelled
+    async def run(self, host=SERVER_HOST, port=SERVER_PORT, report_every=30):
+        async with websockets.serve(self.handler, host, port, max_size=None):
+            print(f"data server on ws://{host}:{port}/stream", flush=True)
+            if report_every: asyncio.ensure_future(self.report(report_every))
+            if self.replay: await self.replay.run(self.upstream)
+            else: await self.upstream.run()
+            await asyncio.Future() # keep serving after a replay ends
+
+# headless entry point: python -m utils.server, then start dashboards with --server
+if __name__ == "__main__":
+    import argparse
+    from utils.recorder import FrameRecorder, ReplayFeed
+    parser = argparse.ArgumentParser(description="Headless market data server for many dashboards")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--record", metavar="DIR", help="save every raw upstream frame to DIR")
+    parser.add_argument("--replay", metavar="DIR", help="serve frames saved in DIR instead of live data")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed (1 = real time, 0 = max speed)")
+    args = parser.parse_args()
+
+    recorder = FrameRecorder(args.record, RECORD_SEGMENT_BYTES) if args.record else None
+    replay = ReplayFeed(args.replay, args.speed) if args.replay else None
+    server = DataServer(recorder=recorder, replay=replay)
+    try: asyncio.run(server.run(args.host, args.port))
+    except KeyboardInterrupt: pass
+    finally:
+        if recorder: recorder.close()
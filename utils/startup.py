@@ -0,0 +1,31 @@
+# utils/startup.py
+import time
+from utils.config import *
+
+# class to time the steps of startup, from the first import of main.py to live data on screen
+# every phase is the time in milliseconds from the start of the timer to its first mark,
+# later marks of the same phase are ignored (e.g. every new trade after the first price)
+class StartupTimer:
+    def __init__(self, phases=()):
+        self.start = time.perf_counter()
+        self.expected = tuple(phases) # the report is ready when all of these are done
+        self.phases = {}              # name -> milliseconds, in the order they happened
+        self.reported = False
+
+    def __contains__(self, name):
+        return name in self.phases
+
+    # record a phase, returns true when the last expected phase is done
+    def mark(self, name):
+        if name in self.phases: return False
+        self.phases[name] = (time.perf_counter() - self.start) * 1000
+        return not self.reported and all(p in self.phases for p in self.expected)
+
+    # one line with every phase so far, phases that did not happen are shown as "-"
+    def report(self):
+        self.reported = True
+        names = list(self.phases) + [p for p in self.expected if p not in self.phases]
+        return "startup: " + " | ".join(f"{n} {self.phases[n]:.0f} ms" if n in self.phases else f"{n} -" for n in names)
+
+# one timer for the whole app, it starts when main.py imports this module
+startup = StartupTimer(STARTUP_PHASES)
@@ -0,0 +1,151 @@
+# utils/streams.py
+import asyncio
+import json
+import time
+from collections import deque
+import websockets
+from utils.config import *
+from utils.metrics import metrics
+from utils.decode import loads, decoder_for
+
+# type of a stream without the symbol, e.g. "btcusdt@kline_30m" -> "kline_30m"
+# all market streams have no symbol, e.g. "!miniTicker@arr" -> "miniTicker@arr"
+def stream_kind(stream):
+    if stream.startswith("!"): return stream[1:]
+    return stream.split("@", 1)[-1]
+
+# class to keep every market stream on one combined websocket connection
+# all methods run on the event loop of the market engine
+# raw=True gives handlers the raw frame text instead of a decoded record (used to relay frames)
+# stream changes are merged and sent as at most control_rate SUBSCRIBE / UNSUBSCRIBE frames a second
+class StreamManager:
+    def __init__(self, url=STREAM_URL, raw=False, control_rate=STREAM_CONTROL_RATE):
+        self.url = url
+        self.raw = raw
+        self.control_rate = control_rate
+        self.sent = deque(maxlen=control_rate) # send times of the newest control frames
+        self.flush_job = None   # timer handle of the next control frame
+        self.handlers = {}      # stream name -> function(data)
+        self.subscribed = set() # streams the server is sending to us
+        self.ws = None
+        self.is_running = False
+        self.next_id = 1
+        self.reconnects = 0
+        self.recorder = None    # FrameRecorder to save every raw frame
+        self.decoders = {}      # stream name -> function(data) returning a compact record
+
+    # keep the connection alive, connect again with exponential backoff if it drops
+    async def run(self):
+        self.is_running = True
+        delay = RECONNECT_MIN_DELAY
+        while self.is_running:
+            streams = sorted(self.handlers)
+            url = self.url
+            if streams:
+                url = f"{self.url}?streams={'/'.join(streams)}"
+
+            try:
+                async with websockets.connect(url, max_size=None) as ws:
+                    self.ws = ws
+                    self.subscribed = set(streams)
+                    delay = RECONNECT_MIN_DELAY
+
+                    # sync streams changed while we were connecting
+                    self.set_streams(self.handlers)
+                    async for msg in ws:
+                        self.on_message(msg)
+            except (OSError, asyncio.TimeoutError, websockets.WebSocketException) as e:
+                metrics.error("connection", e)
+            finally:
+                self.ws = None
+                self.subscribed = set()
+
+            if not self.is_running: break
+            self.reconnects += 1
+            metrics.count("reconnects")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX_DELAY)
+
+    # add one stream, send SUBSCRIBE if the connection is open
+    def subscribe(self, stream, handler):
+        self.set_streams({**self.handlers, stream: handler})
+
+    # remove one stream, send UNSUBSCRIBE if the connection is open
+    def unsubscribe(self, stream):
+        handlers = dict(self.handlers)
+        handlers.pop(stream, None)
+        self.set_streams(handlers)
+
+    # replace all streams at once, the difference to the server is sent by flush
+    def set_streams(self, handlers):
+        self.handlers = dict(handlers)
+        if self.ws is not None: self.schedule_flush()
+
+    # seconds until another control frame fits in the rate
+    def control_wait(self):
+        if len(self.sent) < self.control_rate: return 0
+        return max(self.sent[0] + 1 - time.monotonic(), 0)
+
+    # run flush when a control frame is allowed, changes made until then are merged into it
+    def schedule_flush(self):
+        if self.flush_job is None:
+            self.flush_job = asyncio.get_running_loop().call_later(self.control_wait(), self.flush)
+
+    # send the difference between the wanted and the subscribed streams
+    def flush(self):
+        self.flush_job = None
+        if self.ws is None: return
+        to_add = sorted(set(self.handlers) - self.subscribed)
+        to_remove = sorted(self.subscribed - set(self.handlers))
+        for method, streams in (("UNSUBSCRIBE", to_remove), ("SUBSCRIBE", to_add)):
+            if not streams: continue
+            if self.control_wait() > 0: return self.schedule_flush()
+            self.send(method, streams)
+
+    # send one control frame to the server
+    def send(self, method, streams):
+        frame = {"method": method, "params": streams, "id": self.next_id}
+        self.next_id += 1
+        self.sent.append(time.monotonic())
+        if method == "SUBSCRIBE": self.subscribed.update(streams)
+        else: self.subscribed.difference_update(streams)
+        asyncio.ensure_future(self._send(self.ws, json.dumps(frame)))
+
+    async def _send(self, ws, text):
+        try: await ws.send(text)
+        except websockets.WebSocketException as e: metrics.error("stream.send", e)
+
+    # decode each frame into a record and send it to the handler of its stream
+    def on_message(self, msg):
+        start = time.perf_counter()
+        try:
+            frame = loads(msg)
+        except ValueError as e:
+            metrics.error("parse", e)
+            return
+
+        stream = frame.get("stream")
+        if stream is None: return # reply of SUBSCRIBE / UNSUBSCRIBE
+        if self.recorder: self.recorder.write(stream, msg)
+
+        handler = self.handlers.get(stream)
+        if handler is None: return
+        if self.raw: return handler(msg)
+
+        kind = stream_kind(stream)
+        if stream not in self.decoders: self.decoders[stream] = decoder_for(kind)
+        decoder = self.decoders[stream]
+        data = frame["data"]
+        if decoder:
+            try: data = decoder(data)
+            except (KeyError, TypeError, ValueError) as e:
+                metrics.error(f"decode.{kind}", e)
+                return
+        metrics.observe(f"parse.{kind}", (time.perf_counter() - start) * 1000)
+        handler(data)
+
+    # close the connection and stop reconnecting
+    async def close(self):
+        self.is_running = False
+        if self.ws is not None:
+            await self.ws.close()
@@ -0,0 +1,108 @@
+# utils/tape.py
+import numpy as np
+
+# class to keep the newest trades of one symbol in a fixed size ring buffer
+# consecutive trades with the same side and price can be merged into one row,
+# rolling stats use 1 second buckets so memory never grows with the trade rate
+class TradeTape:
+    def __init__(self, capacity=1000, aggregate=True, windows=(10, 60)):
+        self.capacity = capacity
+        self.aggregate = aggregate
+        self.windows = windows
+
+        # ring buffer of trades
+        self.times = np.zeros(capacity)   # trade time in ms
+        self.prices = np.zeros(capacity)
+        self.qtys = np.zeros(capacity)
+        self.buys = np.zeros(capacity, dtype=bool)
+        self.counts = np.zeros(capacity, dtype=int) # trades merged into the row
+        self.end = 0
+
+        # one bucket per second for the longest window
+        self.bucket_len = max(windows)
+        self.trade_counts = np.zeros(self.bucket_len, dtype=int)
+        self.buy_volume = np.zeros(self.bucket_len)
+        self.sell_volume = np.zeros(self.bucket_len)
+        self.notional = np.zeros(self.bucket_len)
+        self.second = None # newest second with a bucket
+
+    def __len__(self):
+        return min(self.end, self.capacity)
+
+    # add one trade, returns true if it started a new second
+    def add(self, time_ms, price, qty, is_buy):
+        new_second = self._roll(int(time_ms // 1000))
+        self._add_row(time_ms, price, qty, is_buy)
+
+        b = self.second % self.bucket_len
+        self.trade_counts[b] += 1
+        self.notional[b] += price * qty
+        if is_buy: self.buy_volume[b] += qty
+        else: self.sell_volume[b] += qty
+        return new_second
+
+    def _add_row(self, time_ms, price, qty, is_buy):
+        last = (self.end - 1) % self.capacity
+
+        # merge with the last row if it has the same side and price
+        if self.aggregate and self.end and self.buys[last] == is_buy and self.prices[last] == price:
+            self.qtys[last] += qty
+            self.counts[last] += 1
+            self.times[last] = time_ms
+            return
+
+        i = self.end % self.capacity
+        self.times[i] = time_ms
+        self.prices[i] = price
+        self.qtys[i] = qty
+        self.buys[i] = is_buy
+        self.counts[i] = 1
+        self.end += 1
+
+    # move to a new second and empty the buckets we skipped
+    def _roll(self, second):
+        if self.second is None:
+            self.second = second
+            return True
+        if second <= self.second: return False # late trade goes to the newest bucket
+
+        skipped = np.arange(self.second + 1, min(second, self.second + self.bucket_len) + 1) % self.bucket_len
+        for buckets in (self.trade_counts, self.buy_volume, self.sell_volume, self.notional):
+            buckets[skipped] = 0
+        self.second = second
+        return True
+
+    # newest n rows, newest first: (time ms, price, qty, is buy, trade count)
+    def last(self, n):
+        rows = []
+        for k in range(min(n, len(self))):
+            i = (self.end - 1 - k) % self.capacity
+            rows.append((float(self.times[i]), float(self.prices[i]), float(self.qtys[i]), bool(self.buys[i]), int(self.counts[i])))
+        return rows
+
+    # stats of the last window seconds (ending at the newest trade)
+    def stats(self, window):
+        window = min(window, self.bucket_len)
+        if self.second is None: return {"trades_per_sec": 0.0, "buy_volume": 0.0, "sell_volume": 0.0, "imbalance": 0.0, "vwap": None}
+
+        idx = np.arange(self.second - window + 1, self.second + 1) % self.bucket_len
+        buy = float(self.buy_volume[idx].sum())
+        sell = float(self.sell_volume[idx].sum())
+        volume = buy + sell
+        return {
+            "trades_per_sec": float(self.trade_counts[idx].sum()) / window,
+            "buy_volume": buy,
+            "sell_volume": sell,
+            "imbalance": (buy - sell) / volume if volume else 0.0,
+            "vwap": float(self.notional[idx].sum()) / volume if volume else None,
+        }
+
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.times, self.prices, self.qtys, self.buys, self.counts,
+                                      self.trade_counts, self.buy_volume, self.sell_volume, self.notional))
+
+    def clear(self):
+        self.end = 0
+        self.second = None
+        for buckets in (self.trade_counts, self.buy_volume, self.sell_volume, self.notional):
+            buckets[:] = 0
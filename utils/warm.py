@@ -0,0 +1,42 @@
+# utils/warm.py
+from collections import OrderedDict
+
+# class to remember the symbols viewed last (least recently used first)
+# their streams and data stay in memory so switching back to them is instant.
+# the oldest symbol is evicted when there are more than max_symbols,
+# or when all of them use more than max_bytes (size_of(symbol) gives the bytes of one)
+class WarmSymbols:
+    def __init__(self, max_symbols, max_bytes, size_of):
+        self.max_symbols = max_symbols
+        self.max_bytes = max_bytes
+        self.size_of = size_of
+        self.symbols = OrderedDict()
+
+    def __contains__(self, symbol):
+        return symbol in self.symbols
+
+    def __iter__(self):
+        return iter(self.symbols)
+
+    def __len__(self):
+        return len(self.symbols)
+
+    # mark a symbol as viewed now, returns the symbols that were evicted
+    # the symbol viewed now is never evicted
+    def touch(self, symbol):
+        self.symbols[symbol] = True
+        self.symbols.move_to_end(symbol)
+        return self.trim()
+
+    # evict the oldest symbols while over the count or the memory budget, returns them
+    # a symbol's size is only known after its data is loaded, so call this again when it grew
+    def trim(self):
+        evicted = []
+        while len(self.symbols) > 1 and (len(self.symbols) > self.max_symbols or self.nbytes() > self.max_bytes):
+            old, _ = self.symbols.popitem(last=False)
+            evicted.append(old)
+        return evicted
+
+    # bytes used by all warm symbols
+    def nbytes(self):
+        return sum(self.size_of(symbol) for symbol in self.symbols)